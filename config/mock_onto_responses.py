@@ -26,31 +26,36 @@ MOCK_PROJECT_SCHEMA = {
             "name": "total_amount",
             "type": "DECIMAL(20,2)",
             "description": "Total project amount",
-            "required": True
+            "required": True,
+            "checks": {"min": 0}
         },
         {
             "name": "maturity_years",
             "type": "INTEGER",
             "description": "Project maturity in years",
-            "required": True
+            "required": True,
+            "checks": {"min": 1, "max": 100}
         },
         {
             "name": "expected_tri",
             "type": "DECIMAL(5,2)",
             "description": "Expected TRI",
-            "required": True
+            "required": True,
+            "checks": {"min": -100, "max": 100}
         },
         {
             "name": "dscr",
             "type": "DECIMAL(5,2)",
             "description": "Debt Service Coverage Ratio",
-            "required": True
+            "required": True,
+            "checks": {"min": 0, "max": 100}
         },
         {
             "name": "status",
             "type": "VARCHAR",
             "description": "Project status (PROPOSED, ACTIVE, COMPLETED)",
-            "required": True
+            "required": True,
+            "checks": {"allowed": ["PROPOSED", "ACTIVE", "COMPLETED"]}
         },
         {
             "name": "creation_date",
@@ -68,7 +73,8 @@ MOCK_PROJECT_SCHEMA = {
             "name": "currency_code",
             "type": "CHAR(3)",
             "description": "Currency code (ISO)",
-            "required": True
+            "required": True,
+            "checks": {"pattern": "[A-Z]{3}"}
         }
     ]
 }
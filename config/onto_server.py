@@ -14,10 +14,13 @@ implementing the circuit breaker pattern to ensure the application remains
 functional even when the ontology server is unavailable.
 """
 
+import asyncio
 import os
-from typing import List, Optional
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional
 from pydantic import BaseModel
-import httpx
 from enum import Enum
 import logging
 from .mock_onto_responses import get_mock_response
@@ -28,78 +31,286 @@ logger = logging.getLogger('data_product')
 ONTO_SERVER_URL = os.getenv('ONTO_SERVER_URL', 'http://localhost:8001')
 ONTO_SERVER_TIMEOUT = int(os.getenv('ONTO_SERVER_TIMEOUT', '5'))  # seconds
 USE_MOCK = os.getenv('USE_MOCK_ONTO_SERVER', 'true').lower() == 'true'
+ONTO_SCHEMA_TTL = float(os.getenv('ONTO_SCHEMA_TTL', '300'))  # seconds
+ONTO_SCHEMA_STALE_TTL = float(os.getenv('ONTO_SCHEMA_STALE_TTL', '3600'))  # seconds
+ONTO_BREAKER_FAILURES = int(os.getenv('ONTO_BREAKER_FAILURES', '5'))
+ONTO_BREAKER_RECOVERY = float(os.getenv('ONTO_BREAKER_RECOVERY', '30'))  # seconds
 
 class ProjectStatus(str, Enum):
     PROPOSED = "PROPOSED"
     ACTIVE = "ACTIVE"
     COMPLETED = "COMPLETED"
 
+class ColumnChecks(BaseModel):
+    """Data-quality rules declared for a column; see src/database/quality.py"""
+    min: Optional[float] = None
+    max: Optional[float] = None
+    allowed: Optional[List[str]] = None
+    pattern: Optional[str] = None  # regular expression the whole value must match
+    references: Optional[str] = None  # "table.column" the value must exist in
+
 class SchemaColumn(BaseModel):
     name: str
     type: str
     description: Optional[str] = None
     required: bool = True
+    checks: Optional[ColumnChecks] = None
 
 class ProjectSchema(BaseModel):
     name: str = "projects"
     columns: List[SchemaColumn]
     description: Optional[str] = None
 
-# Cache for the schema
-_schema_cache = None
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker rejects a call to the onto server."""
+
+
+class CircuitBreaker:
+    """Circuit breaker guarding calls to the onto server.
+
+    Closed: calls pass through and consecutive failures are counted.
+    Open: after ``failure_threshold`` failures calls are rejected immediately
+    for ``recovery_timeout`` seconds.
+    Half-open: once the timeout elapses a single probe call is let through;
+    success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self.opened_at >= self.recovery_timeout
+        ):
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def before_call(self):
+        """Reserve a call, raising CircuitOpenError if it must be rejected."""
+        state = self.state
+        if state == self.OPEN:
+            raise CircuitOpenError("Onto server circuit is open")
+        if state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                raise CircuitOpenError("Onto server circuit is half-open, probing")
+            self._probe_in_flight = True
+
+    def record_success(self):
+        if self._state != self.CLOSED:
+            logger.info("Onto server circuit closed")
+        self.failures = 0
+        self._state = self.CLOSED
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                logger.warning(
+                    "Onto server circuit opened after %s failures", self.failures
+                )
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+@dataclass
+class _CachedSchema:
+    schema: ProjectSchema
+    etag: Optional[str]
+    fetched_at: float
+
+
+class SchemaRegistryClient:
+    """Caching client for the onto server schema registry.
+
+    Schemas are cached per schema ID. Within ``ttl`` seconds the cached schema
+    is served as is; between ``ttl`` and ``stale_ttl`` it is still served while
+    a background task revalidates it (stale-while-revalidate); beyond that the
+    caller waits for a refresh. Refreshes are conditional (``If-None-Match``),
+    go through one keep-alive HTTP client and a circuit breaker, and fall back to
+    the last known schema, then to the mock responses.
+    """
+
+    def __init__(
+        self,
+        base_url: str = ONTO_SERVER_URL,
+        timeout: float = ONTO_SERVER_TIMEOUT,
+        ttl: float = ONTO_SCHEMA_TTL,
+        stale_ttl: float = ONTO_SCHEMA_STALE_TTL,
+        use_mock: bool = USE_MOCK,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.use_mock = use_mock
+        self.breaker = breaker or CircuitBreaker(
+            ONTO_BREAKER_FAILURES, ONTO_BREAKER_RECOVERY
+        )
+        self._client = None
+        self._cache: Dict[str, _CachedSchema] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    @property
+    def client(self):
+        """Shared keep-alive HTTP client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            # Imported on first real fetch; mock mode never pays for httpx
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_keepalive_connections=5, keepalive_expiry=60),
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the shared HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def invalidate(self, schema_id: Optional[str] = None):
+        """Drop one cached schema, or all of them."""
+        if schema_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(schema_id, None)
+
+    async def get_schema(self, schema_id: str) -> ProjectSchema:
+        """Return a schema, refreshing it according to its age."""
+        if self.use_mock:
+            cached = self._cache.get(schema_id)
+            if cached is None:
+                logger.debug("Using mock response for schema: %s", schema_id)
+                schema = ProjectSchema(**get_mock_response(schema_id))
+                cached = _CachedSchema(schema, None, time.monotonic())
+                self._cache[schema_id] = cached
+            return cached.schema
+
+        cached = self._cache.get(schema_id)
+        if cached is not None:
+            age = time.monotonic() - cached.fetched_at
+            if age < self.ttl:
+                return cached.schema
+            if age < self.stale_ttl:
+                self._schedule_refresh(schema_id)
+                return cached.schema
+
+        return await self._refresh(schema_id)
+
+    def _schedule_refresh(self, schema_id: str):
+        """Start a background revalidation unless one is already running."""
+        task = self._refreshing.get(schema_id)
+        if task is not None and not task.done():
+            return
+        task = asyncio.create_task(self._refresh(schema_id))
+        self._refreshing[schema_id] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(schema_id, None))
+
+    async def _refresh(self, schema_id: str) -> ProjectSchema:
+        """Fetch a schema, falling back to the cached or mock version on failure."""
+        cached = self._cache.get(schema_id)
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError as e:
+            logger.debug("Skipping schema fetch for %s: %s", schema_id, e)
+            return self._fallback(schema_id, cached)
+
+        headers = {"If-None-Match": cached.etag} if cached and cached.etag else {}
+        try:
+            response = await self.client.get(f"/schemas/{schema_id}", headers=headers)
+            if response.status_code == 304 and cached is not None:
+                cached.fetched_at = time.monotonic()
+                self.breaker.record_success()
+                return cached.schema
+            response.raise_for_status()
+            schema = ProjectSchema(**response.json())
+        except Exception as e:
+            self.breaker.record_failure()
+            logger.error("Failed to fetch schema from onto server: %s", e)
+            return self._fallback(schema_id, cached)
+
+        self.breaker.record_success()
+        if cached is not None and cached.schema == schema:
+            schema = cached.schema  # keep identity so compiled artifacts stay valid
+        self._cache[schema_id] = _CachedSchema(
+            schema, response.headers.get("ETag"), time.monotonic()
+        )
+        return schema
+
+    def _fallback(
+        self, schema_id: str, cached: Optional[_CachedSchema]
+    ) -> ProjectSchema:
+        if cached is not None:
+            return cached.schema
+        schema = ProjectSchema(**get_mock_response(schema_id))
+        # Cache the mock briefly so an outage does not hit the breaker per request
+        self._cache[schema_id] = _CachedSchema(
+            schema, None, time.monotonic() - self.ttl
+        )
+        return schema
+
+    async def check_health(self) -> bool:
+        """Check if the onto server is available."""
+        if self.use_mock:
+            return True
+
+        try:
+            response = await self.client.get("/health")
+            return response.status_code == 200
+        except Exception as e:
+            logger.error("Onto server health check failed: %s", e)
+            return False
+
+
+# Shared registry client
+schema_registry = SchemaRegistryClient()
 
 async def fetch_schema_from_server(schema_id: str) -> dict:
     """Fetch schema from the onto server"""
-    if USE_MOCK:
-        logger.debug(f"Using mock response for schema: {schema_id}")
-        return get_mock_response(schema_id)
-        
-    try:
-        async with httpx.AsyncClient(timeout=ONTO_SERVER_TIMEOUT) as client:
-            response = await client.get(f"{ONTO_SERVER_URL}/schemas/{schema_id}")
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPError as e:
-        logger.error(f"Failed to fetch schema from onto server: {str(e)}")
-        return get_mock_response(schema_id)  # Fallback to mock
-    except Exception as e:
-        logger.error(f"Unexpected error fetching schema: {str(e)}")
-        return get_mock_response(schema_id)  # Fallback to mock
+    schema = await schema_registry.get_schema(schema_id)
+    return schema.model_dump()
 
 async def get_project_schema_jsonld() -> ProjectSchema:
     """Get the project schema definition with DuckDB compatible types"""
-    global _schema_cache
-    
-    if _schema_cache is None:
-        try:
-            schema_data = await fetch_schema_from_server("project_schema")
-            _schema_cache = ProjectSchema(**schema_data)
-        except Exception as e:
-            logger.error(f"Error getting project schema: {str(e)}")
-            _schema_cache = ProjectSchema(**get_mock_response("project_schema"))
-    
-    return _schema_cache
+    try:
+        return await schema_registry.get_schema("project_schema")
+    except Exception as e:
+        logger.error("Error getting project schema: %s", e)
+        return ProjectSchema(**get_mock_response("project_schema"))
+
+@lru_cache(maxsize=None)
+def _mock_column_names(required_only: bool) -> tuple:
+    schema = get_mock_response("project_schema")
+    return tuple(
+        col["name"] for col in schema["columns"] if col["required"] or not required_only
+    )
 
 def get_schema_columns() -> List[str]:
     """Helper function to get list of column names"""
-    schema = get_mock_response("project_schema")
-    return [col["name"] for col in schema["columns"]]
+    return list(_mock_column_names(False))
 
 def get_required_columns() -> List[str]:
     """Helper function to get list of required column names"""
-    schema = get_mock_response("project_schema")
-    return [col["name"] for col in schema["columns"] if col["required"]]
+    return list(_mock_column_names(True))
 
 # Health check for onto server
 async def check_onto_server_health() -> bool:
     """Check if the onto server is available"""
-    if USE_MOCK:
-        return True
-        
-    try:
-        async with httpx.AsyncClient(timeout=ONTO_SERVER_TIMEOUT) as client:
-            response = await client.get(f"{ONTO_SERVER_URL}/health")
-            return response.status_code == 200
-    except Exception as e:
-        logger.error(f"Onto server health check failed: {str(e)}")
-        return False
+    return await schema_registry.check_health()
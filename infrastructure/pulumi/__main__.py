@@ -151,7 +151,7 @@ api_container = docker.Container("duckdb-spawn-api",
         "DATABASE_URL=/app/data/duckdb_spawn.db"
     ],
     healthcheck=docker.ContainerHealthcheckArgs(
-        tests=["CMD", "curl", "-f", "http://localhost:8000/health"],
+        tests=["CMD", "curl", "-f", "http://localhost:8000/health/live"],
         interval="30s",
         timeout="10s",
         retries=3,
@@ -1,16 +1,46 @@
-"""JWT authentication handler module."""
+"""JWT authentication handler module.
 
+Bearer tokens are verified once and then served from a bounded LRU cache of
+verified payloads, keyed by the SHA-256 digest of the token, so clients that
+send the same token on every request pay a hash lookup instead of an HMAC
+verification and JSON decode. A cached entry never outlives the token's
+``exp`` claim; tokens without one are kept for ``JWT_CACHE_TTL`` seconds.
+"""
+
+import hashlib
+import heapq
+import logging
 import os
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
-from fastapi import HTTPException, Request
 from jose import JWTError, jwt
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+from ..utils.metrics import jwt_cache_counter, jwt_cache_size_gauge
+
+logger = logging.getLogger("data_product")
 
 # Configuration
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+AUTH_ENABLED = os.getenv("AUTH_ENABLED", "false").lower() == "true"
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))  # verified tokens
+JWT_CACHE_TTL = float(os.getenv("JWT_CACHE_TTL", "300"))  # seconds, tokens w/o exp
+
+# Paths served without a token, with everything below them: API docs and probes
+PUBLIC_PATHS = (
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    "/health",
+    "/monitoring/health",
+    "/monitoring/metrics",
+)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -24,21 +54,174 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-async def auth_middleware(request: Request, call_next):
-    """Middleware to handle JWT authentication."""
-    if request.url.path.startswith("/docs") or request.url.path.startswith("/openapi"):
-        return await call_next(request)
+class VerifiedTokenCache:
+    """Bounded LRU cache of verified token payloads.
+
+    Expired entries are dropped on lookup and, through a min-heap of expiry
+    times, before anything is evicted for space.
+    """
+
+    def __init__(self, maxsize: int = JWT_CACHE_SIZE, ttl: float = JWT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = (
+            OrderedDict()
+        )
+        self._expiries = []  # (expires_at, digest) heap
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload of a previously verified token."""
+        digest = self._digest(token)
+        entry = self._entries.get(digest)
+        if entry is not None and entry[1] <= time.time():
+            del self._entries[digest]
+            self.expirations += 1
+            jwt_cache_counter.labels("expired").inc()
+            entry = None
+        if entry is None:
+            self.misses += 1
+            jwt_cache_counter.labels("miss").inc()
+            return None
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        jwt_cache_counter.labels("hit").inc()
+        return entry[0]
+
+    def put(self, token: str, payload: Dict[str, Any]):
+        """Cache a verified payload until its ``exp`` claim."""
+        now = time.time()
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            expires_at = now + self.ttl
+        if expires_at <= now or self.maxsize <= 0:
+            return
+        digest = self._digest(token)
+        self._purge_expired(now)
+        self._entries[digest] = (payload, expires_at)
+        self._entries.move_to_end(digest)
+        heapq.heappush(self._expiries, (expires_at, digest))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+            jwt_cache_counter.labels("evicted").inc()
+        if len(self._expiries) > 2 * self.maxsize:
+            # Drop heap entries of evicted or replaced tokens
+            self._expiries = [
+                (exp, d)
+                for exp, d in self._expiries
+                if d in self._entries and self._entries[d][1] == exp
+            ]
+            heapq.heapify(self._expiries)
+        jwt_cache_size_gauge.set(len(self._entries))
+
+    def _purge_expired(self, now: float):
+        while self._expiries and self._expiries[0][0] <= now:
+            expires_at, digest = heapq.heappop(self._expiries)
+            entry = self._entries.get(digest)
+            if entry is not None and entry[1] == expires_at:
+                del self._entries[digest]
+                self.expirations += 1
+                jwt_cache_counter.labels("expired").inc()
+
+    def clear(self):
+        self._entries.clear()
+        self._expiries.clear()
+        jwt_cache_size_gauge.set(0)
+
+    def stats(self) -> dict:
+        """Snapshot of cache occupancy and effectiveness."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+        }
 
-    try:
-        token = request.headers.get("Authorization", "").replace("Bearer ", "")
-        if not token:
-            raise HTTPException(
-                status_code=401, detail="No authorization token provided"
-            )
 
+# Shared by the middleware and the monitoring endpoint
+token_cache = VerifiedTokenCache()
+
+
+def verify_token(token: str, cache: VerifiedTokenCache = token_cache) -> dict:
+    """Return the payload of a valid token, verifying it only on a cache miss.
+
+    Raises:
+        JWTError: If the token is malformed, badly signed or expired
+    """
+    payload = cache.get(token)
+    if payload is None:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        request.state.user = payload
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid authentication token")
+        cache.put(token, payload)
+    return payload
+
+
+class AuthMiddleware:
+    """ASGI middleware requiring a valid bearer token outside public paths.
+
+    The verified payload is available to endpoints as ``request.state.user``.
+    """
+
+    def __init__(
+        self,
+        app,
+        cache: VerifiedTokenCache = token_cache,
+        enabled: bool = AUTH_ENABLED,
+        public_paths: Tuple[str, ...] = PUBLIC_PATHS,
+    ):
+        self.app = app
+        self.cache = cache
+        self.enabled = enabled
+        self.public_paths = public_paths
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not self.enabled
+            or scope["method"] == "OPTIONS"
+            or self._is_public(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        authorization = Headers(scope=scope).get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            await self._reject("No authorization token provided")(scope, receive, send)
+            return
+
+        try:
+            payload = verify_token(token, self.cache)
+        except JWTError as e:
+            logger.warning("Rejected authentication token: %s", e)
+            await self._reject("Invalid authentication token")(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})["user"] = payload
+        await self.app(scope, receive, send)
+
+    def _is_public(self, path: str) -> bool:
+        """Whether ``path`` is a public path or one of its sub-paths."""
+        return any(
+            path == public or path.startswith(public + "/")
+            for public in self.public_paths
+        )
 
-    return await call_next(request)
+    @staticmethod
+    def _reject(detail: str) -> JSONResponse:
+        return JSONResponse(
+            {"detail": detail},
+            status_code=401,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -0,0 +1,626 @@
+"""Physical-design recommendations from the captured query workload.
+
+``WorkloadAdvisor.analyze`` flushes the recorder and derives candidates from
+the read fingerprints called at least ``WORKLOAD_MIN_CALLS`` times:
+
+- ``index``: an equality or ``IN`` filter on a column without a
+  single-column index or key
+- ``cluster``: a range filter; the table is rewritten ordered by the column
+  so DuckDB's per-row-group min/max statistics skip more of it. Tables
+  referenced by foreign keys cannot be rewritten and are left out.
+- ``cache``: the read fingerprints with the most total time. They are
+  advisory, and their benefit is an upper bound: every call a cache hit.
+
+Filters on a view count for the single base table it reads, e.g.
+``projects_all`` for ``projects``. Index and clustering candidates are
+measured by replaying the sample statement of every affected fingerprint on
+a scratch database restored from a snapshot, first as is and then inside a
+rolled-back transaction that applies the candidate. The estimated benefit is
+the time saved per call times the recorded calls; candidates saving less
+than ``WORKLOAD_MIN_BENEFIT_MS`` are dropped.
+
+Recommendations are stored as ``proposed`` and only change the live
+database when applied through the admin endpoint.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import duckdb
+
+from .backup import SnapshotManager
+from .connection_manager import DuckDBConnectionManager
+from .workload import (
+    RECOMMENDATIONS_TABLE,
+    WORKLOAD_TABLE,
+    decode_params,
+    relations,
+    workload_recorder,
+)
+
+logger = logging.getLogger("data_product")
+
+# Configuration
+WORKLOAD_FLUSH_INTERVAL = int(
+    os.getenv("WORKLOAD_FLUSH_INTERVAL", "60")
+)  # seconds, 0 disables
+WORKLOAD_ANALYZE_INTERVAL = int(
+    os.getenv("WORKLOAD_ANALYZE_INTERVAL", "0")
+)  # seconds, 0 disables
+WORKLOAD_MIN_CALLS = int(os.getenv("WORKLOAD_MIN_CALLS", "10"))
+WORKLOAD_MIN_BENEFIT_MS = float(os.getenv("WORKLOAD_MIN_BENEFIT_MS", "100"))
+WORKLOAD_REPLAY_RUNS = int(os.getenv("WORKLOAD_REPLAY_RUNS", "3"))
+WORKLOAD_CACHE_CANDIDATES = int(os.getenv("WORKLOAD_CACHE_CANDIDATES", "5"))
+
+_EQUALITY = {"=", "IN"}
+_RANGE = {"<", ">", "<=", ">=", "BETWEEN"}
+_INDEX_COLUMN = re.compile(r"\bON\s+\"?\w+\"?\s*\(\s*\"?(\w+)\"?\s*\)", re.I)
+_REFERENCES = re.compile(r"REFERENCES\s+\"?(\w+)\"?", re.I)
+
+
+class RecommendationError(Exception):
+    """Raised when a recommendation cannot be applied."""
+
+
+@dataclass
+class Candidate:
+    """A physical-design change and the fingerprints it may speed up."""
+
+    kind: str
+    table: Optional[str]
+    column: Optional[str]
+    fingerprints: List[str] = field(default_factory=list)
+
+    @property
+    def recommendation_id(self) -> str:
+        if self.kind == "cache":
+            return f"cache-{self.fingerprints[0]}"
+        return f"{self.kind}-{self.table}-{self.column}"
+
+    @property
+    def action(self) -> str:
+        if self.kind == "index":
+            return (
+                f"CREATE INDEX IF NOT EXISTS {self.table}_{self.column}_idx "
+                f"ON {self.table} ({self.column})"
+            )
+        if self.kind == "cluster":
+            return f"rewrite {self.table} ordered by {self.column}"
+        return f"cache results of fingerprint {self.fingerprints[0]}"
+
+
+def catalog(conn: duckdb.DuckDBPyConnection) -> Dict[str, Any]:
+    """Base tables, their columns, indexed columns, views and FK targets."""
+    tables = dict(
+        conn.execute(
+            """
+            SELECT table_name, sql FROM duckdb_tables()
+            WHERE schema_name = 'main' AND NOT temporary
+            """
+        ).fetchall()
+    )
+    columns: Dict[str, set] = {}
+    for table, column in conn.execute(
+        """
+        SELECT table_name, column_name FROM duckdb_columns()
+        WHERE schema_name = 'main'
+        """
+    ).fetchall():
+        columns.setdefault(table, set()).add(column)
+
+    views = {}
+    for view, sql in conn.execute(
+        """
+        SELECT view_name, sql FROM duckdb_views()
+        WHERE schema_name = 'main' AND NOT internal AND NOT temporary
+        """
+    ).fetchall():
+        bases = {name for name, _ in relations(sql) if name in tables}
+        if len(bases) == 1:
+            views[view] = bases.pop()
+
+    index_sql = [
+        (table, sql)
+        for table, sql in conn.execute(
+            "SELECT table_name, sql FROM duckdb_indexes() WHERE sql IS NOT NULL"
+        ).fetchall()
+    ]
+    indexed = {
+        (table, match.group(1).lower())
+        for table, sql in index_sql
+        if (match := _INDEX_COLUMN.search(sql))
+    }
+    indexed |= {
+        (table, names[0])
+        for table, names in conn.execute(
+            """
+            SELECT table_name, constraint_column_names FROM duckdb_constraints()
+            WHERE constraint_type IN ('PRIMARY KEY', 'UNIQUE')
+            """
+        ).fetchall()
+        if len(names) == 1
+    }
+    return {
+        "tables": tables,
+        "columns": columns,
+        "views": views,
+        "indexed": indexed,
+        "indexes": [sql for _, sql in index_sql],
+        "referenced": {
+            name for sql in tables.values() for name in _REFERENCES.findall(sql)
+        },
+    }
+
+
+def candidates(
+    workload: List[Dict[str, Any]], schema: Dict[str, Any]
+) -> List[Candidate]:
+    """Index and clustering candidates from the predicates of a workload.
+
+    Args:
+        workload: Rows of ``query_workload`` with ``fingerprint``, ``tables``
+            and ``predicates``
+        schema: Result of ``catalog``
+    """
+    found: Dict[tuple, Candidate] = {}
+    for row in workload:
+        read = [schema["views"].get(t, t) for t in row["tables"] or []]
+        for predicate in row["predicates"] or []:
+            target, op = predicate.rsplit(" ", 1)
+            table, column = target.split(".", 1)
+            if table:
+                table = schema["views"].get(table, table)
+            else:
+                owners = {t for t in read if column in schema["columns"].get(t, ())}
+                if len(owners) != 1:
+                    continue
+                table = owners.pop()
+            if table not in schema["tables"] or column not in schema["columns"][table]:
+                continue
+            if op in _EQUALITY and (table, column) not in schema["indexed"]:
+                kind = "index"
+            elif op in _RANGE and table not in schema["referenced"]:
+                kind = "cluster"
+            else:
+                continue
+            candidate = found.setdefault(
+                (kind, table, column), Candidate(kind, table, column)
+            )
+            if row["fingerprint"] not in candidate.fingerprints:
+                candidate.fingerprints.append(row["fingerprint"])
+    return list(found.values())
+
+
+def recluster(conn: duckdb.DuckDBPyConnection, table: str, column: str):
+    """Rewrite ``table`` ordered by ``column``, keeping its DDL and indexes.
+
+    DuckDB cannot delete and re-insert the same keys in one transaction, so
+    the rows go to a copy that replaces the table. Runs inside the caller's
+    transaction; fails if another table references ``table``.
+    """
+    ddl = conn.execute(
+        "SELECT sql FROM duckdb_tables() WHERE table_name = ? AND schema_name = 'main'",
+        (table,),
+    ).fetchone()[0]
+    indexes = conn.execute(
+        "SELECT sql FROM duckdb_indexes() WHERE table_name = ? AND sql IS NOT NULL",
+        (table,),
+    ).fetchall()
+    staging = f"{table}__clustered"
+    conn.execute(
+        re.sub(rf"^CREATE TABLE {table}\b", f"CREATE TABLE {staging}", ddl, count=1)
+    )
+    conn.execute(f"INSERT INTO {staging} SELECT * FROM {table} ORDER BY {column}")
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+    for (sql,) in indexes:
+        conn.execute(sql)
+
+
+def replay_ms(
+    conn: duckdb.DuckDBPyConnection,
+    sql: str,
+    params: Any,
+    runs: int = WORKLOAD_REPLAY_RUNS,
+) -> float:
+    """Fastest of ``runs`` executions of a statement, in milliseconds."""
+    timings = []
+    for _ in range(max(runs, 1)):
+        started = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def select_proposals(
+    evaluated: List[Dict[str, Any]], workload: List[Dict[str, Any]], applied: set
+) -> List[Dict[str, Any]]:
+    """Evaluated candidates worth proposing, plus the cache candidates.
+
+    Args:
+        evaluated: Replay results of the index and clustering candidates
+        workload: Analyzed ``query_workload`` rows, most total time first
+        applied: Ids of recommendations already applied
+    """
+    # One clustering order per table: keep the most beneficial
+    best: Dict[tuple, Dict[str, Any]] = {}
+    for result in evaluated:
+        candidate = result["candidate"]
+        key = (candidate.kind, candidate.table, candidate.column)
+        if candidate.kind == "cluster":
+            key = ("cluster", candidate.table)
+        if result["estimated_benefit_ms"] < WORKLOAD_MIN_BENEFIT_MS:
+            continue
+        if key not in best or (
+            result["estimated_benefit_ms"] > best[key]["estimated_benefit_ms"]
+        ):
+            best[key] = result
+    proposals = list(best.values())
+
+    for row in workload[:WORKLOAD_CACHE_CANDIDATES]:
+        candidate = Candidate("cache", None, None, [row["fingerprint"]])
+        if (
+            row["total_ms"] >= WORKLOAD_MIN_BENEFIT_MS
+            and candidate.recommendation_id not in applied
+        ):
+            proposals.append(
+                {
+                    "candidate": candidate,
+                    "fingerprints": candidate.fingerprints,
+                    "calls": row["calls"],
+                    "baseline_ms": round(row["total_ms"], 3),
+                    "estimated_ms": None,
+                    "estimated_benefit_ms": round(row["total_ms"], 3),
+                }
+            )
+    return proposals
+
+
+class WorkloadAdvisor:
+    """Stores the captured workload and turns it into recommendations."""
+
+    def __init__(self, conn_manager=None, recorder=None, snapshots=None):
+        """Initialize the advisor.
+
+        Args:
+            conn_manager: Object exposing ``get_connection()``; defaults to the
+                shared DuckDB connection manager
+            recorder: Workload recorder to flush; defaults to the shared one
+            snapshots: Snapshot manager providing the replay database
+        """
+        self.conn_manager = conn_manager or DuckDBConnectionManager()
+        self.recorder = recorder or workload_recorder
+        self.snapshots = snapshots or SnapshotManager(conn_manager=self.conn_manager)
+        self.last_analysis: Optional[Dict[str, Any]] = None
+
+    def flush(self) -> int:
+        """Write the recorded fingerprints to ``query_workload``."""
+        with self.conn_manager.get_connection() as conn:
+            return self.recorder.flush(conn)
+
+    def _rows(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        with self.conn_manager.get_connection() as conn:
+            cursor = conn.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def workload(self, limit: int = 50) -> Dict[str, Any]:
+        """Capture status and the fingerprints with the most total time."""
+        self.flush()
+        fingerprints = self._rows(
+            f"""
+            SELECT
+                fingerprint, statement, kind, tables, predicates, calls,
+                round(total_ms, 3) AS total_ms,
+                round(total_ms / calls, 3) AS mean_ms,
+                round(max_ms, 3) AS max_ms,
+                first_seen, last_seen
+            FROM {WORKLOAD_TABLE}
+            ORDER BY total_ms DESC
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        return {**self.status(), "fingerprints": fingerprints}
+
+    def _replay_database(self, snapshot_id: Optional[str]) -> Dict[str, Any]:
+        """Snapshot to replay against: the given one, the latest or a new one."""
+        if snapshot_id is None:
+            snapshots = self.snapshots.list_snapshots()
+            if snapshots:
+                snapshot_id = snapshots[0]["snapshot_id"]
+            else:
+                snapshot_id = self.snapshots.create_snapshot()["snapshot_id"]
+        return self.snapshots.load_manifest(snapshot_id)
+
+    def _evaluate(
+        self,
+        scratch: duckdb.DuckDBPyConnection,
+        found: List[Candidate],
+        workload: Dict[str, Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Replay the fingerprints of each candidate without and with it."""
+        baseline = {}
+        for fingerprint in {f for c in found for f in c.fingerprints}:
+            row = workload[fingerprint]
+            try:
+                baseline[fingerprint] = replay_ms(
+                    scratch, row["sample_sql"], decode_params(row["sample_params"])
+                )
+            except duckdb.Error as e:
+                logger.debug("Cannot replay fingerprint %s: %s", fingerprint, e)
+
+        evaluated = []
+        for candidate in found:
+            fingerprints = [f for f in candidate.fingerprints if f in baseline]
+            if not fingerprints:
+                continue
+            scratch.begin()
+            try:
+                if candidate.kind == "index":
+                    scratch.execute(candidate.action)
+                else:
+                    recluster(scratch, candidate.table, candidate.column)
+                after = {
+                    f: replay_ms(
+                        scratch,
+                        workload[f]["sample_sql"],
+                        decode_params(workload[f]["sample_params"]),
+                    )
+                    for f in fingerprints
+                }
+            except duckdb.Error as e:
+                logger.warning("Cannot evaluate %s: %s", candidate.recommendation_id, e)
+                continue
+            finally:
+                scratch.rollback()
+            calls = {f: workload[f]["calls"] for f in fingerprints}
+            baseline_ms = sum(baseline[f] * calls[f] for f in fingerprints)
+            estimated_ms = sum(after[f] * calls[f] for f in fingerprints)
+            evaluated.append(
+                {
+                    "candidate": candidate,
+                    "fingerprints": fingerprints,
+                    "calls": sum(calls.values()),
+                    "baseline_ms": round(baseline_ms, 3),
+                    "estimated_ms": round(estimated_ms, 3),
+                    "estimated_benefit_ms": round(baseline_ms - estimated_ms, 3),
+                }
+            )
+        return evaluated
+
+    def analyze(self, snapshot_id: Optional[str] = None) -> Dict[str, Any]:
+        """Recommend indexes, clustering keys and cache candidates.
+
+        Args:
+            snapshot_id: Snapshot to replay against; defaults to the latest,
+                taking one if there is none
+
+        Returns:
+            Analysis summary with the new proposed recommendations
+
+        Raises:
+            SnapshotNotFoundError: If ``snapshot_id`` does not exist
+        """
+        started = time.perf_counter()
+        self.flush()
+        rows = self._rows(
+            f"""
+            SELECT * FROM {WORKLOAD_TABLE}
+            WHERE calls >= ? AND kind IN ('SELECT', 'WITH')
+            ORDER BY total_ms DESC
+            """,
+            (WORKLOAD_MIN_CALLS,),
+        )
+        workload = {row["fingerprint"]: row for row in rows}
+        with self.conn_manager.get_connection() as conn:
+            schema = catalog(conn)
+            applied = {
+                rid
+                for rid, in conn.execute(
+                    f"""
+                    SELECT recommendation_id FROM {RECOMMENDATIONS_TABLE}
+                    WHERE status = 'applied'
+                    """
+                ).fetchall()
+            }
+        found = [
+            c for c in candidates(rows, schema) if c.recommendation_id not in applied
+        ]
+
+        evaluated = []
+        manifest = None
+        if found:
+            manifest = self._replay_database(snapshot_id)
+            scratch_dir = tempfile.mkdtemp(prefix="workload-")
+            try:
+                target = os.path.join(scratch_dir, "replay.db")
+                self.snapshots.restore_snapshot(manifest["snapshot_id"], target)
+                scratch = duckdb.connect(target)
+                try:
+                    for sql in schema["indexes"]:
+                        scratch.execute(sql)
+                    evaluated = self._evaluate(scratch, found, workload)
+                finally:
+                    scratch.close()
+            finally:
+                shutil.rmtree(scratch_dir, ignore_errors=True)
+
+        proposals = select_proposals(evaluated, rows, applied)
+
+        now = datetime.now()
+        snapshot = manifest["snapshot_id"] if manifest else None
+        with self.conn_manager.get_connection() as conn:
+            conn.begin()
+            try:
+                # Upsert, then drop stale proposals: DuckDB cannot delete and
+                # re-insert the same keys in one transaction
+                conn.executemany(
+                    f"""
+                    INSERT INTO {RECOMMENDATIONS_TABLE}
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'proposed', ?, NULL)
+                    ON CONFLICT (recommendation_id) DO UPDATE SET
+                        fingerprints = excluded.fingerprints,
+                        calls = excluded.calls,
+                        baseline_ms = excluded.baseline_ms,
+                        estimated_ms = excluded.estimated_ms,
+                        estimated_benefit_ms = excluded.estimated_benefit_ms,
+                        snapshot_id = excluded.snapshot_id,
+                        created_at = excluded.created_at
+                    """,
+                    [
+                        (
+                            p["candidate"].recommendation_id,
+                            p["candidate"].kind,
+                            p["candidate"].table,
+                            p["candidate"].column,
+                            p["candidate"].action,
+                            ",".join(p["fingerprints"]),
+                            p["calls"],
+                            p["baseline_ms"],
+                            p["estimated_ms"],
+                            p["estimated_benefit_ms"],
+                            snapshot,
+                            now,
+                        )
+                        for p in proposals
+                    ],
+                )
+                conn.execute(
+                    f"""
+                    DELETE FROM {RECOMMENDATIONS_TABLE}
+                    WHERE status = 'proposed' AND created_at < ?
+                    """,
+                    (now,),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        self.last_analysis = {
+            "analyzed_at": now,
+            "fingerprints": len(rows),
+            "candidates": len(found),
+            "evaluated": len(evaluated),
+            "snapshot_id": snapshot,
+            "duration_seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info(
+            "Workload analysis proposed %s recommendations from %s fingerprints",
+            len(proposals),
+            len(rows),
+        )
+        return {**self.last_analysis, "recommendations": self.recommendations()}
+
+    def recommendations(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Stored recommendations, most beneficial first."""
+        where = "WHERE status = ?" if status else ""
+        return self._rows(
+            f"""
+            SELECT * REPLACE (string_split(fingerprints, ',') AS fingerprints)
+            FROM {RECOMMENDATIONS_TABLE} {where}
+            ORDER BY estimated_benefit_ms DESC, recommendation_id
+            """,
+            (status,) if status else (),
+        )
+
+    def apply(self, recommendation_id: str) -> Dict[str, Any]:
+        """Apply a proposed index or clustering recommendation.
+
+        Raises:
+            LookupError: If the recommendation does not exist
+            RecommendationError: If it is advisory, already applied or its
+                table is referenced by a foreign key
+        """
+        with self.conn_manager.get_connection() as conn:
+            row = conn.execute(
+                f"""
+                SELECT kind, table_name, column_name, action, status
+                FROM {RECOMMENDATIONS_TABLE} WHERE recommendation_id = ?
+                """,
+                (recommendation_id,),
+            ).fetchone()
+            referenced = catalog(conn)["referenced"]
+        if row is None:
+            raise LookupError(f"Recommendation {recommendation_id} not found")
+        kind, table, column, action, status = row
+        if status == "applied":
+            raise RecommendationError(
+                f"Recommendation {recommendation_id} is already applied"
+            )
+        if kind == "cache":
+            raise RecommendationError(
+                "Cache recommendations are advisory and cannot be applied"
+            )
+        if kind == "cluster" and table in referenced:
+            raise RecommendationError(f"Table {table} is referenced by a foreign key")
+
+        with self.conn_manager.get_connection() as conn:
+            conn.begin()
+            try:
+                if kind == "index":
+                    conn.execute(action)
+                else:
+                    recluster(conn, table, column)
+                conn.execute(
+                    f"""
+                    UPDATE {RECOMMENDATIONS_TABLE}
+                    SET status = 'applied', applied_at = ?
+                    WHERE recommendation_id = ?
+                    """,
+                    (datetime.now(), recommendation_id),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            if kind == "cluster":
+                conn.execute("CHECKPOINT")
+        logger.info("Applied recommendation %s: %s", recommendation_id, action)
+        return self._rows(
+            f"""
+            SELECT * REPLACE (string_split(fingerprints, ',') AS fingerprints)
+            FROM {RECOMMENDATIONS_TABLE} WHERE recommendation_id = ?
+            """,
+            (recommendation_id,),
+        )[0]
+
+    def status(self) -> Dict[str, Any]:
+        """Capture state and the latest analysis."""
+        return {
+            "capture": self.recorder.enabled,
+            "pending_fingerprints": self.recorder.pending(),
+            "dropped_calls": self.recorder.dropped,
+            "last_analysis": self.last_analysis,
+        }
+
+    async def run_flush(self, interval: int = WORKLOAD_FLUSH_INTERVAL):
+        """Flush the recorded workload on a fixed interval until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.error("Workload flush failed: %s", e)
+
+    async def run_periodic(self, interval: int = WORKLOAD_ANALYZE_INTERVAL):
+        """Analyze the workload on a fixed interval until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.analyze)
+            except Exception as e:
+                logger.error("Scheduled workload analysis failed: %s", e)
+
+
+# Shared advisor, run periodically and from the admin endpoints
+workload_advisor = WorkloadAdvisor()
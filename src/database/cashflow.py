@@ -0,0 +1,156 @@
+"""Portfolio cash-flow projection.
+
+Builds the debt-service schedule of every project allocated to a portfolio
+and aggregates it per period in a single DuckDB query: project periods are
+generated by joining each loan with ``range()``, and balances come from the
+closed-form amortization formulas, so no schedule is ever iterated row by
+row in Python. Per project:
+
+- principal: ``total_amount`` times the portfolio's ``allocation_percentage``
+- periodic rate: ``expected_tri`` divided by the periods per year
+- term: ``maturity_years`` periods per year, the first payment one period
+  after ``creation_date``
+- ``annuity`` amortization pays a level instalment, ``linear`` a constant
+  share of principal plus interest on the outstanding balance
+- CFADS (cash flow available for debt service) is debt service times ``dscr``
+
+Each period is one calendar bucket (year, quarter or month), and every live
+loan pays exactly once per bucket, so ``outstanding`` is the portfolio's
+closing balance for that period.
+"""
+
+from datetime import date
+from typing import Optional
+
+import duckdb
+
+# Months per period
+FREQUENCIES = {"annual": 12, "quarterly": 3, "monthly": 1}
+AMORTIZATIONS = ("annuity", "linear")
+
+PERIOD_COLUMNS = (
+    "period",
+    "projects",
+    "interest",
+    "principal",
+    "debt_service",
+    "cfads",
+    "outstanding",
+)
+
+
+def _schedule_terms(amortization: str) -> str:
+    """SQL for opening balance and principal repaid in period ``k``."""
+    if amortization == "linear":
+        return """
+            principal * (1 - (k - 1) / periods) AS opening,
+            principal / periods AS repaid
+        """
+    # Level instalment: opening = P(1+i)^(k-1) - A((1+i)^(k-1) - 1) / i
+    return """
+            CASE WHEN rate = 0 THEN principal * (1 - (k - 1) / periods)
+                 ELSE principal * exp((k - 1) * growth)
+                      - instalment * (exp((k - 1) * growth) - 1) / rate
+            END AS opening,
+            instalment - rate * opening AS repaid
+    """
+
+
+def projection_sql(source: str, frequency: str, amortization: str) -> str:
+    """Query aggregating the schedules of portfolio ``?`` per period.
+
+    Optional ``?`` bounds on the period date follow the portfolio id; pass
+    NULL for an open bound.
+    """
+    months = FREQUENCIES[frequency]
+    return f"""
+        WITH loans AS (
+            SELECT
+                p.total_amount::DOUBLE * a.allocation_percentage::DOUBLE / 100
+                    AS principal,
+                p.expected_tri::DOUBLE / 100 * {months} / 12 AS rate,
+                p.maturity_years * {12 // months} AS periods,
+                p.dscr::DOUBLE AS dscr,
+                -- Calendar bucket of the origination date, in periods since year 0
+                (year(p.creation_date) * 12 + month(p.creation_date) - 1)
+                    // {months} AS origin
+            FROM portfolio_projects a
+            JOIN {source} p ON p.project_id = a.project_id
+            WHERE a.portfolio_id = ? AND p.maturity_years > 0
+        ),
+        annuities AS (
+            SELECT
+                *,
+                ln(1 + rate) AS growth,
+                CASE WHEN rate = 0 THEN principal / periods
+                     ELSE principal * rate / (1 - pow(1 + rate, -periods))
+                END AS instalment
+            FROM loans
+        ),
+        terms AS (
+            SELECT unnest(range(1, max(periods) + 1)) AS k FROM loans
+        ),
+        schedule AS (
+            SELECT
+                origin + k AS bucket,
+                dscr,
+                rate,
+                {_schedule_terms(amortization)}
+            FROM annuities JOIN terms ON k <= periods
+        ),
+        buckets AS (
+            SELECT
+                bucket,
+                count(*) AS projects,
+                sum(opening * rate) AS interest,
+                sum(repaid) AS principal,
+                sum((opening * rate + repaid) * dscr) AS cfads,
+                sum(opening - repaid) AS outstanding
+            FROM schedule
+            GROUP BY bucket
+        )
+        SELECT * FROM (
+            SELECT
+                make_date(
+                    (bucket * {months} // 12)::BIGINT,
+                    (bucket * {months} % 12 + 1)::BIGINT,
+                    1
+                ) AS period,
+                projects,
+                round(interest, 2) AS interest,
+                round(principal, 2) AS principal,
+                round(interest + principal, 2) AS debt_service,
+                round(cfads, 2) AS cfads,
+                round(greatest(outstanding, 0), 2) AS outstanding
+            FROM buckets
+        )
+        WHERE (?::DATE IS NULL OR period >= ?::DATE)
+          AND (?::DATE IS NULL OR period <= ?::DATE)
+        ORDER BY period
+    """
+
+
+def project_portfolio(
+    conn: duckdb.DuckDBPyConnection,
+    portfolio_id: str,
+    frequency: str = "annual",
+    amortization: str = "annuity",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    source: str = "projects",
+) -> duckdb.DuckDBPyConnection:
+    """Run the projection of a portfolio and return the cursor.
+
+    The caller fetches rows (``PERIOD_COLUMNS``) or an Arrow table from it.
+
+    Raises:
+        ValueError: If ``frequency`` or ``amortization`` is unknown
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency: {frequency}")
+    if amortization not in AMORTIZATIONS:
+        raise ValueError(f"Unknown amortization: {amortization}")
+    return conn.execute(
+        projection_sql(source, frequency, amortization),
+        (portfolio_id, start, start, end, end),
+    )
@@ -0,0 +1,302 @@
+"""Change data capture (CDC) module.
+
+Every write path appends a compact, sequence-numbered row to the ``change_log``
+table inside the same transaction as the data change. Downstream data products
+read the log incrementally with ``since=<seq>`` instead of polling whole tables,
+which realizes the event-driven integration described in the architecture docs.
+
+Sequence numbers come from ``nextval`` when a change is appended, before its
+transaction commits. Writers hold ``commit_lock`` from ``begin`` to ``commit``,
+so changes become visible in sequence order and a consumer that has read past
+seq N never misses a lower seq committed later. Rolled-back writes leave gaps.
+
+The log is bounded by a retention window: rows older than
+``CHANGE_LOG_RETENTION_HOURS`` are truncated periodically and the highest
+truncated sequence number is stored in ``change_log_truncation``. Consumers
+whose cursor is behind it must resynchronize from a full read.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import duckdb
+
+from .connection_manager import DuckDBConnectionManager
+
+logger = logging.getLogger("data_product")
+
+# Configuration
+CHANGE_LOG_RETENTION_HOURS = int(os.getenv("CHANGE_LOG_RETENTION_HOURS", "72"))
+CHANGE_LOG_TRUNCATE_INTERVAL = int(
+    os.getenv("CHANGE_LOG_TRUNCATE_INTERVAL", "3600")
+)  # seconds
+
+
+class ChangeLogTruncatedError(Exception):
+    """Raised when a consumer asks for changes older than the retention window."""
+
+    def __init__(self, since: int, oldest_seq: int):
+        self.since = since
+        self.oldest_seq = oldest_seq
+        super().__init__(
+            f"Changes after seq {since} are no longer retained "
+            f"(oldest retained seq is {oldest_seq})"
+        )
+
+
+class ChangeLog:
+    """Sequence-numbered change log with long-poll notification support."""
+
+    def __init__(self, conn_manager=None):
+        """Initialize the change log.
+
+        Args:
+            conn_manager: Object exposing ``get_connection()``; defaults to the
+                shared DuckDB connection manager
+        """
+        self.conn_manager = conn_manager or DuckDBConnectionManager()
+        # Held by writers from begin to commit: commits follow sequence order
+        self.commit_lock = threading.Lock()
+        self._latest_seq: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event: Optional[asyncio.Event] = None
+
+    def append(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        table_name: str,
+        operation: str,
+        entity_id: str,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """Append a change on the caller's connection.
+
+        The caller owns the transaction, so the change row commits or rolls back
+        together with the data change it describes. The caller holds
+        ``commit_lock`` from ``begin`` until the commit, and calls ``publish``
+        with the returned sequence number once the transaction has committed.
+
+        Args:
+            conn: Connection holding the open write transaction
+            table_name: Name of the changed table
+            operation: Change type (INSERT, UPDATE, DELETE)
+            entity_id: Primary key of the changed row
+            payload: Changed column values
+
+        Returns:
+            Sequence number assigned to the change
+        """
+        row = conn.execute(
+            """
+            INSERT INTO change_log (
+                table_name, operation, entity_id, payload, changed_at
+            ) VALUES (?, ?, ?, ?, ?)
+            RETURNING seq
+            """,
+            (
+                table_name,
+                operation,
+                entity_id,
+                json.dumps(payload, default=str) if payload is not None else None,
+                datetime.now(),
+            ),
+        ).fetchone()
+        return row[0]
+
+    def append_query(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        table_name: str,
+        operation: str,
+        select_sql: str,
+        params: tuple = (),
+    ) -> Optional[int]:
+        """Append one change per row of a query on the caller's connection.
+
+        Args:
+            conn: Connection holding the open write transaction
+            table_name: Name of the changed table
+            operation: Change type (INSERT, UPDATE, DELETE)
+            select_sql: Query producing ``entity_id`` and JSON ``payload`` columns
+            params: Query parameters
+
+        Returns:
+            Highest sequence number assigned, or None if the query returned no rows
+        """
+        rows = conn.execute(
+            f"""
+            INSERT INTO change_log (
+                table_name, operation, entity_id, payload, changed_at
+            )
+            SELECT ?, ?, entity_id, payload, ?
+            FROM ({select_sql})
+            RETURNING seq
+            """,
+            (table_name, operation, datetime.now(), *params),
+        ).fetchall()
+        return max(seq for seq, in rows) if rows else None
+
+    def publish(self, seq: int):
+        """Record a committed sequence number and wake long-polling consumers.
+
+        Safe to call from any thread.
+        """
+        if self._latest_seq is None or seq > self._latest_seq:
+            self._latest_seq = seq
+
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        """Release current waiters and arm a fresh event for the next wait."""
+        if self._event is not None:
+            self._event.set()
+        self._event = asyncio.Event()
+
+    def latest_seq(self) -> int:
+        """Return the highest committed sequence number."""
+        if self._latest_seq is None:
+            with self.conn_manager.get_connection() as conn:
+                row = conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) FROM change_log"
+                ).fetchone()
+            self._latest_seq = row[0]
+        return self._latest_seq
+
+    def read_since(self, since: int, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Read changes with a sequence number greater than ``since``.
+
+        Args:
+            since: Last sequence number the consumer has processed
+            limit: Maximum number of changes to return
+
+        Returns:
+            List of change dictionaries ordered by sequence number
+
+        Raises:
+            ChangeLogTruncatedError: If changes after ``since`` were truncated
+        """
+        with self.conn_manager.get_connection() as conn:
+            truncated = conn.execute(
+                "SELECT COALESCE(MAX(truncated_seq), 0) FROM change_log_truncation"
+            ).fetchone()[0]
+            if since < truncated:
+                raise ChangeLogTruncatedError(since, truncated + 1)
+
+            rows = conn.execute(
+                """
+                SELECT seq, table_name, operation, entity_id, payload, changed_at
+                FROM change_log
+                WHERE seq > ?
+                ORDER BY seq
+                LIMIT ?
+                """,
+                (since, limit),
+            ).fetchall()
+
+        return [
+            {
+                "seq": seq,
+                "table": table_name,
+                "operation": operation,
+                "entity_id": entity_id,
+                "payload": json.loads(payload) if payload is not None else None,
+                "changed_at": changed_at.isoformat(),
+            }
+            for seq, table_name, operation, entity_id, payload, changed_at in rows
+        ]
+
+    async def wait_for_changes(self, since: int, timeout: float) -> bool:
+        """Wait until a change newer than ``since`` is committed.
+
+        Args:
+            since: Last sequence number the consumer has processed
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            True if newer changes are available, False on timeout
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop or self._event is None:
+            # Events are bound to the loop that first awaits them
+            self._loop = loop
+            self._event = asyncio.Event()
+
+        deadline = self._loop.time() + timeout
+        while self.latest_seq() <= since:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(self._event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    def truncate(self, retention: timedelta) -> int:
+        """Delete changes older than the retention window.
+
+        Deletes a prefix of the log, up to the newest change older than the
+        window, and records its sequence number as the truncation watermark.
+
+        Args:
+            retention: How long changes are kept
+
+        Returns:
+            Number of deleted changes
+        """
+        cutoff = datetime.now() - retention
+        with self.conn_manager.get_connection() as conn:
+            conn.begin()
+            try:
+                through = conn.execute(
+                    "SELECT MAX(seq) FROM change_log WHERE changed_at < ?", (cutoff,)
+                ).fetchone()[0]
+                deleted = 0
+                if through is not None:
+                    deleted = conn.execute(
+                        "DELETE FROM change_log WHERE seq <= ?", (through,)
+                    ).fetchone()[0]
+                    conn.execute("DELETE FROM change_log_truncation")
+                    conn.execute(
+                        "INSERT INTO change_log_truncation VALUES (?)", (through,)
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        if deleted:
+            logger.info(
+                "Truncated %s change log entries older than %s", deleted, cutoff
+            )
+        return deleted
+
+    async def run_retention(
+        self,
+        interval: int = CHANGE_LOG_TRUNCATE_INTERVAL,
+        retention_hours: int = CHANGE_LOG_RETENTION_HOURS,
+    ):
+        """Periodically truncate the change log until cancelled.
+
+        The first run is delayed briefly so it stays off the cold-start path.
+        """
+        retention = timedelta(hours=retention_hours)
+        delay = min(interval, 60)
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await asyncio.to_thread(self.truncate, retention)
+            except Exception as e:
+                logger.error("Change log truncation failed: %s", e)
+            delay = interval
+
+
+# Shared change log instance
+change_log = ChangeLog()
@@ -0,0 +1,221 @@
+"""Compiled schema artifacts.
+
+A ``ProjectSchema`` from the onto server is compiled once per schema version
+into a ``CompiledSchema``: column order, required-column mask, per-column type
+coercers and the SQL templates the routes execute. Routes then encode and
+decode rows with the artifact instead of walking ``schema.columns`` on every
+request. A new artifact is built only when the schema content changes.
+"""
+
+import hashlib
+import re
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from config.onto_server import ProjectSchema
+
+Coercer = Callable[[Any], Any]
+
+_DECIMAL = re.compile(r"(?:DECIMAL|NUMERIC)\s*\(\s*(\d+)\s*,\s*(\d+)\s*\)", re.I)
+_CHAR = re.compile(r"CHAR\s*\(\s*(\d+)\s*\)", re.I)
+
+
+def _uuid(value: Any) -> str:
+    return str(value if isinstance(value, uuid.UUID) else uuid.UUID(str(value)))
+
+
+def _date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def _timestamp(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _integer(value: Any) -> int:
+    result = int(value)
+    if isinstance(value, bool) or (isinstance(value, float) and result != value):
+        raise ValueError(f"not an integer: {value!r}")
+    return result
+
+
+def _decimal(precision: int, scale: int) -> Coercer:
+    quantum = Decimal(1).scaleb(-scale)
+    limit = Decimal(10) ** (precision - scale)
+
+    def coerce(value: Any) -> Decimal:
+        try:
+            result = Decimal(str(value)).quantize(quantum)
+        except InvalidOperation:
+            raise ValueError(f"not a DECIMAL({precision},{scale}): {value!r}")
+        if abs(result) >= limit:
+            raise ValueError(f"out of range for DECIMAL({precision},{scale})")
+        return result
+
+    return coerce
+
+
+def _char(length: int) -> Coercer:
+    def coerce(value: Any) -> str:
+        result = str(value)
+        if len(result) > length:
+            raise ValueError(f"longer than CHAR({length}): {value!r}")
+        return result
+
+    return coerce
+
+
+def coercer_for(column_type: str) -> Optional[Coercer]:
+    """Return the coercer for a DuckDB column type, or None to pass through."""
+    normalized = column_type.strip().upper()
+    decimal_match = _DECIMAL.fullmatch(normalized)
+    if decimal_match:
+        return _decimal(int(decimal_match.group(1)), int(decimal_match.group(2)))
+    char_match = _CHAR.fullmatch(normalized)
+    if char_match:
+        return _char(int(char_match.group(1)))
+    return {
+        "UUID": _uuid,
+        "DATE": _date,
+        "TIMESTAMP": _timestamp,
+        "INTEGER": _integer,
+        "BIGINT": _integer,
+        "VARCHAR": str,
+        "TEXT": str,
+    }.get(normalized)
+
+
+def schema_version(schema: ProjectSchema) -> str:
+    """Content hash identifying a schema version."""
+    return hashlib.sha256(schema.model_dump_json().encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class CompiledSchema:
+    """Per-schema-version artifact used on the request path."""
+
+    name: str
+    version: str
+    columns: Tuple[str, ...]
+    required_mask: Tuple[bool, ...]
+    coercers: Tuple[Optional[Coercer], ...]
+    select_list: str
+    insert_sql: str
+    create_table_sql: str
+
+    @classmethod
+    def compile(cls, schema: ProjectSchema) -> "CompiledSchema":
+        """Compile a schema into its artifact."""
+        columns = tuple(col.name for col in schema.columns)
+        select_list = ", ".join(columns)
+        placeholders = ", ".join("?" for _ in columns)
+        columns_def = ",\n".join(
+            f"{col.name} {col.type} {'NOT NULL' if col.required else ''}".strip()
+            for col in schema.columns
+        )
+        return cls(
+            name=schema.name,
+            version=schema_version(schema),
+            columns=columns,
+            required_mask=tuple(col.required for col in schema.columns),
+            coercers=tuple(coercer_for(col.type) for col in schema.columns),
+            select_list=select_list,
+            insert_sql=(
+                f"INSERT INTO {schema.name} ({select_list}) VALUES ({placeholders})"
+            ),
+            create_table_sql=(
+                f"CREATE TABLE IF NOT EXISTS {schema.name} (\n{columns_def}\n);"
+            ),
+        )
+
+    def encode_row(self, values: Mapping[str, Any]) -> tuple:
+        """Encode a row into INSERT parameter order, validating and coercing.
+
+        Raises:
+            ValueError: If a required value is missing or a value does not
+                fit its column type
+        """
+        row = []
+        for column, required, coerce in zip(
+            self.columns, self.required_mask, self.coercers
+        ):
+            value = values.get(column)
+            if value is None:
+                if required:
+                    raise ValueError(f"Missing required field: {column}")
+            elif coerce is not None:
+                try:
+                    value = coerce(value)
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"Invalid value for {column}: {str(e)}")
+            row.append(value)
+        return tuple(row)
+
+    def decode_rows(
+        self, rows: Iterable[tuple], extra: Sequence[str] = ()
+    ) -> List[Dict[str, Any]]:
+        """Turn fetched rows into dictionaries keyed by column name.
+
+        ``extra`` names the columns selected after the schema columns.
+        """
+        columns = self.columns + tuple(extra)
+        return [dict(zip(columns, row)) for row in rows]
+
+    def select_sql(
+        self,
+        source: str,
+        where: str = "",
+        order_by: str = "",
+        extra: Sequence[str] = (),
+    ) -> str:
+        """Build a SELECT of all schema columns, then ``extra``, from a source."""
+        select_list = ", ".join((self.select_list, *extra))
+        query = f"SELECT {select_list} FROM {source}"
+        if where:
+            query += f" WHERE {where}"
+        if order_by:
+            query += f" ORDER BY {order_by}"
+        return query
+
+
+_compiled_by_version: Dict[str, CompiledSchema] = {}
+_last_compiled: Tuple[Optional[ProjectSchema], Optional[CompiledSchema]] = (None, None)
+
+
+def compile_schema(schema: ProjectSchema) -> CompiledSchema:
+    """Return the compiled artifact for a schema, compiling it at most once.
+
+    The schema registry returns the same object while a schema is unchanged,
+    so the common case is a single identity check.
+    """
+    global _last_compiled
+    last_schema, last_compiled = _last_compiled
+    if schema is last_schema:
+        return last_compiled
+
+    version = schema_version(schema)
+    compiled = _compiled_by_version.get(version)
+    if compiled is None:
+        compiled = CompiledSchema.compile(schema)
+        _compiled_by_version[version] = compiled
+    _last_compiled = (schema, compiled)
+    return compiled
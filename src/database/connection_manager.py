@@ -18,28 +18,51 @@ DuckDB was chosen specifically for this data product because:
 import logging
 import os
 from contextlib import contextmanager
-from threading import Lock
+from threading import BoundedSemaphore, Lock
 from typing import Generator, Optional
 
 import duckdb
 
+from ..utils.timing import phase
+from .workload import workload_recorder
+
 logger = logging.getLogger("data_product")
 
+# Configuration
+DUCKDB_POOL_SIZE = int(os.getenv("DUCKDB_POOL_SIZE", "20"))  # connections in use
+DUCKDB_POOL_TIMEOUT = float(os.getenv("DUCKDB_POOL_TIMEOUT", "30"))  # seconds
+
 
 class DuckDBConnectionPool:
     """Pool of DuckDB connections."""
 
-    def __init__(self, db_path: str = "data/data_product.db", max_connections: int = 5):
+    def __init__(
+        self,
+        db_path: str = "data/data_product.db",
+        max_connections: int = 5,
+        capacity: int = DUCKDB_POOL_SIZE,
+        timeout: float = DUCKDB_POOL_TIMEOUT,
+    ):
         """Initialize the connection pool.
 
         Args:
             db_path: Path to the DuckDB database file
             max_connections: Maximum number of connections to keep in the pool
+            capacity: Maximum number of connections in use at once; callers
+                beyond it wait for one to be returned
+            timeout: Seconds a caller waits for a connection before
+                ``TimeoutError``
         """
         self.db_path = db_path
         self.max_connections = max_connections
+        self.capacity = capacity
+        self.timeout = timeout
         self.connections: list[duckdb.DuckDBPyConnection] = []
         self.lock = Lock()
+        self.in_use = 0
+        self.waiting = 0  # threads waiting for a free slot
+        self._slots = BoundedSemaphore(capacity)
+        self._stats_lock = Lock()
 
         # Ensure data directory exists
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
@@ -49,27 +72,45 @@ class DuckDBConnectionPool:
         """Get a connection from the pool."""
         connection: Optional[duckdb.DuckDBPyConnection] = None
 
+        with self._stats_lock:
+            self.waiting += 1
+        try:
+            with phase("pool_wait"):
+                acquired = self._slots.acquire(timeout=self.timeout)
+        finally:
+            with self._stats_lock:
+                self.waiting -= 1
+        if not acquired:
+            raise TimeoutError(
+                f"No database connection free within {self.timeout}s "
+                f"({self.capacity} in use)"
+            )
+
         with self.lock:
             if self.connections:
                 connection = self.connections.pop()
             else:
                 try:
                     connection = duckdb.connect(self.db_path)
-                    logger.debug(f"Created new connection to {self.db_path}")
+                    logger.debug("Created new connection to %s", self.db_path)
                 except Exception as e:
+                    self._slots.release()
                     logger.error(f"Failed to create database connection: {str(e)}")
                     raise
+            self.in_use += 1
 
         if not connection:
             raise RuntimeError("Failed to get database connection")
 
         try:
-            yield connection
+            # Statements are timed into the workload recorder when capture is on
+            yield workload_recorder.wrap(connection)
         except Exception as e:
             logger.error(f"Database operation failed: {str(e)}")
             raise
         finally:
             with self.lock:
+                self.in_use -= 1
                 try:
                     if len(self.connections) < self.max_connections and connection:
                         self.connections.append(connection)
@@ -78,6 +119,18 @@ class DuckDBConnectionPool:
                         logger.debug("Closed excess connection")
                 except Exception as e:
                     logger.error(f"Error while returning connection to pool: {str(e)}")
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Snapshot of pool occupancy."""
+        with self.lock:
+            return {
+                "idle": len(self.connections),
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "capacity": self.capacity,
+                "max_idle": self.max_connections,
+            }
 
 
 class DuckDBConnectionManager:
@@ -113,6 +166,15 @@ class DuckDBConnectionManager:
         with self._pool.get_connection() as conn:
             yield conn
 
+    def stats(self) -> dict:
+        """Snapshot of pool occupancy."""
+        return self._pool.stats()
+
+    @property
+    def db_path(self) -> str:
+        """Path of the pooled database file."""
+        return self._pool.db_path
+
     def close_all(self):
         """Close all connections in the pool."""
         with self._pool.lock:
@@ -1,12 +1,17 @@
 """DuckDB database management module."""
 
 import logging
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, Generator, List, Optional, Sequence, Tuple
 from uuid import uuid4
 
+import duckdb
+
+from ..utils.timing import phase
+from .change_log import change_log
 from .connection_manager import DuckDBConnectionManager
-from .schema import SCHEMA_DEFINITIONS
+from .schema import SCHEMA_DEFINITIONS, SCHEMA_HASH, SCHEMA_TABLES
 
 logger = logging.getLogger("data_product")
 
@@ -14,20 +19,64 @@ logger = logging.getLogger("data_product")
 class DuckDBManager:
     """Manager for DuckDB database operations."""
 
-    def __init__(self, db_path: str = "data_product.db"):
+    def __init__(self, db_path: str = "data_product.db", conn_manager=None):
         """Initialize the DuckDB manager.
 
         Args:
             db_path: Path to the DuckDB database file
+            conn_manager: Object exposing ``get_connection()``; defaults to the
+                shared DuckDB connection manager
         """
-        self.conn_manager = DuckDBConnectionManager()
+        self.conn_manager = conn_manager or DuckDBConnectionManager()
         self._initialize_schema()
 
     def _initialize_schema(self):
-        """Initialize database schema."""
-        for table_name, schema_sql in SCHEMA_DEFINITIONS.items():
-            self.execute_query(schema_sql)
-            logger.info(f"Initialized table: {table_name}")
+        """Initialize database schema.
+
+        The DDL is idempotent but not free, so it only runs when the hash of
+        ``SCHEMA_DEFINITIONS`` differs from the marker stored by the last run,
+        or when one of its tables is missing (e.g. dropped through the admin
+        API).
+        """
+        with self.conn_manager.get_connection() as conn:
+            tables = {
+                row[0]
+                for row in conn.execute(
+                    """
+                    SELECT table_name FROM duckdb_tables()
+                    WHERE database_name = current_database() AND schema_name = 'main'
+                    """
+                ).fetchall()
+            }
+            if "schema_marker" in tables and tables.issuperset(SCHEMA_TABLES):
+                applied = conn.execute(
+                    "SELECT schema_hash FROM schema_marker"
+                ).fetchone()
+                if applied and applied[0] == SCHEMA_HASH:
+                    logger.debug("Schema %s already applied", SCHEMA_HASH[:12])
+                    return
+
+            conn.begin()
+            try:
+                for table_name, schema_sql in SCHEMA_DEFINITIONS.items():
+                    conn.execute(schema_sql)
+                    logger.info("Initialized table: %s", table_name)
+                conn.execute(
+                    """
+                    CREATE OR REPLACE TABLE schema_marker (
+                        schema_hash VARCHAR NOT NULL,
+                        applied_at TIMESTAMP NOT NULL
+                    )
+                    """
+                )
+                conn.execute(
+                    "INSERT INTO schema_marker VALUES (?, ?)",
+                    (SCHEMA_HASH, datetime.now()),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
 
     def execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
         """Execute a SQL query and return results.
@@ -41,8 +90,11 @@ class DuckDBManager:
         """
         try:
             with self.conn_manager.get_connection() as conn:
-                result = conn.execute(query, params if params else ()).fetchall()
-                columns = conn.execute(query).description
+                with phase("query"):
+                    cursor = conn.execute(query, params if params else ())
+                columns = cursor.description or []
+                with phase("fetch"):
+                    result = cursor.fetchall() if columns else []
                 return [
                     {columns[i][0]: value for i, value in enumerate(row)}
                     for row in result
@@ -51,6 +103,47 @@ class DuckDBManager:
             logger.error(f"Query execution error: {str(e)}", exc_info=True)
             raise
 
+    @contextmanager
+    def _transaction(self) -> Generator[duckdb.DuckDBPyConnection, None, None]:
+        """Run a block on a pooled connection inside a single transaction.
+
+        Holds the change log's commit lock, so appended changes commit in
+        sequence order.
+        """
+        with self.conn_manager.get_connection() as conn, change_log.commit_lock:
+            conn.begin()
+            try:
+                yield conn
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.error("Transaction rolled back: %s", e)
+                raise
+
+    def _execute_write(
+        self,
+        query: str,
+        params: tuple,
+        table_name: str,
+        operation: str,
+        entity_id: str,
+        payload: Dict[str, Any],
+    ):
+        """Execute a write and record it in the change log in one transaction.
+
+        Args:
+            query: SQL write statement
+            params: Query parameters
+            table_name: Name of the changed table
+            operation: Change type recorded in the change log
+            entity_id: Primary key of the changed row
+            payload: Changed column values
+        """
+        with self._transaction() as conn:
+            conn.execute(query, params)
+            seq = change_log.append(conn, table_name, operation, entity_id, payload)
+        change_log.publish(seq)
+
     def create_project(self, project_data: Dict[str, Any]) -> str:
         """Create a new project.
 
@@ -73,14 +166,27 @@ class DuckDBManager:
         placeholders = ", ".join(["?" for _ in project_data])
         query = f"INSERT INTO projects ({columns}) VALUES ({placeholders})"
 
-        self.execute_query(query, tuple(project_data.values()))
+        self._execute_write(
+            query,
+            tuple(project_data.values()),
+            "projects",
+            "INSERT",
+            project_id,
+            project_data,
+        )
         return project_id
 
-    def create_portfolio(self, portfolio_data: Dict[str, Any]) -> str:
+    def create_portfolio(
+        self,
+        portfolio_data: Dict[str, Any],
+        allocations: Optional[Sequence[Tuple[str, float]]] = None,
+    ) -> str:
         """Create a new portfolio.
 
         Args:
             portfolio_data: Portfolio data dictionary
+            allocations: Optional (project_id, allocation_percentage) pairs,
+                applied in the same transaction as the portfolio insert
 
         Returns:
             Portfolio ID
@@ -98,7 +204,17 @@ class DuckDBManager:
         placeholders = ", ".join(["?" for _ in portfolio_data])
         query = f"INSERT INTO portfolios ({columns}) VALUES ({placeholders})"
 
-        self.execute_query(query, tuple(portfolio_data.values()))
+        with self._transaction() as conn:
+            conn.execute(query, tuple(portfolio_data.values()))
+            seq = change_log.append(
+                conn, "portfolios", "INSERT", portfolio_id, portfolio_data
+            )
+            if allocations:
+                _, allocation_seq = self._apply_allocations(
+                    conn, portfolio_id, allocations, replace=True
+                )
+                seq = allocation_seq or seq
+        change_log.publish(seq)
         return portfolio_id
 
     def add_project_to_portfolio(
@@ -119,6 +235,251 @@ class DuckDBManager:
                 entry_date
             ) VALUES (?, ?, ?, ?)
         """
-        self.execute_query(
-            query, (portfolio_id, project_id, allocation, datetime.now().date())
+        entry_date = datetime.now().date()
+        self._execute_write(
+            query,
+            (portfolio_id, project_id, allocation, entry_date),
+            "portfolio_projects",
+            "INSERT",
+            f"{portfolio_id}:{project_id}",
+            {
+                "portfolio_id": portfolio_id,
+                "project_id": project_id,
+                "allocation_percentage": allocation,
+                "entry_date": entry_date,
+            },
         )
+
+    def allocate_projects(
+        self,
+        portfolio_id: str,
+        allocations: Sequence[Tuple[str, float]],
+        replace: bool = False,
+    ) -> Dict[str, Any]:
+        """Apply a set of project allocations to a portfolio in one transaction.
+
+        Allocations for projects already in the portfolio are updated and new
+        ones inserted. With ``replace`` the given set becomes the complete
+        allocation of the portfolio and any other allocation is removed.
+
+        Args:
+            portfolio_id: Portfolio ID
+            allocations: (project_id, allocation_percentage) pairs
+            replace: Whether to remove allocations not in ``allocations``
+
+        Returns:
+            Summary with inserted, updated and removed counts and the resulting
+            total allocation percentage
+
+        Raises:
+            LookupError: If the portfolio does not exist
+            ValueError: If the allocations fail validation
+        """
+        with self._transaction() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM portfolios WHERE portfolio_id = ?", (portfolio_id,)
+            ).fetchone()
+            if not exists:
+                raise LookupError(f"Portfolio not found: {portfolio_id}")
+
+            summary, seq = self._apply_allocations(
+                conn, portfolio_id, allocations, replace
+            )
+            if seq is not None:
+                conn.execute(
+                    "UPDATE portfolios SET last_updated = ? WHERE portfolio_id = ?",
+                    (datetime.now(), portfolio_id),
+                )
+        if seq is not None:
+            change_log.publish(seq)
+        return summary
+
+    def _apply_allocations(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        portfolio_id: str,
+        allocations: Sequence[Tuple[str, float]],
+        replace: bool,
+    ) -> Tuple[Dict[str, Any], Optional[int]]:
+        """Validate and write allocations set-based on an open transaction.
+
+        The allocations are staged into a temporary table with a single
+        statement, validated with a single aggregate query and then applied
+        with one UPDATE, DELETE and INSERT each, regardless of their number.
+
+        Returns:
+            Tuple of the allocation summary and the last change log sequence
+        """
+        project_ids = [str(project_id) for project_id, _ in allocations]
+        percentages = [float(allocation) for _, allocation in allocations]
+
+        conn.execute(
+            """
+            CREATE OR REPLACE TEMP TABLE allocation_stage AS
+            SELECT
+                unnest(?::UUID[]) AS project_id,
+                unnest(?::DOUBLE[]) AS allocation_percentage
+            """,
+            (project_ids, percentages),
+        )
+        try:
+            total = self._validate_allocations(conn, portfolio_id, replace)
+            summary, seq = self._write_allocations(conn, portfolio_id, replace)
+        finally:
+            conn.execute("DROP TABLE IF EXISTS allocation_stage")
+
+        summary["total_allocation"] = total
+        return summary, seq
+
+    def _validate_allocations(
+        self, conn: duckdb.DuckDBPyConnection, portfolio_id: str, replace: bool
+    ) -> float:
+        """Check staged allocations in one pass and return the resulting total.
+
+        Raises:
+            ValueError: If any project is unknown or duplicated, an allocation
+                is outside (0, 100] or the portfolio total exceeds 100%
+        """
+        duplicates, out_of_range, missing, total = conn.execute(
+            """
+            SELECT
+                COUNT(*) - COUNT(DISTINCT s.project_id),
+                COUNT(*) FILTER (
+                    WHERE NOT (s.allocation_percentage > 0
+                               AND s.allocation_percentage <= 100)
+                ),
+                LIST(s.project_id::VARCHAR) FILTER (WHERE p.project_id IS NULL),
+                COALESCE(SUM(s.allocation_percentage), 0) + (
+                    SELECT COALESCE(SUM(pp.allocation_percentage), 0)
+                    FROM portfolio_projects pp
+                    WHERE pp.portfolio_id = ?
+                      AND NOT ?
+                      AND pp.project_id NOT IN (
+                          SELECT project_id FROM allocation_stage
+                      )
+                )
+            FROM allocation_stage s
+            LEFT JOIN projects p ON p.project_id = s.project_id
+            """,
+            (portfolio_id, replace),
+        ).fetchone()
+
+        errors = []
+        if missing:
+            sample = ", ".join(missing[:10])
+            errors.append(f"{len(missing)} unknown project(s): {sample}")
+        if duplicates:
+            errors.append(f"{duplicates} duplicate project allocation(s)")
+        if out_of_range:
+            errors.append(f"{out_of_range} allocation(s) outside (0, 100]")
+        if total > 100:
+            errors.append(f"Total allocation {total:.2f}% exceeds 100%")
+        if errors:
+            raise ValueError("; ".join(errors))
+        return float(total)
+
+    def _write_allocations(
+        self, conn: duckdb.DuckDBPyConnection, portfolio_id: str, replace: bool
+    ) -> Tuple[Dict[str, Any], Optional[int]]:
+        """Apply staged allocations and record one change per affected row."""
+        payload_sql = """
+            portfolio_id::VARCHAR || ':' || project_id::VARCHAR AS entity_id,
+            json_object(
+                'portfolio_id', portfolio_id::VARCHAR,
+                'project_id', project_id::VARCHAR,
+                'allocation_percentage', allocation_percentage,
+                'entry_date', entry_date::VARCHAR
+            )::VARCHAR AS payload
+        """
+        removed_filter = """
+            FROM portfolio_projects
+            WHERE portfolio_id = ?
+              AND project_id NOT IN (SELECT project_id FROM allocation_stage)
+        """
+        changed_sql = """
+            SELECT
+                pp.portfolio_id,
+                pp.project_id,
+                s.allocation_percentage::DECIMAL(5,2) AS allocation_percentage,
+                pp.entry_date
+            FROM portfolio_projects pp
+            JOIN allocation_stage s ON s.project_id = pp.project_id
+            WHERE pp.portfolio_id = ?
+              AND pp.allocation_percentage <> s.allocation_percentage::DECIMAL(5,2)
+        """
+        added_sql = """
+            SELECT
+                ?::UUID AS portfolio_id,
+                s.project_id,
+                s.allocation_percentage::DECIMAL(5,2) AS allocation_percentage,
+                ?::DATE AS entry_date
+            FROM allocation_stage s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM portfolio_projects pp
+                WHERE pp.portfolio_id = ? AND pp.project_id = s.project_id
+            )
+        """
+        today = datetime.now().date()
+        seqs = []
+        removed = 0
+
+        # Change rows are captured before each write, using the same predicate
+        if replace:
+            seqs.append(
+                change_log.append_query(
+                    conn,
+                    "portfolio_projects",
+                    "DELETE",
+                    f"SELECT {payload_sql} {removed_filter}",
+                    (portfolio_id,),
+                )
+            )
+            removed = conn.execute(
+                f"DELETE {removed_filter}", (portfolio_id,)
+            ).fetchone()[0]
+
+        seqs.append(
+            change_log.append_query(
+                conn,
+                "portfolio_projects",
+                "UPDATE",
+                f"SELECT {payload_sql} FROM ({changed_sql})",
+                (portfolio_id,),
+            )
+        )
+        updated = conn.execute(
+            """
+            UPDATE portfolio_projects
+            SET allocation_percentage = s.allocation_percentage::DECIMAL(5,2)
+            FROM allocation_stage s
+            WHERE portfolio_projects.portfolio_id = ?
+              AND portfolio_projects.project_id = s.project_id
+              AND portfolio_projects.allocation_percentage
+                  <> s.allocation_percentage::DECIMAL(5,2)
+            """,
+            (portfolio_id,),
+        ).fetchone()[0]
+
+        added_params = (portfolio_id, today, portfolio_id)
+        seqs.append(
+            change_log.append_query(
+                conn,
+                "portfolio_projects",
+                "INSERT",
+                f"SELECT {payload_sql} FROM ({added_sql})",
+                added_params,
+            )
+        )
+        inserted = conn.execute(
+            f"""
+            INSERT INTO portfolio_projects (
+                portfolio_id, project_id, allocation_percentage, entry_date
+            )
+            {added_sql}
+            """,
+            added_params,
+        ).fetchone()[0]
+
+        seqs = [seq for seq in seqs if seq is not None]
+        summary = {"inserted": inserted, "updated": updated, "removed": removed}
+        return summary, max(seqs) if seqs else None
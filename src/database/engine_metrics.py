@@ -0,0 +1,172 @@
+"""DuckDB engine metrics.
+
+Exposes DuckDB internals to Prometheus: database file and WAL size, storage
+blocks, buffer-manager memory and limit, temporary spill files, estimated row
+counts per table, and connection pool occupancy. Everything comes from
+catalog table functions, ``PRAGMA database_size`` and file sizes, so a refresh
+never scans table data. Refreshes run on scrape and are rate limited by
+``DUCKDB_METRICS_TTL``.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ..utils.metrics import (
+    duckdb_blocks_gauge,
+    duckdb_file_size_gauge,
+    duckdb_memory_limit_gauge,
+    duckdb_memory_usage_gauge,
+    duckdb_pool_connections_gauge,
+    duckdb_pool_waiters_gauge,
+    duckdb_table_rows_gauge,
+    duckdb_temp_bytes_gauge,
+    duckdb_temp_files_gauge,
+    duckdb_wal_size_gauge,
+)
+from .connection_manager import DuckDBConnectionManager
+
+logger = logging.getLogger("data_product")
+
+# Configuration
+DUCKDB_METRICS_TTL = float(os.getenv("DUCKDB_METRICS_TTL", "10"))  # seconds
+
+_SIZE = re.compile(r"^\s*([\d.]+)\s*([A-Za-z]*)\s*$")
+_UNITS = {
+    "": 1,
+    "B": 1,
+    "BYTES": 1,
+    "KB": 10**3,
+    "MB": 10**6,
+    "GB": 10**9,
+    "TB": 10**12,
+    "KIB": 2**10,
+    "MIB": 2**20,
+    "GIB": 2**30,
+    "TIB": 2**40,
+}
+
+
+def parse_size(value: Optional[str]) -> Optional[int]:
+    """Parse a DuckDB human-readable size such as ``801KB`` or ``5.0GiB``."""
+    match = _SIZE.match(value or "")
+    if not match or match.group(2).upper() not in _UNITS:
+        return None
+    return int(float(match.group(1)) * _UNITS[match.group(2).upper()])
+
+
+class DuckDBEngineMetrics:
+    """Collect DuckDB engine statistics into the Prometheus gauges."""
+
+    def __init__(self, conn_manager=None, ttl: float = DUCKDB_METRICS_TTL):
+        self.conn_manager = conn_manager or DuckDBConnectionManager()
+        self.ttl = ttl
+        self.last_snapshot: Optional[Dict[str, Any]] = None
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> Dict[str, Any]:
+        """Refresh the gauges unless the last snapshot is younger than the TTL."""
+        with self._lock:
+            if (
+                not force
+                and self.last_snapshot is not None
+                and time.monotonic() - self._refreshed_at < self.ttl
+            ):
+                return self.last_snapshot
+            try:
+                snapshot = self.collect()
+            except Exception as e:
+                logger.error("Failed to collect DuckDB metrics: %s", e)
+                return self.last_snapshot or {}
+            self._publish(snapshot)
+            self.last_snapshot = snapshot
+            self._refreshed_at = time.monotonic()
+            return snapshot
+
+    def collect(self) -> Dict[str, Any]:
+        """Gather a snapshot of engine statistics."""
+        # Taken first, so the metrics query's own connection is not counted
+        pool = self.conn_manager.stats()
+        with self.conn_manager.get_connection() as conn:
+            (
+                block_size,
+                total_blocks,
+                used_blocks,
+                free_blocks,
+                memory_usage,
+                memory_limit,
+            ) = conn.execute(
+                """
+                SELECT block_size, total_blocks, used_blocks, free_blocks,
+                       memory_usage, memory_limit
+                FROM pragma_database_size()
+                WHERE database_name = current_database()
+                """
+            ).fetchone()
+            temp_files, temp_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM duckdb_temporary_files()"
+            ).fetchone()
+            tables = dict(
+                conn.execute(
+                    """
+                    SELECT table_name, estimated_size
+                    FROM duckdb_tables()
+                    WHERE database_name = current_database() AND NOT temporary
+                    """
+                ).fetchall()
+            )
+
+        db_path = self.conn_manager.db_path
+        return {
+            "file_bytes": _file_size(db_path),
+            "wal_bytes": _file_size(db_path + ".wal"),
+            "block_size": block_size,
+            "blocks": {
+                "total": total_blocks,
+                "used": used_blocks,
+                "free": free_blocks,
+            },
+            "memory_usage_bytes": parse_size(memory_usage),
+            "memory_limit_bytes": parse_size(memory_limit),
+            "temp_files": temp_files,
+            "temp_spill_bytes": int(temp_bytes),
+            "table_rows": tables,
+            "pool": pool,
+        }
+
+    def _publish(self, snapshot: Dict[str, Any]):
+        duckdb_file_size_gauge.set(snapshot["file_bytes"])
+        duckdb_wal_size_gauge.set(snapshot["wal_bytes"])
+        for state, count in snapshot["blocks"].items():
+            duckdb_blocks_gauge.labels(state).set(count)
+        if snapshot["memory_usage_bytes"] is not None:
+            duckdb_memory_usage_gauge.set(snapshot["memory_usage_bytes"])
+        if snapshot["memory_limit_bytes"] is not None:
+            duckdb_memory_limit_gauge.set(snapshot["memory_limit_bytes"])
+        duckdb_temp_files_gauge.set(snapshot["temp_files"])
+        duckdb_temp_bytes_gauge.set(snapshot["temp_spill_bytes"])
+
+        # Drop series of tables that no longer exist
+        duckdb_table_rows_gauge.clear()
+        for table, rows in snapshot["table_rows"].items():
+            duckdb_table_rows_gauge.labels(table).set(rows)
+
+        pool = snapshot["pool"]
+        duckdb_pool_connections_gauge.labels("idle").set(pool["idle"])
+        duckdb_pool_connections_gauge.labels("in_use").set(pool["in_use"])
+        duckdb_pool_waiters_gauge.set(pool["waiting"])
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+# Shared engine metrics collector
+engine_metrics = DuckDBEngineMetrics()
@@ -0,0 +1,241 @@
+"""Set-based FX normalization.
+
+``fx_rates`` holds one rate per currency and date, as USD per unit of the
+currency, and is bulk-loaded from CSV. ``normalized_source`` wraps a
+projects relation into one that looks the same but expresses its amounts in
+a reporting currency: each row is matched with an ASOF join to the latest
+rate of its own currency and of the reporting currency on or before the
+as-of date, so conversion runs vectorized inside DuckDB instead of as
+per-row lookups in Python.
+
+The wrapped relation replaces the amount columns and ``currency_code``, and
+adds ``original_currency`` and ``fx_rate`` (reporting units per original
+unit). Rows whose currency has no rate on or before the date get NULL
+amounts. USD needs no rates, and neither does a row already in the reporting
+currency.
+"""
+
+import os
+import re
+import tempfile
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import duckdb
+
+BASE_CURRENCY = "USD"
+_CURRENCY = re.compile(r"[A-Z]{3}")
+
+
+def currency(code: str) -> str:
+    """Validate an ISO 4217 style code; it is inlined into SQL.
+
+    Raises:
+        ValueError: If ``code`` is not three uppercase letters
+    """
+    if not isinstance(code, str) or not _CURRENCY.fullmatch(code):
+        raise ValueError(f"Invalid currency code: {code!r}")
+    return code
+
+
+def _usd_rate(code: str, rate: str) -> str:
+    return f"CASE WHEN {code} = '{BASE_CURRENCY}' THEN 1.0 ELSE {rate} END"
+
+
+def normalized_source(
+    source: str,
+    reporting_currency: str,
+    as_of: Optional[date] = None,
+    amount_columns: Sequence[str] = ("total_amount",),
+) -> str:
+    """Subquery of ``source`` with amounts in ``reporting_currency``.
+
+    Args:
+        source: Table, view or parenthesized subquery with ``currency_code``
+        reporting_currency: Currency to convert to
+        as_of: Date of the rates to use, default today
+        amount_columns: DECIMAL(20,2) columns to convert
+
+    Raises:
+        ValueError: If ``reporting_currency`` is not a currency code
+    """
+    target = currency(reporting_currency)
+    as_of = as_of or date.today()
+    converted = ", ".join(
+        f"round(s.{column} * s.fx_rate, 2)::DECIMAL(20,2) AS {column}"
+        for column in amount_columns
+    )
+    return f"""(
+        SELECT s.* EXCLUDE (fx_date)
+            REPLACE ({converted}, '{target}' AS currency_code)
+        FROM (
+            SELECT
+                s.*,
+                s.currency_code AS original_currency,
+                CASE WHEN s.currency_code = '{target}' THEN 1.0
+                     ELSE {_usd_rate("s.currency_code", "own.usd_rate")}
+                          / {_usd_rate(f"'{target}'", "reporting.usd_rate")}
+                END AS fx_rate
+            FROM (SELECT *, DATE '{as_of.isoformat()}' AS fx_date FROM {source}) s
+            ASOF LEFT JOIN fx_rates own
+                ON s.currency_code = own.currency_code AND s.fx_date >= own.rate_date
+            ASOF LEFT JOIN (
+                SELECT rate_date, usd_rate FROM fx_rates
+                WHERE currency_code = '{target}'
+            ) reporting ON s.fx_date >= reporting.rate_date
+        ) s
+    )"""
+
+
+def has_rate(
+    conn: duckdb.DuckDBPyConnection, code: str, as_of: Optional[date] = None
+) -> bool:
+    """Whether ``code`` can be converted as of a date."""
+    if currency(code) == BASE_CURRENCY:
+        return True
+    return bool(
+        conn.execute(
+            "SELECT 1 FROM fx_rates WHERE currency_code = ? AND rate_date <= ?",
+            (code, as_of or date.today()),
+        ).fetchone()
+    )
+
+
+def reporting_source(
+    conn: duckdb.DuckDBPyConnection,
+    source: str,
+    reporting_currency: str,
+    as_of: Optional[date] = None,
+) -> str:
+    """``normalized_source`` after checking the reporting currency has a rate.
+
+    Raises:
+        ValueError: If the currency is invalid or has no rate on or before
+            ``as_of``
+    """
+    as_of = as_of or date.today()
+    if not has_rate(conn, reporting_currency, as_of):
+        raise ValueError(
+            f"No FX rate for {reporting_currency} on or before {as_of.isoformat()}"
+        )
+    return normalized_source(source, reporting_currency, as_of)
+
+
+def portfolio_source(
+    conn: duckdb.DuckDBPyConnection,
+    portfolio_id: str,
+    source: str,
+    reporting_currency: Optional[str] = None,
+    as_of: Optional[date] = None,
+) -> str:
+    """Projects relation in which a portfolio's amounts share one currency.
+
+    Without ``reporting_currency`` that is ``source`` itself, as long as the
+    allocated projects are all in one currency. With it, every currency of
+    the allocated projects must have a rate, so no exposure is silently left
+    out of the totals.
+
+    Raises:
+        ValueError: If the projects mix currencies without a reporting
+            currency, or a currency has no rate on or before ``as_of``
+    """
+    currencies = [
+        row[0]
+        for row in conn.execute(
+            f"""
+            SELECT DISTINCT p.currency_code
+            FROM portfolio_projects a
+            JOIN {source} p ON p.project_id = a.project_id
+            WHERE a.portfolio_id = ? AND p.maturity_years > 0
+            ORDER BY 1
+            """,
+            (portfolio_id,),
+        ).fetchall()
+    ]
+    if reporting_currency is None:
+        if len(currencies) > 1:
+            raise ValueError(
+                f"Portfolio {portfolio_id} mixes currencies "
+                f"({', '.join(currencies)}); pass a reporting_currency"
+            )
+        return source
+    converted = reporting_source(conn, source, reporting_currency, as_of)
+    as_of = as_of or date.today()
+    missing = [
+        code
+        for code in currencies
+        if code != reporting_currency and not has_rate(conn, code, as_of)
+    ]
+    if missing:
+        raise ValueError(
+            f"No FX rate for {', '.join(missing)} on or before {as_of.isoformat()}"
+        )
+    return converted
+
+
+def load_rates_csv(conn: duckdb.DuckDBPyConnection, path: str) -> Dict[str, Any]:
+    """Upsert rates from a ``currency_code,rate_date,usd_rate`` CSV file.
+
+    Raises:
+        ValueError: If a row has a bad currency code or a non-positive rate
+    """
+    staged = conn.execute(
+        """
+        SELECT
+            count(*),
+            count(DISTINCT currency_code),
+            count(*) FILTER (
+                WHERE NOT regexp_full_match(currency_code, '[A-Z]{3}')
+                   OR usd_rate IS NULL OR usd_rate <= 0 OR rate_date IS NULL
+            )
+        FROM read_csv(?, header = true, columns = {
+            'currency_code': 'VARCHAR', 'rate_date': 'DATE', 'usd_rate': 'DOUBLE'
+        })
+        """,
+        (path,),
+    ).fetchone()
+    rows, currencies, invalid = staged
+    if invalid:
+        raise ValueError(f"{invalid} of {rows} FX rates are invalid")
+    conn.execute(
+        """
+        INSERT INTO fx_rates
+        SELECT currency_code, rate_date, usd_rate
+        FROM read_csv(?, header = true, columns = {
+            'currency_code': 'VARCHAR', 'rate_date': 'DATE', 'usd_rate': 'DOUBLE'
+        })
+        ON CONFLICT (currency_code, rate_date)
+            DO UPDATE SET usd_rate = excluded.usd_rate
+        """,
+        (path,),
+    )
+    return {"loaded": rows, "currencies": currencies}
+
+
+def load_rates(conn: duckdb.DuckDBPyConnection, data: bytes) -> Dict[str, Any]:
+    """Upsert rates from CSV content, e.g. an uploaded file."""
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as f:
+        f.write(data)
+    try:
+        return load_rates_csv(conn, f.name)
+    finally:
+        os.unlink(f.name)
+
+
+def rates_summary(conn: duckdb.DuckDBPyConnection) -> List[Dict[str, Any]]:
+    """Date coverage and latest rate per currency."""
+    cursor = conn.execute(
+        """
+        SELECT
+            currency_code,
+            count(*) AS rates,
+            min(rate_date) AS first_date,
+            max(rate_date) AS last_date,
+            arg_max(usd_rate, rate_date) AS latest_usd_rate
+        FROM fx_rates
+        GROUP BY currency_code
+        ORDER BY currency_code
+        """
+    )
+    columns = [c[0] for c in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
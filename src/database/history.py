@@ -0,0 +1,262 @@
+"""Versioned project history for point-in-time reads.
+
+The ``projects`` table only holds the current version of each project, so
+current-state reads never touch history. When a project is updated, the
+version it replaces is appended to ``project_history`` with its validity
+interval ``[valid_from, valid_to)``: from its ``last_updated`` to the update
+time. Superseded versions are written in ``valid_to`` order, which keeps the
+table clustered by time, and DuckDB's per-row-group min/max statistics let
+an as-of read skip every row group that closed before the requested time
+instead of scanning the whole history.
+
+A read as of ``T`` is the union of current versions with ``last_updated <= T``
+and history versions valid at ``T``. Compaction periodically merges adjacent
+versions of a project whose columns are identical apart from timestamps,
+drops versions that closed before ``HISTORY_RETENTION_DAYS`` and rewrites the
+table ordered by ``valid_to`` and ``project_id``.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Sequence
+
+import duckdb
+
+from .connection_manager import DuckDBConnectionManager
+
+logger = logging.getLogger("data_product")
+
+# Configuration
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "0"))  # 0 keeps all
+HISTORY_COMPACTION_INTERVAL = int(
+    os.getenv("HISTORY_COMPACTION_INTERVAL", "86400")
+)  # seconds, 0 disables
+
+CURRENT_TABLE = "projects"
+HISTORY_TABLE = "project_history"
+
+# Columns of the unified read view that history rows have to derive
+_DERIVED = {"creation_year": "year(creation_date)::INTEGER AS creation_year"}
+_TIMESTAMPS = ("last_updated", "valid_from", "valid_to")
+
+
+def as_of_source(source: str, columns: Sequence[str], as_of: datetime) -> str:
+    """Subquery of the project versions valid at ``as_of``.
+
+    Args:
+        source: Relation of current versions, e.g. the hot table or unified view
+        columns: Columns to select; ``creation_year`` is derived for history
+        as_of: Point in time to read
+    """
+    if as_of.tzinfo is not None:
+        as_of = as_of.astimezone().replace(tzinfo=None)  # stored times are local
+    current = ", ".join(columns)
+    history = ", ".join(_DERIVED.get(column, column) for column in columns)
+    at = f"TIMESTAMP '{as_of.isoformat(sep=' ')}'"
+    return f"""(
+        SELECT {current} FROM {source} WHERE last_updated <= {at}
+        UNION ALL
+        SELECT {history} FROM {HISTORY_TABLE}
+        WHERE valid_to > {at} AND valid_from <= {at}
+    )"""
+
+
+def supersede(
+    conn: duckdb.DuckDBPyConnection,
+    columns: Sequence[str],
+    row: tuple,
+    now: datetime,
+) -> int:
+    """Archive the current version of a project and replace it with ``row``.
+
+    Runs on the caller's connection, inside its transaction.
+
+    Args:
+        conn: Connection holding the open write transaction
+        columns: Column names of ``row``, including ``project_id``
+        row: New version, with ``last_updated`` set to ``now``
+        now: Update time, closing the archived version
+
+    Returns:
+        Number of updated rows: 0 if the project is not in the hot table
+    """
+    values = dict(zip(columns, row))
+    project_id = values.pop("project_id")
+    names = ", ".join(columns)
+    archived = conn.execute(
+        f"""
+        INSERT INTO {HISTORY_TABLE} ({names}, valid_from, valid_to)
+        SELECT {names}, last_updated, ?
+        FROM {CURRENT_TABLE}
+        WHERE project_id = ? AND last_updated < ?
+        """,
+        (now, project_id, now),
+    ).fetchone()[0]
+    assignments = ", ".join(f"{column} = ?" for column in values)
+    updated = conn.execute(
+        f"UPDATE {CURRENT_TABLE} SET {assignments} WHERE project_id = ?",
+        (*values.values(), project_id),
+    ).fetchone()[0]
+    if archived > updated:
+        raise RuntimeError(f"Project {project_id} changed during update")
+    return updated
+
+
+class ProjectHistory:
+    """Statistics and compaction of the project history table."""
+
+    def __init__(self, conn_manager=None):
+        """Initialize the history store.
+
+        Args:
+            conn_manager: Object exposing ``get_connection()``; defaults to the
+                shared DuckDB connection manager
+        """
+        self.conn_manager = conn_manager or DuckDBConnectionManager()
+
+    def _columns(self, conn: duckdb.DuckDBPyConnection) -> Sequence[str]:
+        return [
+            name
+            for name, in conn.execute(
+                """
+                SELECT column_name FROM duckdb_columns()
+                WHERE table_name = ? AND schema_name = 'main'
+                ORDER BY column_index
+                """,
+                (HISTORY_TABLE,),
+            ).fetchall()
+        ]
+
+    def compact(
+        self,
+        retention_days: int = HISTORY_RETENTION_DAYS,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """Merge unchanged adjacent versions, expire old ones and recluster.
+
+        Args:
+            retention_days: Drop versions that closed longer ago; 0 keeps all
+            now: Reference time for the retention window
+
+        Returns:
+            Version counts before and after, and how many were merged or expired
+        """
+        cutoff = (
+            (now or datetime.now()) - timedelta(days=retention_days)
+            if retention_days > 0
+            else datetime.min
+        )
+        with self.conn_manager.get_connection() as conn:
+            columns = self._columns(conn)
+            content = [c for c in columns if c not in _TIMESTAMPS]
+            others = [c for c in content if c != "project_id"]
+            # Gaps and islands: a version starts a new island unless it has the
+            # same content as, and directly follows, the previous version
+            compacted = f"""
+                WITH kept AS (
+                    SELECT * FROM {HISTORY_TABLE} WHERE valid_to >= ?
+                ),
+                flagged AS (
+                    SELECT
+                        *,
+                        CASE WHEN lag(({', '.join(content)})) OVER w
+                                  IS NOT DISTINCT FROM ({', '.join(content)})
+                              AND lag(valid_to) OVER w = valid_from
+                             THEN 0 ELSE 1 END AS starts
+                    FROM kept
+                    WINDOW w AS (PARTITION BY project_id ORDER BY valid_from)
+                ),
+                islands AS (
+                    SELECT
+                        *,
+                        sum(starts) OVER (
+                            PARTITION BY project_id ORDER BY valid_from
+                        ) AS island
+                    FROM flagged
+                )
+                SELECT {', '.join(columns)} FROM (
+                    SELECT
+                        project_id,
+                        {', '.join(f'any_value({c}) AS {c}' for c in others)},
+                        min(last_updated) AS last_updated,
+                        min(valid_from) AS valid_from,
+                        max(valid_to) AS valid_to
+                    FROM islands
+                    GROUP BY project_id, island
+                )
+                ORDER BY valid_to, project_id
+            """
+            conn.begin()
+            try:
+                before = conn.execute(
+                    f"SELECT count(*) FROM {HISTORY_TABLE}"
+                ).fetchone()[0]
+                conn.execute(
+                    f"CREATE TEMP TABLE compacted_history AS {compacted}", (cutoff,)
+                )
+                after = conn.execute(
+                    "SELECT count(*) FROM compacted_history"
+                ).fetchone()[0]
+                expired = conn.execute(
+                    f"SELECT count(*) FROM {HISTORY_TABLE} WHERE valid_to < ?",
+                    (cutoff,),
+                ).fetchone()[0]
+                if after < before:
+                    conn.execute(f"DELETE FROM {HISTORY_TABLE}")
+                    conn.execute(
+                        f"INSERT INTO {HISTORY_TABLE} SELECT * FROM compacted_history"
+                    )
+                conn.execute("DROP TABLE compacted_history")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            if after < before:
+                conn.execute("CHECKPOINT")
+
+        result = {
+            "versions_before": before,
+            "versions_after": after,
+            "merged": before - after - expired,
+            "expired": expired,
+        }
+        logger.info(
+            "Compacted project history from %s to %s versions (%s expired)",
+            before,
+            after,
+            expired,
+        )
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        """Describe the history table."""
+        with self.conn_manager.get_connection() as conn:
+            versions, projects, oldest, newest = conn.execute(
+                f"""
+                SELECT count(*), count(DISTINCT project_id),
+                       min(valid_from), max(valid_to)
+                FROM {HISTORY_TABLE}
+                """
+            ).fetchone()
+        return {
+            "versions": versions,
+            "projects": projects,
+            "oldest_valid_from": oldest,
+            "newest_valid_to": newest,
+            "retention_days": HISTORY_RETENTION_DAYS,
+        }
+
+    async def run_periodic(self, interval: int = HISTORY_COMPACTION_INTERVAL):
+        """Compact the history on a fixed interval until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.compact)
+            except Exception as e:
+                logger.error("Scheduled history compaction failed: %s", e)
+
+
+# Shared history instance
+project_history = ProjectHistory()
@@ -1,5 +1,7 @@
 """Database schema definitions."""
 
+import hashlib
+import re
 from enum import Enum
 
 from pydantic import BaseModel
@@ -21,6 +23,23 @@ SCHEMA_DEFINITIONS = {
             currency_code CHAR(3) NOT NULL DEFAULT 'USD'
         )
     """,
+    "project_history": """
+        CREATE TABLE IF NOT EXISTS project_history (
+            project_id UUID NOT NULL,
+            project_name VARCHAR NOT NULL,
+            description TEXT,
+            total_amount DECIMAL(20,2) NOT NULL,
+            maturity_years INTEGER NOT NULL,
+            expected_tri DECIMAL(5,2) NOT NULL,
+            dscr DECIMAL(5,2) NOT NULL,
+            status VARCHAR NOT NULL,
+            creation_date DATE NOT NULL,
+            last_updated TIMESTAMP NOT NULL,
+            currency_code CHAR(3) NOT NULL,
+            valid_from TIMESTAMP NOT NULL,
+            valid_to TIMESTAMP NOT NULL
+        )
+    """,
     "portfolios": """
         CREATE TABLE IF NOT EXISTS portfolios (
             portfolio_id UUID PRIMARY KEY,
@@ -41,8 +60,76 @@ SCHEMA_DEFINITIONS = {
             PRIMARY KEY (portfolio_id, project_id)
         )
     """,
+    "fx_rates": """
+        CREATE TABLE IF NOT EXISTS fx_rates (
+            currency_code CHAR(3) NOT NULL,
+            rate_date DATE NOT NULL,
+            usd_rate DOUBLE NOT NULL,
+            PRIMARY KEY (currency_code, rate_date)
+        )
+    """,
+    "change_log": """
+        CREATE SEQUENCE IF NOT EXISTS change_log_seq;
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq BIGINT PRIMARY KEY DEFAULT nextval('change_log_seq'),
+            table_name VARCHAR NOT NULL,
+            operation VARCHAR NOT NULL,
+            entity_id VARCHAR NOT NULL,
+            payload VARCHAR,
+            changed_at TIMESTAMP NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS change_log_truncation (
+            truncated_seq BIGINT NOT NULL
+        )
+    """,
+    "query_workload": """
+        CREATE TABLE IF NOT EXISTS query_workload (
+            fingerprint VARCHAR PRIMARY KEY,
+            statement VARCHAR NOT NULL,
+            kind VARCHAR NOT NULL,
+            tables VARCHAR[],
+            predicates VARCHAR[],
+            sample_sql VARCHAR NOT NULL,
+            sample_params VARCHAR,
+            calls BIGINT NOT NULL,
+            total_ms DOUBLE NOT NULL,
+            max_ms DOUBLE NOT NULL,
+            first_seen TIMESTAMP NOT NULL,
+            last_seen TIMESTAMP NOT NULL
+        )
+    """,
+    "workload_recommendations": """
+        CREATE TABLE IF NOT EXISTS workload_recommendations (
+            recommendation_id VARCHAR PRIMARY KEY,
+            kind VARCHAR NOT NULL,
+            table_name VARCHAR,
+            column_name VARCHAR,
+            action VARCHAR NOT NULL,
+            fingerprints VARCHAR NOT NULL,
+            calls BIGINT NOT NULL,
+            baseline_ms DOUBLE,
+            estimated_ms DOUBLE,
+            estimated_benefit_ms DOUBLE NOT NULL,
+            snapshot_id VARCHAR,
+            status VARCHAR NOT NULL,
+            created_at TIMESTAMP NOT NULL,
+            applied_at TIMESTAMP
+        )
+    """,
 }
 
+# Fingerprint of the DDL above; stored after a successful schema initialization
+SCHEMA_HASH = hashlib.sha256(
+    "\n".join(f"{name}:{sql}" for name, sql in SCHEMA_DEFINITIONS.items()).encode()
+).hexdigest()
+
+# Every table the DDL above creates
+SCHEMA_TABLES = [
+    name
+    for sql in SCHEMA_DEFINITIONS.values()
+    for name in re.findall(r"CREATE TABLE IF NOT EXISTS (\w+)", sql)
+]
+
 
 class ProjectStatus(str, Enum):
     """Project status enumeration."""
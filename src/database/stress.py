@@ -0,0 +1,296 @@
+"""Monte Carlo stress testing of portfolio DSCR.
+
+A stress job loads the portfolio's projects once into NumPy arrays in shared
+memory, then runs simulation batches across a process pool. Workers attach
+to the shared block by name, so project data is never pickled per batch.
+
+Each scenario draws, on top of the requested mean shocks:
+
+- a rate shock common to all projects, in percentage points; debt service is
+  re-amortized at the shocked ``expected_tri`` (floored at zero)
+- a revenue shock per project: a lognormal factor whose common component has
+  ``revenue_correlation`` weight, scaling CFADS
+- an FX shock per currency against the reporting currency, scaling the CFADS
+  and debt service of projects in that currency alike (both are in the
+  project's currency), so it moves the portfolio DSCR through the currency
+  mix but not a project's own DSCR; principals are converted into the
+  reporting currency as of a date (see ``fx``)
+
+Amounts in different currencies are only summed after conversion: a portfolio
+with projects in several currencies needs a reporting currency, and one in a
+single currency is stressed in that currency.
+
+Base CFADS is the annual annuity debt service at ``expected_tri`` times the
+project's ``dscr``. A scenario yields the portfolio DSCR (stressed CFADS over
+stressed debt service, both weighted by allocation) and the share of
+allocated principal in projects whose own DSCR falls below the covenant.
+
+Batch ``i`` always uses child ``i`` of the job's ``SeedSequence``, so a seed
+reproduces the same results whatever the number of workers (for a given
+``STRESS_BATCH_SCENARIOS``). The NumPy kernels are in ``monte_carlo``; they
+work on float32 chunks of ``STRESS_CHUNK_CELLS`` cells. Status is served while
+the job runs, with percentiles over the batches completed so far.
+
+Jobs live in the memory of the serving process: with several uvicorn workers,
+the status of a job is only available from the worker that started it.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import secrets
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Any, Dict, Optional
+
+import duckdb
+
+from . import fx
+
+logger = logging.getLogger("data_product")
+
+# Configuration
+STRESS_WORKERS = int(os.getenv("STRESS_WORKERS", str(os.cpu_count() or 1)))
+STRESS_BATCH_SCENARIOS = int(os.getenv("STRESS_BATCH_SCENARIOS", "1000"))
+STRESS_CHUNK_CELLS = int(os.getenv("STRESS_CHUNK_CELLS", "500000"))  # per array
+STRESS_MAX_SCENARIOS = int(os.getenv("STRESS_MAX_SCENARIOS", "1000000"))
+STRESS_MAX_JOBS = int(os.getenv("STRESS_MAX_JOBS", "100"))  # finished jobs kept
+
+DEFAULT_PARAMETERS = {
+    "covenant": 1.2,
+    "rate_shock": 0.0,  # percentage points added to every rate
+    "rate_volatility": 1.0,  # percentage points
+    "revenue_shock": 0.0,  # relative, -0.1 is a 10% revenue drop
+    "revenue_volatility": 0.15,
+    "revenue_correlation": 0.3,
+    "fx_shock": 0.0,  # relative move of foreign currencies against USD
+    "fx_volatility": 0.1,
+}
+
+
+def load_portfolio(
+    conn: duckdb.DuckDBPyConnection,
+    portfolio_id: str,
+    source: str = "projects",
+    reporting_currency: Optional[str] = None,
+    fx_date: Optional[date] = None,
+) -> Dict[str, Any]:
+    """Load the allocated projects of a portfolio as column arrays.
+
+    Raises:
+        LookupError: If the portfolio does not exist
+        ValueError: If it has no allocated projects, mixes currencies without
+            a reporting currency, or one of its currencies has no rate
+    """
+    if not conn.execute(
+        "SELECT 1 FROM portfolios WHERE portfolio_id = ?", (portfolio_id,)
+    ).fetchone():
+        raise LookupError(f"Portfolio not found: {portfolio_id}")
+    source = fx.portfolio_source(
+        conn, portfolio_id, source, reporting_currency, fx_date
+    )
+    currency = "p.currency_code"
+    if reporting_currency is not None:
+        currency = "p.original_currency"
+    rows = conn.execute(
+        f"""
+        SELECT
+            p.total_amount::DOUBLE * a.allocation_percentage::DOUBLE / 100,
+            p.expected_tri::DOUBLE / 100,
+            p.maturity_years::DOUBLE,
+            p.dscr::DOUBLE,
+            {currency}
+        FROM portfolio_projects a
+        JOIN {source} p ON p.project_id = a.project_id
+        WHERE a.portfolio_id = ? AND p.maturity_years > 0
+        """,
+        (portfolio_id,),
+    ).fetchall()
+    if not rows:
+        raise ValueError(f"Portfolio {portfolio_id} has no projects to stress")
+    if reporting_currency is None:
+        reporting_currency = rows[0][4]
+
+    from . import monte_carlo  # deferred: keeps NumPy out of the import path
+
+    block, currencies = monte_carlo.to_block(rows, reporting_currency)
+    return {"block": block, "currencies": currencies}
+
+
+class StressJob:
+    """State and partial results of one stress run."""
+
+    def __init__(
+        self,
+        portfolio_id: str,
+        scenarios: int,
+        seed: int,
+        parameters,
+        currency: str = fx.BASE_CURRENCY,
+    ):
+        self.job_id = str(uuid.uuid4())
+        self.portfolio_id = portfolio_id
+        self.currency = currency
+        self.scenarios = scenarios
+        self.seed = seed
+        self.parameters = parameters
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.batches: Dict[int, Any] = {}  # batch index -> (2, n) draws
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    @property
+    def scenarios_done(self) -> int:
+        return sum(batch.shape[1] for batch in self.batches.values())
+
+    def summary(self) -> Dict[str, Any]:
+        """Status with percentiles over the batches completed so far."""
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        done = self.scenarios_done
+        result = {
+            "job_id": self.job_id,
+            "portfolio_id": self.portfolio_id,
+            "status": self.status,
+            "seed": self.seed,
+            "currency": self.currency,
+            "parameters": self.parameters,
+            "scenarios": self.scenarios,
+            "scenarios_done": done,
+            "progress": round(done / self.scenarios, 4),
+            "elapsed_seconds": round(elapsed, 3),
+            "scenarios_per_second": round(done / elapsed, 1) if elapsed else None,
+        }
+        if self.error:
+            result["error"] = self.error
+        if done:
+            from . import monte_carlo
+
+            result["results"] = monte_carlo.summarize(
+                self.batches, self.parameters["covenant"]
+            )
+        return result
+
+
+class StressEngine:
+    """Run stress jobs on a lazily created process pool."""
+
+    def __init__(
+        self,
+        workers: int = STRESS_WORKERS,
+        batch_scenarios: int = STRESS_BATCH_SCENARIOS,
+        max_jobs: int = STRESS_MAX_JOBS,
+        chunk_cells: int = STRESS_CHUNK_CELLS,
+    ):
+        self.workers = workers
+        self.batch_scenarios = batch_scenarios
+        self.chunk_cells = chunk_cells
+        self.max_jobs = max_jobs
+        self.jobs: "OrderedDict[str, StressJob]" = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks = set()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that holds DuckDB and event loop threads
+            # is unsafe
+            self._executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def submit(
+        self,
+        portfolio: Dict[str, Any],
+        portfolio_id: str,
+        scenarios: int,
+        seed: Optional[int] = None,
+        parameters: Optional[Dict[str, float]] = None,
+    ) -> StressJob:
+        """Start a job on the running event loop and return it immediately.
+
+        Raises:
+            ValueError: If ``scenarios`` is out of range
+        """
+        if not 0 < scenarios <= STRESS_MAX_SCENARIOS:
+            raise ValueError(f"scenarios must be between 1 and {STRESS_MAX_SCENARIOS}")
+        job = StressJob(
+            portfolio_id,
+            scenarios,
+            secrets.randbits(32) if seed is None else seed,
+            {**DEFAULT_PARAMETERS, **(parameters or {})},
+            portfolio["currencies"][0],
+        )
+        self.jobs[job.job_id] = job
+        self._evict_finished()
+        task = asyncio.create_task(self._run(job, portfolio))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[StressJob]:
+        return self.jobs.get(job_id)
+
+    def _evict_finished(self):
+        finished = [j for j, job in self.jobs.items() if job.finished is not None]
+        for job_id in finished[: max(len(self.jobs) - self.max_jobs, 0)]:
+            del self.jobs[job_id]
+
+    async def _run(self, job: StressJob, portfolio: Dict[str, Any]):
+        from . import monte_carlo
+
+        block = portfolio["block"]
+        shm = monte_carlo.share(block)
+        try:
+            sizes = [
+                min(self.batch_scenarios, job.scenarios - start)
+                for start in range(0, job.scenarios, self.batch_scenarios)
+            ]
+            seeds = monte_carlo.batch_seeds(job.seed, len(sizes))
+            loop = asyncio.get_running_loop()
+            job.status = "running"
+
+            async def batch(i: int):
+                job.batches[i] = await loop.run_in_executor(
+                    self._pool(),
+                    monte_carlo.run_batch,
+                    shm.name,
+                    block.shape,
+                    len(portfolio["currencies"]),
+                    job.parameters,
+                    seeds[i],
+                    sizes[i],
+                    self.chunk_cells,
+                )
+
+            await asyncio.gather(*(batch(i) for i in range(len(sizes))))
+            job.status = "completed"
+            logger.info(
+                "Stress job %s completed: %d scenarios", job.job_id, job.scenarios
+            )
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error("Stress job %s failed: %s", job.job_id, e)
+        finally:
+            job.finished = time.perf_counter()
+            shm.close()
+            shm.unlink()
+
+    def shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Shared engine, shut down from the application lifespan
+stress_engine = StressEngine()
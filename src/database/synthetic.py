@@ -0,0 +1,325 @@
+"""Synthetic project-finance data generator.
+
+Rows are generated inside DuckDB from ``range()`` with vectorized
+expressions, in chunks, so a hundred million projects are a matter of
+minutes rather than hours. Every "random" value is derived from
+``hash(row index, seed, column)``, and IDs from an MD5 of the seed and row
+index: the output depends only on the seed, the requested counts and the
+reference date, not on thread scheduling.
+
+Distributions aim at a plausible infrastructure-finance book:
+
+- ``total_amount``: log-normal, median 50M, clipped to 1M - 5B
+- ``maturity_years``: triangular between 5 and 35, peaking around 20
+- ``expected_tri``: normal, mean 9%, sd 2.5, clipped to 2 - 25
+- ``dscr``: normal, mean 1.45, sd 0.25, clipped to 0.8 - 3.0
+- ``status``: 20% PROPOSED, 55% ACTIVE, 25% COMPLETED
+- ``currency_code``: USD, EUR, GBP, JPY, CAD, AUD weighted by market share
+
+Each portfolio allocates to a contiguous run of 5 to 50 distinct projects
+starting at a hashed offset, with percentages that sum to at most 100, so
+every allocation references an existing project. Bulk-generated rows are
+not written to the change log.
+
+Usage::
+
+    python -m src.database.synthetic --projects 1000000 --portfolios 1000 --seed 42
+"""
+
+import argparse
+import logging
+import os
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import duckdb
+
+from .schema import SCHEMA_DEFINITIONS
+
+logger = logging.getLogger("data_product")
+
+# Configuration
+SYNTHETIC_CHUNK_ROWS = int(os.getenv("SYNTHETIC_CHUNK_ROWS", "5000000"))
+SYNTHETIC_MAX_PROJECTS = int(
+    os.getenv("SYNTHETIC_MAX_PROJECTS", "10000000")
+)  # per admin request
+SYNTHETIC_MAX_PORTFOLIOS = int(
+    os.getenv("SYNTHETIC_MAX_PORTFOLIOS", "100000")
+)  # per admin request, each with up to MAX_ALLOCATIONS allocations
+
+HISTORY_DAYS = 25 * 365
+MIN_ALLOCATIONS, MAX_ALLOCATIONS = 5, 50
+
+SECTORS = [
+    "Solar",
+    "Wind",
+    "Toll Road",
+    "Hospital",
+    "Port",
+    "Water",
+    "Airport",
+    "Rail",
+    "LNG Terminal",
+    "Data Center",
+]
+REGIONS = ["North", "South", "East", "West", "Central", "Coastal", "Highland"]
+STATUSES: List[Tuple[str, float]] = [
+    ("PROPOSED", 0.20),
+    ("ACTIVE", 0.55),
+    ("COMPLETED", 0.25),
+]
+CURRENCIES: List[Tuple[str, float]] = [
+    ("USD", 0.50),
+    ("EUR", 0.25),
+    ("GBP", 0.08),
+    ("JPY", 0.07),
+    ("CAD", 0.05),
+    ("AUD", 0.05),
+]
+RISK_PROFILES: List[Tuple[str, float]] = [
+    ("CONSERVATIVE", 0.40),
+    ("MODERATE", 0.40),
+    ("AGGRESSIVE", 0.20),
+]
+
+
+def _uniform(index: str, seed: int, column: str) -> str:
+    """SQL for a deterministic uniform draw in (0, 1)."""
+    return f"((hash({index}, {seed}, '{column}') % 1000000) + 0.5) / 1000000.0"
+
+
+def _normal(index: str, seed: int, column: str) -> str:
+    """SQL for a deterministic standard normal draw (Box-Muller)."""
+    return (
+        f"(sqrt(-2 * ln({_uniform(index, seed, column + '.1')}))"
+        f" * cos(2 * pi() * {_uniform(index, seed, column + '.2')}))"
+    )
+
+
+def _choice(options: List[Tuple[str, float]], draw: str) -> str:
+    """SQL picking a value from weighted ``options`` with a uniform draw."""
+    branches, cumulative = [], 0.0
+    for value, weight in options[:-1]:
+        cumulative += weight
+        branches.append(f"WHEN {draw} < {cumulative} THEN '{value}'")
+    return f"CASE {' '.join(branches)} ELSE '{options[-1][0]}' END"
+
+
+def _pick(values: List[str], index: str, seed: int, column: str) -> str:
+    quoted = ", ".join(f"'{v}'" for v in values)
+    return (
+        f"list_extract([{quoted}], "
+        f"1 + (hash({index}, {seed}, '{column}') % {len(values)})::BIGINT)"
+    )
+
+
+def _uuid(kind: str, index: str, seed: int) -> str:
+    """SQL for a deterministic UUID of row ``index`` of ``kind``."""
+    return f"md5('{seed}:{kind}:' || {index})::UUID"
+
+
+def projects_sql(seed: int, as_of: date) -> str:
+    """INSERT of projects ``[?, ?)`` for ``seed``, dated up to ``as_of``."""
+    i = "i"
+    return f"""
+        INSERT INTO projects (
+            project_id, project_name, description, total_amount, maturity_years,
+            expected_tri, dscr, status, creation_date, last_updated, currency_code
+        )
+        SELECT
+            {_uuid('project', i, seed)},
+            {_pick(SECTORS, i, seed, 'sector')} || ' '
+                || {_pick(REGIONS, i, seed, 'region')} || ' #' || i,
+            NULL,
+            least(greatest(
+                exp(ln(50000000) + 1.0 * {_normal(i, seed, 'amount')}),
+                1000000), 5000000000)::DECIMAL(20,2),
+            (5 + 15 * ({_uniform(i, seed, 'maturity.1')}
+                       + {_uniform(i, seed, 'maturity.2')}))::INTEGER,
+            least(greatest(9 + 2.5 * {_normal(i, seed, 'tri')}, 2), 25)::DECIMAL(5,2),
+            least(greatest(1.45 + 0.25 * {_normal(i, seed, 'dscr')}, 0.8), 3.0)
+                ::DECIMAL(5,2),
+            {_choice(STATUSES, _uniform(i, seed, 'status'))},
+            DATE '{as_of}' - (hash({i}, {seed}, 'created') % {HISTORY_DAYS})::INTEGER,
+            TIMESTAMP '{as_of}' - INTERVAL 1 SECOND
+                * (hash({i}, {seed}, 'updated') % 86400)::BIGINT,
+            {_choice(CURRENCIES, _uniform(i, seed, 'currency'))}
+        FROM range(?, ?) t({i})
+    """
+
+
+def portfolios_sql(seed: int, as_of: date) -> str:
+    """INSERT of portfolios ``[?, ?)`` for ``seed``, dated up to ``as_of``."""
+    i = "i"
+    return f"""
+        INSERT INTO portfolios (
+            portfolio_id, portfolio_name, description, risk_profile,
+            total_committed_amount, inception_date, last_updated
+        )
+        SELECT
+            {_uuid('portfolio', i, seed)},
+            'Portfolio #' || i,
+            NULL,
+            {_choice(RISK_PROFILES, _uniform(i, seed, 'risk'))},
+            least(greatest(
+                exp(ln(500000000) + 0.8 * {_normal(i, seed, 'committed')}),
+                10000000), 50000000000)::DECIMAL(20,2),
+            DATE '{as_of}' - (hash({i}, {seed}, 'inception') % {HISTORY_DAYS})::INTEGER,
+            TIMESTAMP '{as_of}'
+        FROM range(?, ?) t({i})
+    """
+
+
+def allocations_sql(seed: int, project_count: int, as_of: date) -> str:
+    """INSERT of the allocations of portfolios ``[?, ?)`` for ``seed``.
+
+    Percentages are weights in [0.1, 1] over the portfolio total, truncated
+    to two decimals, so each is at least 0.2% and they sum to at most 100.
+    """
+    i = "i"
+    span = MAX_ALLOCATIONS - MIN_ALLOCATIONS + 1
+    return f"""
+        INSERT INTO portfolio_projects (
+            portfolio_id, project_id, allocation_percentage, entry_date
+        )
+        WITH picks AS (
+            SELECT
+                {i},
+                j,
+                ((hash({i}, {seed}, 'offset') % {project_count})::BIGINT + j)
+                    % {project_count} AS project,
+                0.1 + 0.9 * {_uniform(f"{i} * {MAX_ALLOCATIONS} + j", seed, 'weight')}
+                    AS weight
+            FROM range(?, ?) t({i}),
+                 range({MAX_ALLOCATIONS}) r(j)
+            WHERE j < {MIN_ALLOCATIONS} + hash({i}, {seed}, 'count') % {span}
+              AND j < {project_count}
+        )
+        SELECT
+            {_uuid('portfolio', i, seed)},
+            {_uuid('project', 'project', seed)},
+            (floor(weight / sum(weight) OVER (PARTITION BY {i}) * 10000) / 100)
+                ::DECIMAL(5,2),
+            DATE '{as_of}' - (hash({i}, {seed}, 'entry') % 365)::INTEGER
+        FROM picks
+    """
+
+
+def generate(
+    conn: duckdb.DuckDBPyConnection,
+    projects: int,
+    portfolios: int = 0,
+    seed: int = 0,
+    chunk_rows: int = SYNTHETIC_CHUNK_ROWS,
+    start: int = 0,
+    as_of: Optional[date] = None,
+) -> Dict[str, Any]:
+    """Generate synthetic projects, portfolios and allocations.
+
+    Rows ``start`` to ``start + projects`` of the seed's project sequence are
+    inserted, so a table can be grown in steps. Portfolios allocate to
+    projects ``0`` to ``start + projects`` and are always numbered from 0.
+    Each chunk is committed separately.
+
+    Dates fall in the 25 years before ``as_of``; the same seed, counts and
+    ``as_of`` always yield the same rows.
+
+    Args:
+        conn: Open DuckDB connection with the schema applied
+        projects: Number of projects to generate
+        portfolios: Number of portfolios to generate, with their allocations
+        seed: Seed of the pseudo-random draws and IDs
+        chunk_rows: Rows per INSERT statement
+        start: Index of the first project to generate
+        as_of: Reference date (default: today)
+
+    Returns:
+        Row counts and elapsed seconds per table
+
+    Raises:
+        duckdb.ConstraintException: If rows of this seed already exist
+        ValueError: If allocations reference projects that do not exist, as
+            with ``start`` > 0 before projects ``0`` to ``start`` of the seed
+    """
+    as_of = as_of or date.today()
+    summary: Dict[str, Any] = {"seed": seed, "as_of": as_of.isoformat()}
+    total_projects = start + projects
+    if portfolios and not total_projects:
+        raise ValueError("Portfolios need at least one project to allocate to")
+
+    plan = [("projects", projects_sql(seed, as_of), start, total_projects, chunk_rows)]
+    if portfolios:
+        plan += [
+            ("portfolios", portfolios_sql(seed, as_of), 0, portfolios, chunk_rows),
+            (
+                "portfolio_projects",
+                allocations_sql(seed, total_projects, as_of),
+                0,
+                portfolios,
+                max(chunk_rows // MAX_ALLOCATIONS, 1),
+            ),
+        ]
+
+    for table, sql, first, last, step in plan:
+        started = time.perf_counter()
+        rows = 0
+        for low in range(first, last, step):
+            high = min(low + step, last)
+            conn.begin()
+            try:
+                rows += conn.execute(sql, (low, high)).fetchone()[0]
+                conn.commit()
+            except duckdb.ConstraintException as ce:
+                conn.rollback()
+                if "foreign key" not in str(ce):
+                    raise
+                raise ValueError(
+                    f"Allocations reference projects of seed {seed} that do not "
+                    f"exist; generate projects 0 to {start} first"
+                ) from ce
+            except Exception:
+                conn.rollback()
+                raise
+        summary[table] = {
+            "rows": rows,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info("Generated %d synthetic rows in %s", rows, table)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate synthetic project data")
+    parser.add_argument("--db", default="data/data_product.db")
+    parser.add_argument("--projects", type=int, required=True)
+    parser.add_argument("--portfolios", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None)
+    parser.add_argument("--chunk-rows", type=int, default=SYNTHETIC_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    os.makedirs(os.path.dirname(args.db) or ".", exist_ok=True)
+    conn = duckdb.connect(args.db)
+    try:
+        for table in ("projects", "portfolios", "portfolio_projects"):
+            conn.execute(SCHEMA_DEFINITIONS[table])
+        summary = generate(
+            conn,
+            args.projects,
+            args.portfolios,
+            seed=args.seed,
+            chunk_rows=args.chunk_rows,
+            start=args.start,
+            as_of=args.as_of,
+        )
+    finally:
+        conn.close()
+    for table, stats in summary.items():
+        if isinstance(stats, dict):
+            print(f"{table}: {stats['rows']} rows in {stats['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
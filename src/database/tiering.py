@@ -0,0 +1,257 @@
+"""Tiered storage module for cold project data.
+
+Projects that are rarely read (by default ``COMPLETED`` projects created more
+than a few years ago) are aged out of the DuckDB file into Hive-partitioned
+Parquet files on local disk, laid out as::
+
+    <COLD_STORAGE_PATH>/projects/year=<creation year>/status=<status>/*.parquet
+
+Reads go through the ``projects_all`` view, a ``UNION ALL`` of the hot table and
+the Parquet files, so the API keeps returning complete results. Filters on
+``status`` and ``creation_year`` are pushed down as file filters, pruning whole
+partitions. Keeping the hot file small keeps checkpoints, backups and hot scans
+fast.
+
+Projects still referenced by a portfolio allocation stay hot, since the
+``portfolio_projects`` foreign key requires the row to exist in ``projects``.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import uuid
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import duckdb
+
+from .connection_manager import DuckDBConnectionManager
+
+logger = logging.getLogger("data_product")
+
+# Configuration
+COLD_STORAGE_PATH = os.getenv("COLD_STORAGE_PATH", "data/cold")
+TIERING_MIN_AGE_YEARS = int(os.getenv("TIERING_MIN_AGE_YEARS", "3"))
+TIERING_STATUSES = os.getenv("TIERING_STATUSES", "COMPLETED").split(",")
+TIERING_INTERVAL = int(os.getenv("TIERING_INTERVAL", "0"))  # seconds, 0 disables
+
+HOT_TABLE = "projects"
+UNIFIED_VIEW = "projects_all"
+
+
+class ProjectTiering:
+    """Moves cold projects to partitioned Parquet and maintains the unified view."""
+
+    def __init__(self, conn_manager=None, cold_path: str = COLD_STORAGE_PATH):
+        """Initialize tiered storage.
+
+        Args:
+            conn_manager: Object exposing ``get_connection()``; defaults to the
+                shared DuckDB connection manager
+            cold_path: Root directory of the cold Parquet store
+        """
+        self.conn_manager = conn_manager or DuckDBConnectionManager()
+        self.cold_path = os.path.abspath(os.path.join(cold_path, HOT_TABLE))
+        self._view_ready = False
+
+    @property
+    def cold_glob(self) -> str:
+        """Glob matching every cold Parquet file."""
+        return os.path.join(self.cold_path, "year=*", "status=*", "*.parquet")
+
+    def cold_files(self) -> List[str]:
+        """List the cold Parquet files currently on disk."""
+        files = []
+        if os.path.isdir(self.cold_path):
+            for root, _, names in os.walk(self.cold_path):
+                if os.path.basename(root).startswith("status="):
+                    files.extend(
+                        os.path.join(root, n) for n in names if n.endswith(".parquet")
+                    )
+        return files
+
+    def _hot_columns(self, conn: duckdb.DuckDBPyConnection) -> List[tuple]:
+        return conn.execute(
+            """
+            SELECT column_name, data_type
+            FROM duckdb_columns()
+            WHERE table_name = ? AND schema_name = 'main'
+            ORDER BY column_index
+            """,
+            (HOT_TABLE,),
+        ).fetchall()
+
+    def refresh_view(self, conn: Optional[duckdb.DuckDBPyConnection] = None):
+        """(Re)create the unified view over hot rows and cold Parquet files.
+
+        The cold branch is only included once cold files exist, since
+        ``read_parquet`` fails on a glob without matches.
+        """
+        if conn is None:
+            with self.conn_manager.get_connection() as conn:
+                return self.refresh_view(conn)
+
+        columns = self._hot_columns(conn)
+        names = ", ".join(name for name, _ in columns)
+        query = (
+            f"SELECT {names}, year(creation_date)::INTEGER AS creation_year "
+            f"FROM {HOT_TABLE}"
+        )
+        if self.cold_files():
+            # Cast back to the hot types so both branches line up exactly
+            casts = ", ".join(
+                f"CAST({name} AS {dtype}) AS {name}" for name, dtype in columns
+            )
+            query += (
+                f"\nUNION ALL\nSELECT {casts}, CAST(year AS INTEGER) AS creation_year "
+                f"FROM read_parquet('{self.cold_glob}', hive_partitioning = true)"
+            )
+
+        conn.execute(f"CREATE OR REPLACE VIEW {UNIFIED_VIEW} AS {query}")
+        self._view_ready = True
+
+    def read_source(self) -> str:
+        """Return the relation API reads should query, creating it on first use."""
+        if not self._view_ready:
+            self.refresh_view()
+        return UNIFIED_VIEW
+
+    def age_out(
+        self,
+        min_age_years: int = TIERING_MIN_AGE_YEARS,
+        statuses: Sequence[str] = TIERING_STATUSES,
+    ) -> Dict[str, Any]:
+        """Move cold projects from the hot table into the Parquet store.
+
+        Rows are first written to a staging directory outside the cold glob.
+        The hot rows are then deleted, the files moved into place and the
+        unified view refreshed in one transaction, so readers never see rows
+        missing; at most they see them in both tiers until the commit.
+
+        Args:
+            min_age_years: Minimum age of ``creation_date`` for a row to move
+            statuses: Project statuses eligible for tiering
+
+        Returns:
+            Summary with the number of moved rows and written files
+        """
+        today = date.today()
+        try:
+            cutoff = today.replace(year=today.year - min_age_years)
+        except ValueError:  # 29 February
+            cutoff = today.replace(year=today.year - min_age_years, day=28)
+
+        predicate = """
+            status IN (SELECT unnest(?::VARCHAR[]))
+            AND creation_date < ?
+            AND project_id NOT IN (SELECT project_id FROM portfolio_projects)
+        """
+        params = (list(statuses), cutoff)
+        staging = os.path.join(
+            os.path.dirname(self.cold_path), f".staging-{uuid.uuid4().hex}"
+        )
+        moved_files: List[str] = []
+
+        with self.conn_manager.get_connection() as conn:
+            conn.begin()
+            try:
+                count = conn.execute(
+                    f"SELECT COUNT(*) FROM {HOT_TABLE} WHERE {predicate}", params
+                ).fetchone()[0]
+                if not count:
+                    conn.rollback()
+                    return {"moved_rows": 0, "files": 0, "cutoff": cutoff}
+
+                os.makedirs(staging)
+                conn.execute(
+                    f"""
+                    COPY (
+                        SELECT *, year(creation_date) AS year
+                        FROM {HOT_TABLE}
+                        WHERE {predicate}
+                    ) TO '{staging}' (
+                        FORMAT PARQUET,
+                        PARTITION_BY (year, status),
+                        FILENAME_PATTERN 'part_{{uuid}}'
+                    )
+                    """,
+                    params,
+                )
+                deleted = conn.execute(
+                    f"DELETE FROM {HOT_TABLE} WHERE {predicate}", params
+                ).fetchone()[0]
+                if deleted != count:
+                    raise RuntimeError(
+                        f"Tiering row count changed during move ({count} != {deleted})"
+                    )
+
+                moved_files = self._promote(staging)
+                self.refresh_view(conn)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                for path in moved_files:
+                    os.remove(path)
+                logger.error("Tiering failed, rolled back: %s", e)
+                raise
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+
+            conn.execute("CHECKPOINT")
+
+        logger.info(
+            "Tiered %s projects created before %s into %s Parquet files",
+            deleted,
+            cutoff,
+            len(moved_files),
+        )
+        return {"moved_rows": deleted, "files": len(moved_files), "cutoff": cutoff}
+
+    def _promote(self, staging: str) -> List[str]:
+        """Move staged partition files into the cold store, keeping the layout."""
+        moved = []
+        for root, _, names in os.walk(staging):
+            target_dir = os.path.join(self.cold_path, os.path.relpath(root, staging))
+            for name in names:
+                os.makedirs(target_dir, exist_ok=True)
+                target = os.path.join(target_dir, name)
+                os.replace(os.path.join(root, name), target)
+                moved.append(target)
+        return moved
+
+    def status(self) -> Dict[str, Any]:
+        """Describe the hot and cold tiers."""
+        files = self.cold_files()
+        partitions = sorted(
+            {os.path.relpath(os.path.dirname(f), self.cold_path) for f in files}
+        )
+        with self.conn_manager.get_connection() as conn:
+            hot_rows = conn.execute(f"SELECT COUNT(*) FROM {HOT_TABLE}").fetchone()[0]
+            cold_rows = (
+                conn.execute(
+                    f"SELECT COUNT(*) FROM read_parquet('{self.cold_glob}')"
+                ).fetchone()[0]
+                if files
+                else 0
+            )
+        return {
+            "hot_rows": hot_rows,
+            "cold_rows": cold_rows,
+            "cold_files": len(files),
+            "cold_bytes": sum(os.path.getsize(f) for f in files),
+            "partitions": partitions,
+        }
+
+    async def run_periodic(self, interval: int = TIERING_INTERVAL):
+        """Run the tiering job on a fixed interval until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.age_out)
+            except Exception as e:
+                logger.error("Scheduled tiering failed: %s", e)
+
+
+# Shared tiering instance
+project_tiering = ProjectTiering()
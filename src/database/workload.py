@@ -0,0 +1,340 @@
+"""Query workload capture.
+
+While ``WORKLOAD_CAPTURE`` is on, connections handed out by the pool are
+wrapped so every ``execute`` / ``executemany`` is timed and recorded under
+the fingerprint of its normalized statement: literals become ``?``, ``IN``
+lists collapse to one placeholder and whitespace is squeezed, so the same
+query with different values aggregates into one entry. An entry keeps the
+call count, total and maximum latency, the relations it reads, the
+predicates it filters on (``table.column op``) and one sample statement with
+its parameters for replay.
+
+Entries live in memory, bounded by ``WORKLOAD_MAX_FINGERPRINTS``, and are
+flushed as additive upserts into ``query_workload`` so the stored workload
+stays one row per fingerprint whatever the traffic. Normalization runs once
+per distinct SQL string; the per-call cost is a dictionary lookup and a lock.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+import duckdb
+
+logger = logging.getLogger("data_product")
+
+# Configuration
+WORKLOAD_CAPTURE = os.getenv("WORKLOAD_CAPTURE", "true").lower() == "true"
+WORKLOAD_MAX_FINGERPRINTS = int(os.getenv("WORKLOAD_MAX_FINGERPRINTS", "1000"))
+
+WORKLOAD_TABLE = "query_workload"
+RECOMMENDATIONS_TABLE = "workload_recommendations"
+
+# Statements worth recording; DDL, COPY, CHECKPOINT and transaction control
+# are not workload
+_KINDS = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+_INTERNAL = re.compile(rf"\b({WORKLOAD_TABLE}|{RECOMMENDATIONS_TABLE})\b", re.I)
+_COMMENT = re.compile(r"--[^\n]*")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|(?<![\w.])\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_SPACE = re.compile(r"\s+")
+_KEYWORDS = (
+    "WHERE|ON|USING|JOIN|LEFT|RIGHT|FULL|INNER|OUTER|CROSS|ASOF|SEMI|ANTI|"
+    "POSITIONAL|NATURAL|GROUP|ORDER|LIMIT|OFFSET|HAVING|WINDOW|QUALIFY|UNION|"
+    "EXCEPT|INTERSECT|SET|VALUES|SELECT|RETURNING|BY|DEFAULT"
+)
+_RELATION = re.compile(
+    rf"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)\b(?!\s*\()"
+    rf"(?:\s+(?:AS\s+)?(?!(?:{_KEYWORDS})\b)(\w+))?",
+    re.I,
+)
+_PREDICATE = re.compile(
+    r"(?:\b(\w+)\.)?\b(\w+)\s*(<=|>=|<>|!=|=|<|>|\bIN\b|\bBETWEEN\b|\bLIKE\b)"
+    r"\s*\(?\s*\?",
+    re.I,
+)
+# Bound on the raw-SQL to fingerprint cache
+_CACHE_SIZE = 4096
+
+
+def normalize(sql: str) -> str:
+    """Statement with literals replaced by ``?`` and whitespace squeezed."""
+    statement = _LITERAL.sub("?", _COMMENT.sub(" ", sql))
+    statement = _IN_LIST.sub("IN (?)", statement)
+    return _SPACE.sub(" ", statement).strip().rstrip(";")
+
+
+def relations(statement: str) -> List[Tuple[str, str]]:
+    """``(relation, alias)`` pairs read or written by a statement."""
+    return [
+        (name.lower(), (alias or name).lower())
+        for name, alias in _RELATION.findall(statement)
+    ]
+
+
+def predicates(statement: str) -> List[str]:
+    """Filters on a placeholder as ``table.column op``.
+
+    The table is resolved through aliases; it is left empty when the column
+    is unqualified and the statement reads more than one relation.
+    """
+    relation_list = relations(statement)
+    aliases = {alias: name for name, alias in relation_list}
+    only = relation_list[0][0] if len({n for n, _ in relation_list}) == 1 else ""
+    found = []
+    for qualifier, column, op in _PREDICATE.findall(statement):
+        table = aliases.get(qualifier.lower(), qualifier.lower()) if qualifier else only
+        entry = f"{table}.{column.lower()} {op.upper()}"
+        if entry not in found:
+            found.append(entry)
+    return found
+
+
+def encode_params(params: Any) -> Optional[str]:
+    """JSON of statement parameters, keeping the types replay needs."""
+
+    def encode(value):
+        if isinstance(value, datetime):
+            return {"datetime": value.isoformat()}
+        if isinstance(value, date):
+            return {"date": value.isoformat()}
+        if isinstance(value, uuid.UUID):
+            return {"uuid": str(value)}
+        if isinstance(value, Decimal):
+            return {"decimal": str(value)}
+        if isinstance(value, (list, tuple)):
+            return [encode(v) for v in value]
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        return str(value)
+
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return json.dumps({k: encode(v) for k, v in params.items()})
+    return json.dumps(encode(list(params)))
+
+
+def decode_params(data: Optional[str]) -> Any:
+    """Parameters stored by ``encode_params``."""
+    types = {
+        "datetime": datetime.fromisoformat,
+        "date": date.fromisoformat,
+        "uuid": uuid.UUID,
+        "decimal": Decimal,
+    }
+
+    def decode(value):
+        if isinstance(value, dict) and len(value) == 1:
+            ((kind, text),) = value.items()
+            if kind in types:
+                return types[kind](text)
+        if isinstance(value, list):
+            return [decode(v) for v in value]
+        return value
+
+    if data is None:
+        return None
+    params = json.loads(data)
+    if isinstance(params, dict):
+        return {k: decode(v) for k, v in params.items()}
+    return decode(params)
+
+
+class _Entry:
+    """Aggregated calls of one fingerprint since the last flush."""
+
+    __slots__ = (
+        "statement",
+        "kind",
+        "sample_sql",
+        "sample_params",
+        "calls",
+        "total_ms",
+        "max_ms",
+        "first_seen",
+        "last_seen",
+    )
+
+    def __init__(self, statement: str, kind: str, sql: str, params: Any):
+        self.statement = statement
+        self.kind = kind
+        self.sample_sql = sql
+        self.sample_params = params
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.first_seen = self.last_seen = datetime.now()
+
+
+class WorkloadRecorder:
+    """In-memory aggregation of executed statements by fingerprint."""
+
+    def __init__(self, max_fingerprints: int = WORKLOAD_MAX_FINGERPRINTS):
+        """Initialize the recorder.
+
+        Args:
+            max_fingerprints: Distinct fingerprints kept between flushes;
+                calls of new fingerprints beyond it are counted as dropped
+        """
+        self.max_fingerprints = max_fingerprints
+        self.enabled = WORKLOAD_CAPTURE
+        self.dropped = 0
+        self._fingerprints: Dict[str, Optional[Tuple[str, str, str]]] = {}
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = Lock()
+
+    def _fingerprint(self, sql: str) -> Optional[Tuple[str, str, str]]:
+        """``(fingerprint, statement, kind)``, or None if not recorded."""
+        try:
+            return self._fingerprints[sql]
+        except KeyError:
+            pass
+        statement = normalize(sql)
+        kind = statement.split(" ", 1)[0].upper()
+        if kind not in _KINDS or _INTERNAL.search(statement):
+            result = None
+        else:
+            digest = hashlib.sha1(statement.encode()).hexdigest()[:16]
+            result = (digest, statement, kind)
+        if len(self._fingerprints) < _CACHE_SIZE:
+            self._fingerprints[sql] = result
+        return result
+
+    def record(self, sql: str, params: Any, elapsed_ms: float):
+        """Add one execution of ``sql`` to its fingerprint."""
+        found = self._fingerprint(sql)
+        if found is None:
+            return
+        fingerprint, statement, kind = found
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    self.dropped += 1
+                    return
+                entry = self._entries[fingerprint] = _Entry(
+                    statement, kind, sql, params
+                )
+            entry.calls += 1
+            entry.total_ms += elapsed_ms
+            entry.max_ms = max(entry.max_ms, elapsed_ms)
+            entry.last_seen = datetime.now()
+
+    def pending(self) -> int:
+        """Fingerprints recorded since the last flush."""
+        with self._lock:
+            return len(self._entries)
+
+    def flush(self, conn: duckdb.DuckDBPyConnection) -> int:
+        """Upsert the recorded entries into ``query_workload`` and reset them.
+
+        Returns:
+            Number of fingerprints written
+        """
+        with self._lock:
+            entries, self._entries = self._entries, {}
+        if not entries:
+            return 0
+        rows = [
+            (
+                fingerprint,
+                e.statement,
+                e.kind,
+                sorted({name for name, _ in relations(e.statement)}),
+                predicates(e.statement),
+                e.sample_sql,
+                encode_params(e.sample_params),
+                e.calls,
+                e.total_ms,
+                e.max_ms,
+                e.first_seen,
+                e.last_seen,
+            )
+            for fingerprint, e in entries.items()
+        ]
+        try:
+            conn.executemany(
+                f"""
+                INSERT INTO {WORKLOAD_TABLE} VALUES
+                    (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (fingerprint) DO UPDATE SET
+                    calls = calls + excluded.calls,
+                    total_ms = total_ms + excluded.total_ms,
+                    max_ms = greatest(max_ms, excluded.max_ms),
+                    sample_sql = excluded.sample_sql,
+                    sample_params = excluded.sample_params,
+                    last_seen = excluded.last_seen
+                """,
+                rows,
+            )
+        except Exception:
+            # Keep the calls for the next flush instead of losing them
+            with self._lock:
+                for fingerprint, entry in entries.items():
+                    self._merge(fingerprint, entry)
+            raise
+        return len(rows)
+
+    def _merge(self, fingerprint: str, entry: _Entry):
+        current = self._entries.get(fingerprint)
+        if current is None:
+            self._entries[fingerprint] = entry
+            return
+        current.calls += entry.calls
+        current.total_ms += entry.total_ms
+        current.max_ms = max(current.max_ms, entry.max_ms)
+        current.first_seen = min(current.first_seen, entry.first_seen)
+
+    def wrap(self, connection: duckdb.DuckDBPyConnection):
+        """``connection`` with its statements recorded, if capture is on."""
+        return RecordingConnection(connection, self) if self.enabled else connection
+
+
+class RecordingConnection:
+    """DuckDB connection proxy timing ``execute`` and ``executemany``.
+
+    Both return the underlying connection, like DuckDB does, so chained
+    ``fetch*`` calls and everything else go straight to DuckDB.
+    """
+
+    def __init__(self, connection: duckdb.DuckDBPyConnection, recorder):
+        self._connection = connection
+        self._recorder = recorder
+
+    def _timed(self, method, sql: str, params: Any, sample: Any):
+        started = time.perf_counter()
+        try:
+            return method(sql) if params is None else method(sql, params)
+        finally:
+            self._recorder.record(sql, sample, (time.perf_counter() - started) * 1000)
+
+    def execute(self, sql: str, parameters: Any = None):
+        return self._timed(self._connection.execute, sql, parameters, parameters)
+
+    def executemany(self, sql: str, parameters: Any = None):
+        # Recorded as one call; the sample keeps the first parameter set
+        parameters = list(parameters) if parameters is not None else None
+        sample = parameters[0] if parameters else None
+        return self._timed(self._connection.executemany, sql, parameters, sample)
+
+    def __getattr__(self, name: str):
+        return getattr(self._connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return self._connection.__exit__(*exc)
+
+
+# Shared recorder, fed by the connection pool
+workload_recorder = WorkloadRecorder()
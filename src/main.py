@@ -13,27 +13,44 @@ Key architectural decisions:
 - Connection Pool: Ensures thread safety and resource efficiency
 """
 
+import asyncio
+import time
 from contextlib import asynccontextmanager
-from datetime import datetime
 
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import JSONResponse
 from prometheus_fastapi_instrumentator import Instrumentator
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
 
+from config.onto_server import schema_registry
+
+from .auth.jwt_handler import AuthMiddleware
+from .database.advisor import (
+    WORKLOAD_ANALYZE_INTERVAL,
+    WORKLOAD_FLUSH_INTERVAL,
+    workload_advisor,
+)
+from .database.change_log import change_log
 from .database.connection_manager import DuckDBConnectionManager
-from .routes import admin, monitoring, operations
+from .database.history import HISTORY_COMPACTION_INTERVAL, project_history
+from .database.quality import QUALITY_INTERVAL, quality_monitor
+from .database.stress import stress_engine
+from .database.tiering import TIERING_INTERVAL, project_tiering
+from .routes import admin, monitoring, operations, portfolios
+from .utils.compression import CompressionMiddleware
+from .utils.health import health_checker
 from .utils.logging_config import setup_logging
+from .utils.metrics import startup_duration_gauge
+from .utils.profiler import continuous_sampler
+from .utils.rate_limit import RateLimitMiddleware
+from .utils.system_metrics import SYSTEM_METRICS_INTERVAL, system_sampler
+from .utils.timing import ServerTimingMiddleware
+from .utils.tracing import tracer
 
 # Setup logging
 logger = setup_logging()
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
-
 # Initialize database connection manager
 db_manager = DuckDBConnectionManager()
 
@@ -42,10 +59,51 @@ db_manager = DuckDBConnectionManager()
 async def lifespan(app: FastAPI):
     """Lifespan events for FastAPI application."""
     # Startup
+    started = time.perf_counter()
     await db_manager.initialize_database()
     logger.info("Database initialized")
+    background_tasks = [
+        asyncio.create_task(change_log.run_retention()),
+        asyncio.create_task(health_checker.run()),
+    ]
+    if TIERING_INTERVAL > 0:
+        background_tasks.append(
+            asyncio.create_task(project_tiering.run_periodic(TIERING_INTERVAL))
+        )
+    if HISTORY_COMPACTION_INTERVAL > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                project_history.run_periodic(HISTORY_COMPACTION_INTERVAL)
+            )
+        )
+    if QUALITY_INTERVAL > 0:
+        background_tasks.append(
+            asyncio.create_task(quality_monitor.run_periodic(QUALITY_INTERVAL))
+        )
+    if workload_advisor.recorder.enabled and WORKLOAD_FLUSH_INTERVAL > 0:
+        background_tasks.append(
+            asyncio.create_task(workload_advisor.run_flush(WORKLOAD_FLUSH_INTERVAL))
+        )
+    if WORKLOAD_ANALYZE_INTERVAL > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                workload_advisor.run_periodic(WORKLOAD_ANALYZE_INTERVAL)
+            )
+        )
+    if SYSTEM_METRICS_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(system_sampler.run()))
+    continuous_sampler.start()
+    startup_seconds = time.perf_counter() - started
+    startup_duration_gauge.labels(phase="lifespan").set(startup_seconds)
+    logger.info("Startup completed in %.1f ms", startup_seconds * 1000)
     yield
     # Shutdown
+    for task in background_tasks:
+        task.cancel()
+    continuous_sampler.stop()
+    stress_engine.shutdown()
+    await schema_registry.aclose()
+    tracer.shutdown()
     try:
         db_manager.close_all()
         logger.info("Gracefully closed all database connections")
@@ -61,9 +119,16 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# Add rate limiter to app state
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+# Innermost middleware: negotiated zstd / brotli / gzip response compression
+app.add_middleware(CompressionMiddleware)
+
+# Bearer-token authentication (AUTH_ENABLED), served from the verified-token
+# cache. Runs inside rate limiting, so rejected tokens still cost tokens.
+app.add_middleware(AuthMiddleware)
+
+# Cost-weighted token buckets shared by all workers on the host. Added before
+# CORS, so it runs inside it and 429 responses still carry CORS headers.
+app.add_middleware(RateLimitMiddleware, router=app.router)
 
 # Configure CORS with specific allowed origins
 allowed_origins = [
@@ -78,17 +143,25 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=[
         "Authorization",
         "Content-Type",
         "Accept",
         "Origin",
         "X-Requested-With",
+        "X-Request-ID",
     ],
     expose_headers=[
+        "Content-Encoding",
         "Content-Length",
         "Content-Range",
+        "Server-Timing",
+        "X-Request-ID",
+        "RateLimit-Limit",
+        "RateLimit-Remaining",
+        "RateLimit-Reset",
+        "Retry-After",
     ],
     max_age=3600,  # Cache preflight requests for 1 hour
 )
@@ -105,9 +178,13 @@ app.add_middleware(
     ],
 )
 
+# Outermost middleware: per-phase latency histograms and Server-Timing header
+app.add_middleware(ServerTimingMiddleware)
+
 # Register routes
 app.include_router(admin.router)
 app.include_router(operations.router)
+app.include_router(portfolios.router)
 app.include_router(monitoring.router)
 
 # Initialize Prometheus instrumentation
@@ -116,8 +193,7 @@ instrumentator.instrument(app)
 
 
 @app.get("/")
-@limiter.limit("5/minute")
-async def root(request: Request):
+async def root():
     """Root endpoint."""
     logger.info("Root endpoint accessed")
     return {
@@ -127,22 +203,24 @@ async def root(request: Request):
     }
 
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and the event loop is serving."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe, served from the background checker's cached status.
+
+    Returns 503 while starting, when DuckDB is unreachable, when the pool is
+    saturated or the event loop lags, so load balancers stop routing traffic.
+    """
+    status = health_checker.readiness()
+    return JSONResponse(status, status_code=200 if status["status"] == "ready" else 503)
+
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    try:
-        # Test database connection
-        with db_manager.get_connection() as conn:
-            conn.execute("SELECT 1").fetchone()
-
-        return {
-            "status": "healthy",
-            "database": "connected",
-            "timestamp": datetime.utcnow().isoformat(),
-        }
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        return Response(
-            content={"status": "unhealthy", "error": str(e)},
-            status_code=503,
-        )
+    """Health check endpoint; same cached status as ``/health/ready``."""
+    return await readiness_check()
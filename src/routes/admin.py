@@ -18,18 +18,42 @@ These endpoints are primarily intended for:
 """
 
 import logging
-from typing import Dict, Literal
+from datetime import date
+from typing import Dict, List, Literal
 
-from fastapi import APIRouter, HTTPException
+import duckdb
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
-from config.onto_server import ProjectSchema, get_project_schema_jsonld
+from config.onto_server import ProjectSchema, ProjectStatus, get_project_schema_jsonld
 
+from ..database.advisor import RecommendationError, workload_advisor
+from ..database.backup import SnapshotNotFoundError, snapshot_manager
+from ..database.compiled_schema import compile_schema
 from ..database.connection_manager import DuckDBConnectionManager
+from ..database.fx import load_rates, rates_summary
+from ..database.history import HISTORY_RETENTION_DAYS, project_history
+from ..database.quality import quality_monitor
+from ..database.synthetic import (
+    SYNTHETIC_MAX_PORTFOLIOS,
+    SYNTHETIC_MAX_PROJECTS,
+    generate,
+)
+from ..database.tiering import TIERING_MIN_AGE_YEARS, project_tiering
 from ..utils.metrics import table_creation_counter
+from ..utils.profiler import (
+    PROFILER_MAX_SECONDS,
+    Profile,
+    ProfilerBusyError,
+    continuous_sampler,
+    profile,
+)
+from ..utils.timing import TimedRoute, phase
 
 logger = logging.getLogger("data_product")
-router = APIRouter(prefix="/admin", tags=["Admin"])
+router = APIRouter(prefix="/admin", tags=["Admin"], route_class=TimedRoute)
 
 # Initialize connection manager
 conn_manager = DuckDBConnectionManager()
@@ -39,22 +63,12 @@ conn_manager = DuckDBConnectionManager()
 async def create_table():
     """Create a new table in DuckDB using the project schema."""
     try:
-        schema: ProjectSchema = await get_project_schema_jsonld()
-
-        # Create columns definition from schema
-        columns_def = []
-        for col in schema.columns:
-            constraint = "NOT NULL" if col.required else ""
-            columns_def.append(f"{col.name} {col.type} {constraint}".strip())
-
-        create_table_query = (
-            f"CREATE TABLE IF NOT EXISTS {schema.name} (\n"
-            + ",\n".join(columns_def)
-            + "\n);"
-        )
+        with phase("schema"):
+            schema: ProjectSchema = await get_project_schema_jsonld()
+        compiled = compile_schema(schema)
 
         with conn_manager.get_connection() as conn:
-            conn.execute(create_table_query)
+            conn.execute(compiled.create_table_sql)
 
         table_creation_counter.labels(status="success").inc()
         logger.info(f"Table {schema.name} created successfully")
@@ -113,6 +127,284 @@ async def list_tables():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/tiering/run")
+async def run_tiering(
+    min_age_years: int = Query(TIERING_MIN_AGE_YEARS, ge=0),
+    statuses: List[ProjectStatus] = Query([ProjectStatus.COMPLETED]),
+):
+    """Move cold projects from the DuckDB file to partitioned Parquet."""
+    try:
+        result = await run_in_threadpool(
+            project_tiering.age_out,
+            min_age_years,
+            [status.value for status in statuses],
+        )
+        logger.info("Tiering run completed: %s rows moved", result["moved_rows"])
+        return result
+    except Exception as e:
+        logger.error("Failed to run tiering: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/tiering")
+async def tiering_status():
+    """Describe the hot and cold storage tiers."""
+    try:
+        return await run_in_threadpool(project_tiering.status)
+    except Exception as e:
+        logger.error("Failed to get tiering status: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/history/compact")
+async def compact_history(
+    retention_days: int = Query(HISTORY_RETENTION_DAYS, ge=0),
+):
+    """Merge unchanged project versions, expire old ones and recluster."""
+    try:
+        return await run_in_threadpool(project_history.compact, retention_days)
+    except Exception as e:
+        logger.error("History compaction failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/history")
+async def history_status():
+    """Describe the project history table."""
+    try:
+        return await run_in_threadpool(project_history.status)
+    except Exception as e:
+        logger.error("Failed to get history status: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/quality/run")
+async def run_quality_checks(mode: Literal["incremental", "full"] = "incremental"):
+    """Run the data-quality rules of every table.
+
+    Incremental runs only check rows written since the previous run.
+    """
+    try:
+        with phase("schema"):
+            schema = await get_project_schema_jsonld()
+        return await run_in_threadpool(
+            quality_monitor.run, schema, mode == "incremental"
+        )
+    except ValueError as ve:
+        logger.error("Invalid data-quality rule: %s", ve)
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error("Data-quality run failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/workload")
+async def workload_summary(limit: int = Query(50, ge=1, le=1000)):
+    """Captured query fingerprints with the most total time."""
+    try:
+        return await run_in_threadpool(workload_advisor.workload, limit)
+    except Exception as e:
+        logger.error("Failed to get workload: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/workload/analyze")
+async def analyze_workload(snapshot_id: str | None = None):
+    """Recommend indexes, clustering keys and cache candidates.
+
+    Benefits are estimated by replaying the workload against a snapshot, by
+    default the latest one. Nothing is changed until a recommendation is
+    applied.
+    """
+    try:
+        return await run_in_threadpool(workload_advisor.analyze, snapshot_id)
+    except SnapshotNotFoundError as se:
+        raise HTTPException(status_code=404, detail=str(se))
+    except Exception as e:
+        logger.error("Workload analysis failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/workload/recommendations")
+async def list_recommendations(
+    status: Literal["proposed", "applied"] | None = None,
+):
+    """Stored recommendations, most beneficial first."""
+    try:
+        return {"recommendations": workload_advisor.recommendations(status)}
+    except Exception as e:
+        logger.error("Failed to list recommendations: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/workload/recommendations/{recommendation_id}/apply")
+async def apply_recommendation(recommendation_id: str):
+    """Apply a proposed index or clustering recommendation."""
+    try:
+        return await run_in_threadpool(workload_advisor.apply, recommendation_id)
+    except LookupError as le:
+        raise HTTPException(status_code=404, detail=str(le))
+    except RecommendationError as rec:
+        raise HTTPException(status_code=409, detail=str(rec))
+    except Exception as e:
+        logger.error("Failed to apply recommendation %s: %s", recommendation_id, e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/backups")
+async def create_backup(incremental: bool = True):
+    """Take a consistent online snapshot of the database."""
+    try:
+        # Run off the event loop so requests keep being served during the export
+        manifest = await run_in_threadpool(
+            snapshot_manager.create_snapshot, incremental
+        )
+        logger.info("Backup %s created", manifest["snapshot_id"])
+        return manifest
+    except Exception as e:
+        logger.error("Failed to create backup: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/backups")
+async def list_backups():
+    """List stored snapshots, newest first."""
+    try:
+        return {"backups": snapshot_manager.list_snapshots()}
+    except Exception as e:
+        logger.error("Failed to list backups: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/backups/{snapshot_id}/restore")
+async def restore_backup(snapshot_id: str):
+    """Restore a snapshot into a new database file."""
+    try:
+        result = await run_in_threadpool(snapshot_manager.restore_snapshot, snapshot_id)
+        logger.info("Backup %s restored to %s", snapshot_id, result["target_path"])
+        return result
+    except SnapshotNotFoundError as se:
+        raise HTTPException(status_code=404, detail=str(se))
+    except FileExistsError as fe:
+        raise HTTPException(status_code=409, detail=str(fe))
+    except Exception as e:
+        logger.error("Failed to restore backup %s: %s", snapshot_id, e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _load_fx_rates(data: bytes):
+    with conn_manager.get_connection() as conn:
+        return load_rates(conn, data)
+
+
+@router.post("/fx-rates")
+async def upload_fx_rates(file: UploadFile = File(...)):
+    """Bulk load FX rates from a ``currency_code,rate_date,usd_rate`` CSV.
+
+    Rates are USD per unit of the currency; existing rates for the same
+    currency and date are replaced.
+    """
+    try:
+        result = await run_in_threadpool(_load_fx_rates, await file.read())
+        logger.info(
+            "Loaded %s FX rates for %s currencies",
+            result["loaded"],
+            result["currencies"],
+        )
+        return result
+    except (ValueError, duckdb.ConversionException, duckdb.InvalidInputException) as e:
+        logger.error("Invalid FX rates file: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Failed to load FX rates: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/fx-rates")
+async def list_fx_rates():
+    """Coverage and latest rate of every loaded currency."""
+    try:
+        with conn_manager.get_connection() as conn:
+            return {"currencies": rates_summary(conn)}
+    except Exception as e:
+        logger.error("Failed to list FX rates: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _generate_synthetic(projects, portfolios, seed, start, as_of):
+    with conn_manager.get_connection() as conn:
+        return generate(conn, projects, portfolios, seed=seed, start=start, as_of=as_of)
+
+
+@router.post("/synthetic")
+async def generate_synthetic_data(
+    projects: int = Query(..., ge=0, le=SYNTHETIC_MAX_PROJECTS),
+    portfolios: int = Query(0, ge=0, le=SYNTHETIC_MAX_PORTFOLIOS),
+    seed: int = Query(0, ge=0),
+    start: int = Query(0, ge=0),
+    as_of: date | None = Query(None, description="Reference date, default today"),
+):
+    """Generate reproducible synthetic projects, portfolios and allocations."""
+    try:
+        summary = await run_in_threadpool(
+            _generate_synthetic, projects, portfolios, seed, start, as_of
+        )
+        logger.info("Synthetic data generated with seed %s", seed)
+        return summary
+    except duckdb.ConstraintException as ce:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Rows for seed {seed} already exist: {str(ce)}",
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error("Failed to generate synthetic data: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _render_profile(result: Profile, output: str):
+    if output == "speedscope":
+        return result.speedscope()
+    return PlainTextResponse(result.collapsed())
+
+
+@router.post("/profile")
+async def run_profile(
+    seconds: float = Query(10, gt=0, le=PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    output: Literal["collapsed", "speedscope"] = "collapsed",
+):
+    """Sample the stacks of all threads for a number of seconds.
+
+    Returns collapsed stacks as text, or speedscope JSON. Only one profile
+    runs at a time.
+    """
+    try:
+        result = await run_in_threadpool(profile, seconds, interval_ms / 1000)
+        logger.info("Profile taken: %s samples over %ss", result.samples, seconds)
+        return _render_profile(result, output)
+    except ProfilerBusyError as pe:
+        raise HTTPException(status_code=409, detail=str(pe))
+    except Exception as e:
+        logger.error("Failed to profile: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/profile/recent")
+async def recent_profile(
+    seconds: float = Query(60, gt=0),
+    output: Literal["collapsed", "speedscope"] = "collapsed",
+):
+    """Aggregate the continuous low-rate samples of the last few seconds."""
+    if not continuous_sampler.running:
+        raise HTTPException(
+            status_code=404,
+            detail="Continuous profiling is disabled (PROFILER_CONTINUOUS_INTERVAL)",
+        )
+    return _render_profile(continuous_sampler.recent(seconds), output)
+
+
 class LogLevelUpdate(BaseModel):
     """Model for log level update request."""
 
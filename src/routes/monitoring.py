@@ -2,16 +2,24 @@
 
 from typing import Dict
 
-import psutil
-from fastapi import APIRouter, Response
+from fastapi import APIRouter, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from prometheus_client import (
     CONTENT_TYPE_LATEST,
+    REGISTRY,
     Counter,
-    Gauge,
     generate_latest,
 )
+from prometheus_client.openmetrics import exposition as openmetrics
 
-router = APIRouter(prefix="/monitoring", tags=["monitoring"])
+from ..auth.jwt_handler import token_cache
+from ..database.engine_metrics import engine_metrics
+from ..database.quality import quality_monitor
+from ..utils.metrics import CPU_USAGE, DISK_USAGE, MEMORY_USAGE  # noqa: F401
+from ..utils.system_metrics import system_sampler
+from ..utils.timing import TimedRoute
+
+router = APIRouter(prefix="/monitoring", tags=["monitoring"], route_class=TimedRoute)
 
 # Initialize Prometheus metrics
 REQUEST_COUNT = Counter(
@@ -20,16 +28,6 @@ REQUEST_COUNT = Counter(
     ["method", "endpoint", "status"],
 )
 
-RESPONSE_TIME = Gauge(
-    "http_response_time_seconds",
-    "HTTP response time in seconds",
-    ["method", "endpoint"],
-)
-
-CPU_USAGE = Gauge("system_cpu_usage", "Current CPU usage percentage")
-MEMORY_USAGE = Gauge("system_memory_usage", "Current memory usage percentage")
-DISK_USAGE = Gauge("system_disk_usage", "Current disk usage percentage")
-
 
 @router.get("/health")
 async def health_check() -> Dict:
@@ -38,24 +36,38 @@ async def health_check() -> Dict:
 
 
 @router.get("/metrics")
-async def metrics():
-    """Prometheus metrics endpoint."""
+async def metrics(request: Request):
+    """Prometheus metrics endpoint.
+
+    Scrapers accepting OpenMetrics get the latency histogram exemplars too.
+    DuckDB engine gauges are refreshed first, at most once per TTL.
+    """
+    await run_in_threadpool(engine_metrics.refresh)
+    if "application/openmetrics-text" in request.headers.get("accept", ""):
+        return Response(
+            content=openmetrics.generate_latest(REGISTRY),
+            media_type=openmetrics.CONTENT_TYPE_LATEST,
+        )
     return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 @router.get("/metrics/system")
 async def system_metrics() -> Dict:
-    """System metrics endpoint."""
-    cpu = psutil.cpu_percent()
-    memory = psutil.virtual_memory().percent
-    disk = psutil.disk_usage("/").percent
-
-    CPU_USAGE.set(cpu)
-    MEMORY_USAGE.set(memory)
-    DISK_USAGE.set(disk)
-
-    return {
-        "cpu": cpu,
-        "memory": memory,
-        "disk": disk,
-    }
+    """System metrics endpoint.
+
+    Serves the last sample of the background sampler instead of querying the
+    host on every request.
+    """
+    return await system_sampler.get_sample()
+
+
+@router.get("/auth/cache")
+async def auth_cache_stats() -> Dict:
+    """Verified-token cache statistics."""
+    return token_cache.stats()
+
+
+@router.get("/quality")
+async def data_quality() -> Dict:
+    """Latest data-quality result per table."""
+    return quality_monitor.status()
@@ -1,20 +1,45 @@
 """Operations routes for project management."""
 
+import asyncio
+import json
 import logging
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from config.onto_server import ProjectStatus, get_project_schema_jsonld
 
+from ..database.change_log import ChangeLogTruncatedError, change_log
+from ..database.compiled_schema import compile_schema
 from ..database.connection_manager import DuckDBConnectionManager
+from ..database.fx import reporting_source
+from ..database.history import as_of_source, supersede
+from ..database.tiering import project_tiering
+from ..utils.timing import TimedRoute, phase
 
-router = APIRouter(prefix="/ops", tags=["Operations"])
+router = APIRouter(prefix="/ops", tags=["Operations"], route_class=TimedRoute)
 logger = logging.getLogger("data_product")
 conn_manager = DuckDBConnectionManager()
 
+# Columns added to projects read in a reporting currency
+FX_COLUMNS = ("original_currency", "fx_rate")
+CurrencyQuery = Query(
+    None,
+    pattern="^[A-Z]{3}$",
+    description="Convert amounts to this currency, as of fx_date",
+)
+FxDateQuery = Query(None, description="Date of the FX rates, default today")
+AsOfQuery = Query(None, description="Read the versions valid at this time")
+
+
+async def _project_schema():
+    """Fetch and compile the project schema, timed as the ``schema`` phase."""
+    with phase("schema"):
+        return compile_schema(await get_project_schema_jsonld())
+
 
 class ProjectCreate(BaseModel):
     """Project creation model."""
@@ -33,41 +58,35 @@ class ProjectCreate(BaseModel):
 async def create_project(project: ProjectCreate):
     """Create a new project based on the ontology schema."""
     try:
-        schema = await get_project_schema_jsonld()
+        schema = await _project_schema()
 
-        with conn_manager.get_connection() as conn:
-            project_id = str(uuid.uuid4())
-            now = datetime.now()
-
-            project_data = {
-                "project_id": project_id,
-                "project_name": project.project_name,
-                "description": project.description,
-                "total_amount": project.total_amount,
-                "maturity_years": project.maturity_years,
-                "expected_tri": project.expected_tri,
-                "dscr": project.dscr,
-                "status": project.status.value,
-                "creation_date": now.date(),
-                "last_updated": now,
-                "currency_code": project.currency_code,
-            }
-
-            # Validate against schema
-            for col in schema.columns:
-                if col.required and col.name not in project_data:
-                    raise ValueError(f"Missing required field: {col.name}")
-
-            columns = list(project_data.keys())
-            placeholders = ", ".join(["?" for _ in columns])
-            query = f"""
-                INSERT INTO {schema.name} ({', '.join(columns)})
-                VALUES ({placeholders})
-            """
-
-            conn.execute(query, tuple(project_data.values()))
-
-            logger.info(f"Project created successfully with ID: {project_id}")
+        project_id = str(uuid.uuid4())
+        now = datetime.now()
+        project_data = {
+            **project.model_dump(),
+            "status": project.status.value,
+            "project_id": project_id,
+            "creation_date": now.date(),
+            "last_updated": now,
+        }
+        # Validates required fields and coerces values to the column types
+        row = schema.encode_row(project_data)
+
+        with conn_manager.get_connection() as conn, change_log.commit_lock:
+            conn.begin()
+            try:
+                with phase("query"):
+                    conn.execute(schema.insert_sql, row)
+                seq = change_log.append(
+                    conn, schema.name, "INSERT", project_id, project_data
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            change_log.publish(seq)
+
+            logger.info("Project created successfully with ID: %s", project_id)
             return {"message": "Project created successfully", "project_id": project_id}
     except ValueError as ve:
         logger.error(f"Validation error: {str(ve)}")
@@ -77,56 +96,185 @@ async def create_project(project: ProjectCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class ProjectUpdate(BaseModel):
+    """Partial project update model; omitted fields keep their value."""
+
+    project_name: str | None = None
+    total_amount: float | None = None
+    maturity_years: int | None = None
+    expected_tri: float | None = None
+    dscr: float | None = None
+    description: str | None = None
+    status: ProjectStatus | None = None
+    currency_code: str | None = None
+
+
+@router.patch("/projects/{project_id}")
+async def update_project(project_id: str, update: ProjectUpdate):
+    """Update a project, keeping the version it replaces in the history.
+
+    Only hot projects can be updated; projects aged out to the cold tier are
+    read-only.
+    """
+    try:
+        schema = await _project_schema()
+        changes = update.model_dump(exclude_unset=True, mode="json")
+
+        with conn_manager.get_connection() as conn, change_log.commit_lock:
+            conn.begin()
+            try:
+                with phase("query"):
+                    current = conn.execute(
+                        schema.select_sql(schema.name, where="project_id = ?"),
+                        (project_id,),
+                    ).fetchone()
+                    if current is None:
+                        raise LookupError(f"Project not found: {project_id}")
+                    now = datetime.now()
+                    project_data = {
+                        **schema.decode_rows([current])[0],
+                        **changes,
+                        "last_updated": now,
+                    }
+                    # Validates required fields and coerces values to the column types
+                    row = schema.encode_row(project_data)
+                    supersede(conn, schema.columns, row, now)
+                seq = change_log.append(
+                    conn,
+                    schema.name,
+                    "UPDATE",
+                    project_id,
+                    {**changes, "last_updated": now},
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            change_log.publish(seq)
+
+        logger.info("Project updated successfully with ID: %s", project_id)
+        return {
+            "message": "Project updated successfully",
+            "project_id": project_id,
+            "last_updated": now,
+        }
+    except LookupError as le:
+        logger.warning(str(le))
+        raise HTTPException(status_code=404, detail="Project not found")
+    except ValueError as ve:
+        logger.error("Validation error: %s", ve)
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error("Error updating project %s: %s", project_id, e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _list_query(conn, schema, where, as_of, reporting_currency, fx_date):
+    """Listing query over the hot and cold tiers, and the extra columns it adds."""
+    source, extra = project_tiering.read_source(), ()
+    if as_of is not None:
+        source = as_of_source(source, schema.columns + ("creation_year",), as_of)
+    if reporting_currency is not None:
+        # Filter before converting so cold partitions are still pruned
+        if where:
+            source = f"(SELECT * FROM {source} WHERE {where})"
+        source = reporting_source(conn, source, reporting_currency, fx_date)
+        where, extra = "", FX_COLUMNS
+    query = schema.select_sql(
+        source, where=where, order_by="creation_date DESC", extra=extra
+    )
+    return query, extra
+
+
 @router.get("/projects")
-async def list_projects():
-    """List all projects with schema-defined fields."""
+async def list_projects(
+    status: ProjectStatus | None = None,
+    year: int | None = Query(None, description="Year of creation_date"),
+    reporting_currency: str | None = CurrencyQuery,
+    fx_date: date | None = FxDateQuery,
+    as_of: datetime | None = AsOfQuery,
+):
+    """List all projects with schema-defined fields.
+
+    Reads span the hot table and the cold Parquet tier; ``status`` and ``year``
+    filters prune cold partitions. ``as_of`` returns the versions valid at that
+    time from the project history. With ``reporting_currency`` amounts are
+    converted at the latest rates on or before ``fx_date``, and each project
+    also carries its ``original_currency`` and ``fx_rate``.
+    """
     try:
-        schema = await get_project_schema_jsonld()
-        column_names = [col.name for col in schema.columns]
+        schema = await _project_schema()
+
+        filters, params = [], []
+        if status is not None:
+            filters.append("status = ?")
+            params.append(status.value)
+        if year is not None:
+            filters.append("creation_year = ?")
+            params.append(year)
 
         with conn_manager.get_connection() as conn:
-            result = conn.execute(
-                f"""
-                SELECT {', '.join(column_names)}
-                FROM {schema.name}
-                ORDER BY creation_date DESC
-            """
-            ).fetchall()
-
-            projects = [dict(zip(column_names, row)) for row in result]
-            logger.info(f"Retrieved {len(projects)} projects")
+            query, extra = _list_query(
+                conn, schema, " AND ".join(filters), as_of, reporting_currency, fx_date
+            )
+            with phase("query"):
+                cursor = conn.execute(query, tuple(params))
+            with phase("fetch"):
+                result = cursor.fetchall()
+
+            projects = schema.decode_rows(result, extra)
+            logger.info("Retrieved %d projects", len(projects))
             return projects
+    except ValueError as ve:
+        logger.error("Validation error: %s", ve)
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         logger.error(f"Error listing projects: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/projects/{project_id}")
-async def get_project(project_id: str):
-    """Get a specific project by ID."""
+async def get_project(
+    project_id: str,
+    reporting_currency: str | None = CurrencyQuery,
+    fx_date: date | None = FxDateQuery,
+    as_of: datetime | None = AsOfQuery,
+):
+    """Get a specific project by ID, optionally as of a time or in a currency."""
     try:
-        schema = await get_project_schema_jsonld()
-        column_names = [col.name for col in schema.columns]
+        schema = await _project_schema()
+        extra = FX_COLUMNS if reporting_currency is not None else ()
 
         with conn_manager.get_connection() as conn:
-            result = conn.execute(
-                f"""
-                SELECT {', '.join(column_names)}
-                FROM {schema.name}
-                WHERE project_id = ?
-            """,
-                (project_id,),
-            ).fetchone()
+            # Point lookups hit the hot table first and only scan cold files on a miss
+            for source in (schema.name, project_tiering.read_source()):
+                if as_of is not None:
+                    source = as_of_source(source, schema.columns, as_of)
+                query = schema.select_sql(source, where="project_id = ?")
+                if extra:
+                    source = reporting_source(
+                        conn, f"({query})", reporting_currency, fx_date
+                    )
+                    query = schema.select_sql(source, extra=extra)
+                with phase("query"):
+                    cursor = conn.execute(query, (project_id,))
+                with phase("fetch"):
+                    result = cursor.fetchone()
+                if result:
+                    break
 
             if not result:
-                logger.warning(f"Project not found: {project_id}")
+                logger.warning("Project not found: %s", project_id)
                 raise HTTPException(status_code=404, detail="Project not found")
 
-            project = dict(zip(column_names, result))
-            logger.info(f"Retrieved project: {project_id}")
+            project = schema.decode_rows([result], extra)[0]
+            logger.info("Retrieved project: %s", project_id)
             return project
     except HTTPException:
         raise
+    except ValueError as ve:
+        logger.error("Validation error: %s", ve)
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         logger.error(f"Error retrieving project {project_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -136,25 +284,82 @@ async def get_project(project_id: str):
 async def initialize_database():
     """Initialize the database with schema from onto_server."""
     try:
-        schema = await get_project_schema_jsonld()
+        schema = await _project_schema()
 
         with conn_manager.get_connection() as conn:
-            # Create columns definition
-            columns_def = []
-            for col in schema.columns:
-                constraint = "NOT NULL" if col.required else ""
-                columns_def.append(f"{col.name} {col.type} {constraint}".strip())
-
-            # Create table query without problematic backslashes
-            create_table_query = (
-                f"CREATE TABLE IF NOT EXISTS {schema.name} (\n"
-                + ",\n".join(columns_def)
-                + "\n);"
-            )
-
-            conn.execute(create_table_query)
+            conn.execute(schema.create_table_sql)
             logger.info(f"Database initialized successfully with schema: {schema.name}")
             return {"message": "Database initialized successfully"}
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/changes")
+async def list_changes(
+    since: int = Query(0, ge=0, description="Last sequence number processed"),
+    limit: int = Query(1000, ge=1, le=10000),
+    wait: float = Query(
+        0, ge=0, le=60, description="Seconds to long-poll when no changes exist"
+    ),
+):
+    """Read the change feed after a given sequence number."""
+    try:
+        if wait and change_log.latest_seq() <= since:
+            await change_log.wait_for_changes(since, wait)
+
+        changes = change_log.read_since(since, limit)
+        next_seq = changes[-1]["seq"] if changes else since
+        return {"changes": changes, "next_seq": next_seq}
+    except ChangeLogTruncatedError as te:
+        logger.warning("Change feed consumer fell behind: %s", te)
+        raise HTTPException(status_code=410, detail=str(te))
+    except Exception as e:
+        logger.error("Error reading change feed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _change_events(since: int, changes: list, heartbeat: float):
+    """Yield change log entries as Server-Sent Events, waiting for new ones."""
+    cursor = since
+    try:
+        while True:
+            for change in changes:
+                cursor = change["seq"]
+                yield (
+                    f"id: {cursor}\n"
+                    f"event: {change['table']}.{change['operation'].lower()}\n"
+                    f"data: {json.dumps(change)}\n\n"
+                )
+            if not await change_log.wait_for_changes(cursor, heartbeat):
+                yield ": keep-alive\n\n"
+            changes = change_log.read_since(cursor)
+    except asyncio.CancelledError:
+        logger.debug("Change stream closed at seq %s", cursor)
+        raise
+    except ChangeLogTruncatedError as te:
+        yield f"event: truncated\ndata: {json.dumps({'detail': str(te)})}\n\n"
+
+
+@router.get("/changes/stream")
+async def stream_changes(
+    since: int | None = Query(None, ge=0, description="Last sequence number processed"),
+    last_event_id: str | None = Header(None),
+    heartbeat: float = Query(15, gt=0, le=60),
+):
+    """Stream the change feed as Server-Sent Events."""
+    if since is None:
+        since = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+
+    try:
+        # Fail fast with 410 before the stream starts if the cursor is too old
+        initial = change_log.read_since(since)
+    except ChangeLogTruncatedError as te:
+        logger.warning("Change stream consumer fell behind: %s", te)
+        raise HTTPException(status_code=410, detail=str(te))
+
+    return StreamingResponse(
+        _change_events(since, initial, heartbeat),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
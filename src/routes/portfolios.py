@@ -0,0 +1,326 @@
+"""Portfolio routes for bulk project allocation.
+
+Allocations are applied as a set: a portfolio with thousands of allocations is
+validated with a single query and written in a single transaction, so a
+rebalance never leaves the portfolio partially updated.
+"""
+
+import importlib.util
+import logging
+from datetime import date
+from functools import lru_cache
+from typing import List, Literal
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+
+from ..database.cashflow import PERIOD_COLUMNS, project_portfolio
+from ..database.duckdb_manager import DuckDBManager
+from ..database.fx import portfolio_source
+from ..database.schema import Portfolio
+from ..database.stress import STRESS_MAX_SCENARIOS, load_portfolio, stress_engine
+from ..database.tiering import project_tiering
+from ..utils.timing import TimedRoute, phase
+
+router = APIRouter(prefix="/ops", tags=["Portfolios"], route_class=TimedRoute)
+logger = logging.getLogger("data_product")
+
+
+class Allocation(BaseModel):
+    """Allocation of a project within a portfolio."""
+
+    project_id: UUID
+    allocation_percentage: float
+
+
+class PortfolioCreate(Portfolio):
+    """Portfolio creation model with its initial allocations."""
+
+    allocations: List[Allocation] = []
+
+
+class AllocationUpdate(BaseModel):
+    """Bulk allocation update model."""
+
+    allocations: List[Allocation]
+
+
+class StressRequest(BaseModel):
+    """Monte Carlo stress test parameters; shocks are applied on top of the base."""
+
+    scenarios: int = Field(10000, gt=0, le=STRESS_MAX_SCENARIOS)
+    seed: int | None = Field(None, ge=0)
+    covenant: float = Field(1.2, gt=0)
+    rate_shock: float = 0.0
+    rate_volatility: float = Field(1.0, ge=0)
+    revenue_shock: float = Field(0.0, gt=-1)
+    revenue_volatility: float = Field(0.15, ge=0)
+    revenue_correlation: float = Field(0.3, ge=0, le=1)
+    fx_shock: float = Field(0.0, gt=-1)
+    fx_volatility: float = Field(0.1, ge=0)
+    reporting_currency: str | None = Field(None, pattern="^[A-Z]{3}$")
+    fx_date: date | None = None
+
+
+@lru_cache(maxsize=None)
+def get_db_manager() -> DuckDBManager:
+    """Return the shared database manager, created on first use."""
+    return DuckDBManager()
+
+
+def _as_pairs(allocations: List[Allocation]) -> list:
+    return [(a.project_id, a.allocation_percentage) for a in allocations]
+
+
+@router.post("/portfolios")
+async def create_portfolio(portfolio: PortfolioCreate):
+    """Create a portfolio and its allocations in one transaction."""
+    try:
+        portfolio_data = portfolio.model_dump(exclude={"allocations"}, mode="json")
+        portfolio_id = await run_in_threadpool(
+            get_db_manager().create_portfolio,
+            portfolio_data,
+            _as_pairs(portfolio.allocations),
+        )
+
+        logger.info(
+            "Portfolio created with ID: %s (%d allocations)",
+            portfolio_id,
+            len(portfolio.allocations),
+        )
+        return {
+            "message": "Portfolio created successfully",
+            "portfolio_id": portfolio_id,
+        }
+    except ValueError as ve:
+        logger.error("Validation error: %s", ve)
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error("Error creating portfolio: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/portfolios/{portfolio_id}")
+async def get_portfolio(portfolio_id: UUID):
+    """Get a portfolio with its allocations."""
+    try:
+        with get_db_manager().conn_manager.get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT * FROM portfolios WHERE portfolio_id = ?", (str(portfolio_id),)
+            )
+            row = cursor.fetchone()
+            if not row:
+                logger.warning("Portfolio not found: %s", portfolio_id)
+                raise HTTPException(status_code=404, detail="Portfolio not found")
+            portfolio = dict(zip([c[0] for c in cursor.description], row))
+
+            allocations = conn.execute(
+                """
+                SELECT project_id, allocation_percentage, entry_date
+                FROM portfolio_projects
+                WHERE portfolio_id = ?
+                ORDER BY allocation_percentage DESC
+                """,
+                (str(portfolio_id),),
+            ).fetchall()
+
+        portfolio["allocations"] = [
+            {
+                "project_id": project_id,
+                "allocation_percentage": allocation_percentage,
+                "entry_date": entry_date,
+            }
+            for project_id, allocation_percentage, entry_date in allocations
+        ]
+        logger.info("Retrieved portfolio: %s", portfolio_id)
+        return portfolio
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error retrieving portfolio %s: %s", portfolio_id, e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _allocate(portfolio_id: UUID, update: AllocationUpdate, replace: bool):
+    try:
+        summary = await run_in_threadpool(
+            get_db_manager().allocate_projects,
+            str(portfolio_id),
+            _as_pairs(update.allocations),
+            replace=replace,
+        )
+        logger.info("Allocations applied to portfolio %s: %s", portfolio_id, summary)
+        return summary
+    except LookupError as le:
+        logger.warning(str(le))
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    except ValueError as ve:
+        logger.error("Validation error: %s", ve)
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error("Error allocating portfolio %s: %s", portfolio_id, e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/portfolios/{portfolio_id}/allocations")
+async def replace_allocations(portfolio_id: UUID, update: AllocationUpdate):
+    """Rebalance a portfolio: the given allocations replace the current set."""
+    return await _allocate(portfolio_id, update, replace=True)
+
+
+@router.post("/portfolios/{portfolio_id}/allocations")
+async def merge_allocations(portfolio_id: UUID, update: AllocationUpdate):
+    """Add or update allocations, keeping the rest of the portfolio unchanged."""
+    return await _allocate(portfolio_id, update, replace=False)
+
+
+def _project(portfolio_id: str, arrow: bool, reporting_currency, fx_date, **options):
+    with get_db_manager().conn_manager.get_connection() as conn:
+        found = conn.execute(
+            "SELECT 1 FROM portfolios WHERE portfolio_id = ?", (portfolio_id,)
+        ).fetchone()
+        if not found:
+            raise LookupError(f"Portfolio not found: {portfolio_id}")
+        source = portfolio_source(
+            conn,
+            portfolio_id,
+            project_tiering.read_source(),
+            reporting_currency,
+            fx_date,
+        )
+        cursor = project_portfolio(conn, portfolio_id, source=source, **options)
+        return cursor.arrow() if arrow else cursor.fetchall()
+
+
+def _arrow_stream(table) -> bytes:
+    import pyarrow  # deferred: optional, and kept out of the import path
+
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+@router.get("/portfolios/{portfolio_id}/cashflows")
+async def project_cashflows(
+    portfolio_id: UUID,
+    frequency: Literal["annual", "quarterly", "monthly"] = "annual",
+    amortization: Literal["annuity", "linear"] = "annuity",
+    start: date | None = None,
+    end: date | None = None,
+    format: Literal["json", "arrow"] = "json",
+    reporting_currency: str | None = Query(None, pattern="^[A-Z]{3}$"),
+    fx_date: date | None = None,
+):
+    """Project the portfolio's debt service and CFADS per period.
+
+    Schedules of all allocated projects are built and aggregated in DuckDB.
+    Amounts are summed as stored unless ``reporting_currency`` is given, in
+    which case each project is converted at the rates as of ``fx_date``
+    (default today). A portfolio mixing currencies needs a
+    ``reporting_currency``, and every currency it holds needs a rate.
+    ``format=arrow`` returns an Arrow IPC stream instead of JSON.
+    """
+    if format == "arrow" and importlib.util.find_spec("pyarrow") is None:
+        raise HTTPException(status_code=406, detail="Arrow output requires pyarrow")
+    try:
+        with phase("query"):
+            result = await run_in_threadpool(
+                _project,
+                str(portfolio_id),
+                format == "arrow",
+                reporting_currency,
+                fx_date,
+                frequency=frequency,
+                amortization=amortization,
+                start=start,
+                end=end,
+            )
+    except LookupError as le:
+        logger.warning(str(le))
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    except ValueError as ve:
+        logger.error("Validation error: %s", ve)
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error("Error projecting portfolio %s: %s", portfolio_id, e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if format == "arrow":
+        return Response(
+            content=_arrow_stream(result),
+            media_type="application/vnd.apache.arrow.stream",
+        )
+
+    periods = [dict(zip(PERIOD_COLUMNS, row)) for row in result]
+    totals = {
+        column: round(sum(p[column] for p in periods), 2)
+        for column in ("interest", "principal", "debt_service", "cfads")
+    }
+    logger.info("Projected portfolio %s over %d periods", portfolio_id, len(periods))
+    return {
+        "portfolio_id": portfolio_id,
+        "frequency": frequency,
+        "amortization": amortization,
+        "reporting_currency": reporting_currency,
+        "totals": totals,
+        "periods": periods,
+    }
+
+
+def _load_for_stress(portfolio_id: str, reporting_currency, fx_date):
+    with get_db_manager().conn_manager.get_connection() as conn:
+        return load_portfolio(
+            conn,
+            portfolio_id,
+            source=project_tiering.read_source(),
+            reporting_currency=reporting_currency,
+            fx_date=fx_date,
+        )
+
+
+@router.post("/portfolios/{portfolio_id}/stress", status_code=202)
+async def start_stress_test(portfolio_id: UUID, request: StressRequest):
+    """Start a Monte Carlo DSCR stress test; poll the returned status URL."""
+    try:
+        portfolio = await run_in_threadpool(
+            _load_for_stress,
+            str(portfolio_id),
+            request.reporting_currency,
+            request.fx_date,
+        )
+        parameters = request.model_dump(
+            exclude={"scenarios", "seed", "reporting_currency", "fx_date"}
+        )
+        job = stress_engine.submit(
+            portfolio, str(portfolio_id), request.scenarios, request.seed, parameters
+        )
+    except LookupError as le:
+        logger.warning(str(le))
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    except ValueError as ve:
+        logger.error("Validation error: %s", ve)
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error("Error starting stress test for %s: %s", portfolio_id, e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    logger.info(
+        "Stress job %s started for portfolio %s (%d projects, %d scenarios)",
+        job.job_id,
+        portfolio_id,
+        portfolio["block"].shape[1],
+        request.scenarios,
+    )
+    return {**job.summary(), "status_url": f"/ops/stress/{job.job_id}"}
+
+
+@router.get("/stress/{job_id}")
+async def get_stress_test(job_id: str):
+    """Status of a stress job, with percentiles over the scenarios run so far."""
+    job = stress_engine.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Stress job not found")
+    return job.summary()
@@ -0,0 +1,267 @@
+"""Response compression with content negotiation.
+
+Pure ASGI middleware that compresses text responses (JSON, plain text, CSV,
+XML, ...) with the best encoding the client accepts: zstd, then brotli, then
+gzip. zstd and brotli need the optional ``zstandard`` and ``brotli``
+packages; without them only gzip is offered.
+
+Single-message bodies smaller than ``COMPRESSION_MIN_SIZE`` bytes are sent
+as is. Streaming responses are compressed chunk by chunk and each chunk is
+flushed, so consumers never wait for the end of a stream to decode what was
+already sent. Server-sent events are left alone: proxies tend to buffer
+compressed event streams.
+
+Compression ratio and CPU time are exported per encoding.
+"""
+
+import os
+import time
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .metrics import (
+    compression_bytes_counter,
+    compression_cpu_counter,
+    compression_ratio_histogram,
+)
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+# Configuration
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/xml",
+    "application/javascript",
+    "application/ld+json",
+    "text/plain",
+    "text/html",
+    "text/csv",
+    "text/xml",
+    "text/css",
+)
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(
+            COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(
+            level=COMPRESSION_ZSTD_LEVEL
+        ).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encoders() -> List[type]:
+    """Encoders in server preference order, limited to installed libraries."""
+    encoders = []
+    if zstandard is not None:
+        encoders.append(ZstdEncoder)
+    if brotli is not None:
+        encoders.append(BrotliEncoder)
+    encoders.append(GzipEncoder)
+    return encoders
+
+
+def negotiate(accept_encoding: str, encoders: List[type]) -> Optional[type]:
+    """Pick the encoder for an ``Accept-Encoding`` header value.
+
+    The highest q-value wins; ties go to the server preference order.
+    ``q=0`` excludes an encoding, and ``*`` matches any encoding not listed.
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoder in encoders:
+        q = weights.get(encoder.name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoder, q
+    return best
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return "content-encoding" not in headers and content_type.startswith(
+        COMPRESSIBLE_TYPES
+    )
+
+
+class _Responder:
+    """Per-request ``send`` wrapper compressing one response."""
+
+    def __init__(self, send, encoder_class, minimum_size: int):
+        self.send = send
+        self.encoder_class = encoder_class
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.passthrough = False
+        self.encoder = None
+        self.raw_bytes = 0
+        self.sent_bytes = 0
+        self.cpu_seconds = 0.0
+
+    def _skip(self, start_message) -> bool:
+        headers = Headers(raw=start_message["headers"])
+        length = headers.get("content-length")
+        return (
+            start_message["status"] in (204, 304)
+            or (length is not None and int(length) < self.minimum_size)
+            or not _compressible(headers)
+        )
+
+    def _encode(self, data: bytes, finish: bool) -> bytes:
+        started = time.thread_time()
+        out = self.encoder.compress(data) if data else b""
+        if finish:
+            out += self.encoder.finish()
+        self.cpu_seconds += time.thread_time() - started
+        self.raw_bytes += len(data)
+        self.sent_bytes += len(out)
+        return out
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.passthrough = self._skip(message)
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start_message = message  # held until the first body chunk
+            return
+        if self.passthrough or message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start_message is not None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            await self._start(body, more_body)
+            return
+
+        await self.send({**message, "body": self._encode(body, not more_body)})
+        if not more_body:
+            self._observe()
+
+    async def _start(self, body: bytes, more_body: bool):
+        self.encoder = self.encoder_class()
+        compressed = self._encode(body, finish=not more_body)
+        headers = MutableHeaders(scope=self.start_message)
+        del headers["content-length"]
+        headers["Content-Encoding"] = self.encoder.name
+        headers.add_vary_header("Accept-Encoding")
+        if not more_body:
+            headers["Content-Length"] = str(len(compressed))
+        await self.send(self.start_message)
+        self.start_message = None
+        await self.send(
+            {"type": "http.response.body", "body": compressed, "more_body": more_body}
+        )
+        if not more_body:
+            self._observe()
+
+    def _observe(self):
+        encoding = self.encoder.name
+        compression_cpu_counter.labels(encoding).inc(self.cpu_seconds)
+        compression_bytes_counter.labels(encoding, "in").inc(self.raw_bytes)
+        compression_bytes_counter.labels(encoding, "out").inc(self.sent_bytes)
+        if self.sent_bytes:
+            compression_ratio_histogram.labels(encoding).observe(
+                self.raw_bytes / self.sent_bytes
+            )
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing eligible responses."""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        enabled: bool = COMPRESSION_ENABLED,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.enabled = enabled
+        self.encoders = available_encoders()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        encoder_class = negotiate(accept, self.encoders) if accept else None
+        if encoder_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(
+            scope, receive, _Responder(send, encoder_class, self.minimum_size)
+        )
@@ -0,0 +1,147 @@
+"""Background readiness checker.
+
+Liveness only says the process is serving; readiness says it should receive
+traffic. Readiness is computed by a background task on a fixed interval, so
+orchestrator probes read a cached status instead of taking a pool connection
+each time. A check covers:
+
+- ``database``: ``SELECT 1`` on a pooled connection, with a timeout
+- ``ontology``: onto server reachability; reported but not required, since
+  schemas are served from cache (or the mock fallback) during an outage
+- ``pool``: connection pool saturation, ``(in_use + waiting) / capacity``
+  with the pool's ``DUCKDB_POOL_SIZE`` capacity; once every connection is in
+  use new queries queue, so a saturated pool reports not-ready and the load
+  balancer sheds traffic
+- ``event_loop``: how late the checker's own sleep woke up
+
+A status older than three intervals counts as not ready, so a stuck checker
+cannot keep reporting a stale "ready".
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from config.onto_server import schema_registry
+
+from ..database.connection_manager import DuckDBConnectionManager
+from .metrics import readiness_gauge
+
+logger = logging.getLogger("data_product")
+
+# Configuration
+READINESS_INTERVAL = float(os.getenv("READINESS_INTERVAL", "5"))  # seconds
+READINESS_TIMEOUT = float(os.getenv("READINESS_TIMEOUT", "2"))  # seconds per probe
+READINESS_MAX_LOOP_LAG = float(os.getenv("READINESS_MAX_LOOP_LAG", "0.5"))  # seconds
+
+
+class HealthChecker:
+    """Periodically probe dependencies and cache the readiness status."""
+
+    def __init__(
+        self,
+        conn_manager=None,
+        interval: float = READINESS_INTERVAL,
+        timeout: float = READINESS_TIMEOUT,
+        max_loop_lag: float = READINESS_MAX_LOOP_LAG,
+    ):
+        self.conn_manager = conn_manager or DuckDBConnectionManager()
+        self.interval = interval
+        self.timeout = timeout
+        self.max_loop_lag = max_loop_lag
+        self.last_status: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0  # monotonic
+        self._loop_lag = 0.0
+
+    def _select_one(self):
+        with self.conn_manager.get_connection() as conn:
+            conn.execute("SELECT 1").fetchone()
+
+    async def _check_database(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.to_thread(self._select_one), self.timeout)
+            return {
+                "ok": True,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+            }
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": f"no response within {self.timeout}s"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+    async def _check_ontology(self) -> Dict[str, Any]:
+        try:
+            reachable = await asyncio.wait_for(
+                schema_registry.check_health(), self.timeout
+            )
+        except Exception:
+            reachable = False
+        return {"ok": reachable, "required": False}
+
+    def _check_pool(self) -> Dict[str, Any]:
+        stats = self.conn_manager.stats()
+        saturation = (stats["in_use"] + stats["waiting"]) / stats["capacity"]
+        return {**stats, "saturation": round(saturation, 3), "ok": saturation < 1.0}
+
+    def _check_event_loop(self) -> Dict[str, Any]:
+        return {
+            "ok": self._loop_lag < self.max_loop_lag,
+            "lag_seconds": round(self._loop_lag, 6),
+        }
+
+    async def check(self) -> Dict[str, Any]:
+        """Run every probe, cache the resulting status and return it."""
+        database, ontology = await asyncio.gather(
+            self._check_database(), self._check_ontology()
+        )
+        checks = {
+            "database": database,
+            "ontology": ontology,
+            "pool": self._check_pool(),
+            "event_loop": self._check_event_loop(),
+        }
+        ready = all(c["ok"] for c in checks.values() if c.get("required", True))
+        status = {
+            "status": "ready" if ready else "not_ready",
+            "checks": checks,
+            "checked_at": time.time(),
+        }
+        if not ready and (self.last_status or {}).get("status") == "ready":
+            failed = [name for name, c in checks.items() if not c["ok"]]
+            logger.warning("Service not ready: %s", ", ".join(failed))
+        self.last_status = status
+        self._checked_at = time.monotonic()
+        readiness_gauge.set(1 if ready else 0)
+        return status
+
+    def readiness(self) -> Dict[str, Any]:
+        """Return the cached status, downgraded if missing or stale."""
+        if self.last_status is None:
+            return {"status": "starting", "checks": {}}
+        age = time.monotonic() - self._checked_at
+        if age > 3 * self.interval:
+            return {**self.last_status, "status": "stale", "age_seconds": age}
+        return self.last_status
+
+    @property
+    def ready(self) -> bool:
+        return self.readiness()["status"] == "ready"
+
+    async def run(self):
+        """Check immediately, then every ``interval`` seconds until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error("Readiness check failed: %s", e)
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self._loop_lag = max(loop.time() - expected, 0.0)
+
+
+# Shared checker, started from the application lifespan
+health_checker = HealthChecker()
@@ -1,12 +1,51 @@
-"""Logging configuration module."""
+"""Logging configuration module.
 
+Logging is kept off the request path: the ``data_product`` logger has a
+single queue handler that only stamps the request context onto the record
+and enqueues it. A background thread drains the queue in batches, formats
+the records and writes each batch to the JSON log file and stdout with one
+flush per batch. The log file rotates by size and rotated files are
+gzip-compressed.
+
+High-volume levels can be sampled before enqueueing with ``LOG_SAMPLE_RATES``,
+e.g. ``DEBUG=0.1,INFO=0.5``. Warnings and errors are kept unless configured
+otherwise. When the queue is full, debug and info records are dropped at once
+while warnings and errors wait up to ``LOG_QUEUE_TIMEOUT`` for room, so a
+stalled writer cannot block the event loop; records still not enqueued are
+counted as dropped.
+"""
+
+import atexit
+import gzip
 import logging
 import os
+import queue
+import random
+import shutil
 import sys
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, RotatingFileHandler
+from typing import Dict, List, Optional
 
 from pythonjsonlogger import jsonlogger
 
+from .timing import current_request_id
+from .tracing import current_span
+
+# Configuration
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_COMPRESS = os.getenv("LOG_COMPRESS", "true").lower() == "true"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_QUEUE_TIMEOUT = float(os.getenv("LOG_QUEUE_TIMEOUT", "0.05"))  # seconds
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "256"))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "0.5"))  # seconds
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+LOG_DIR = os.getenv(
+    "LOG_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+)
+
 
 class CustomJsonFormatter(jsonlogger.JsonFormatter):
     """Custom JSON formatter for logging."""
@@ -14,30 +53,208 @@ class CustomJsonFormatter(jsonlogger.JsonFormatter):
     def add_fields(self, log_record, record, message_dict):
         """Add custom fields to the log record."""
         super(CustomJsonFormatter, self).add_fields(log_record, record, message_dict)
-        log_record["timestamp"] = datetime.utcnow().isoformat()
+        # Records are formatted after the fact, so use the time they were created
+        log_record["timestamp"] = datetime.utcfromtimestamp(record.created).isoformat()
         log_record["level"] = record.levelname
         log_record["service"] = "duckdb-spawn-api"
         log_record["logger"] = record.name
 
-        if hasattr(record, "request_id"):
-            log_record["request_id"] = record.request_id
+        request_id = getattr(record, "request_id", None) or current_request_id()
+        if request_id:
+            log_record["request_id"] = request_id
+        trace_id = getattr(record, "trace_id", None)
+        span_id = getattr(record, "span_id", None)
+        if trace_id is None:
+            span = current_span()
+            if span is not None:
+                trace_id, span_id = span.trace_id, span.span_id
+        if trace_id:
+            log_record["trace_id"] = trace_id
+            log_record["span_id"] = span_id
+
+
+class ContextQueueHandler(QueueHandler):
+    """Queue handler that defers formatting to the writer thread.
+
+    Only the request context, which lives in context variables and is gone
+    by the time the writer thread sees the record, is captured here.
+    """
+
+    def __init__(self, log_queue: queue.Queue, timeout: float = LOG_QUEUE_TIMEOUT):
+        super().__init__(log_queue)
+        self.timeout = timeout
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only set when present: extra record attributes end up in the JSON
+        request_id = current_request_id()
+        if request_id is not None and not hasattr(record, "request_id"):
+            record.request_id = request_id
+        span = current_span()
+        if span is not None:
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING:
+                try:
+                    self.queue.put(record, timeout=self.timeout)
+                    return
+                except queue.Full:
+                    pass
+            self.dropped += 1
+
+
+class LevelSamplingFilter(logging.Filter):
+    """Keep only a fraction of the records of selected levels."""
+
+    def __init__(self, rates: Dict[int, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+def parse_sample_rates(spec: str) -> Dict[int, float]:
+    """Parse ``LEVEL=rate`` pairs, e.g. ``DEBUG=0.1,INFO=0.5``."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        level, _, rate = item.partition("=")
+        rates[logging.getLevelName(level.strip().upper())] = float(rate)
+    return rates
+
+
+class BatchStreamHandler(logging.StreamHandler):
+    """Stream handler that writes a whole batch with one flush."""
+
+    def emit_batch(self, records: List[logging.LogRecord]):
+        lines = "".join(self.format(record) + self.terminator for record in records)
+        with self.lock:
+            self.stream.write(lines)
+            self.flush()
+
+
+class BatchRotatingFileHandler(RotatingFileHandler):
+    """Size-rotated file handler writing batches, compressing rotated files."""
 
+    def __init__(self, filename: str, compress: bool = LOG_COMPRESS, **kwargs):
+        super().__init__(filename, delay=True, **kwargs)
+        if compress:
+            self.namer = lambda name: name + ".gz"
+            self.rotator = _gzip_rotator
 
-def setup_logging(default_level=logging.INFO):
+    def _open(self):
+        # Created on first write, so configuring logging leaves no directory
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+    def emit_batch(self, records: List[logging.LogRecord]):
+        with self.lock:
+            if self.stream is None:
+                self.stream = self._open()
+            size = self.stream.tell()
+            for record in records:
+                line = self.format(record) + self.terminator
+                if self.maxBytes > 0 and size and size + len(line) >= self.maxBytes:
+                    self.doRollover()
+                    size = 0
+                self.stream.write(line)
+                size += len(line)
+            self.flush()
+
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class BatchingQueueListener:
+    """Drain the log queue on a background thread and write in batches."""
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        handlers: List[logging.Handler],
+        batch_size: int = LOG_BATCH_SIZE,
+        flush_interval: float = LOG_FLUSH_INTERVAL,
+    ):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Write out everything queued so far and stop the thread."""
+        if self._thread is not None:
+            self.queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+        for handler in self.handlers:
+            handler.close()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                record = self.queue.get(timeout=self.flush_interval)
+                while True:
+                    if record is self._STOP:
+                        stopping = True
+                        break
+                    batch.append(record)
+                    if len(batch) >= self.batch_size:
+                        break
+                    record = self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[logging.LogRecord]):
+        for handler in self.handlers:
+            records = [r for r in batch if r.levelno >= handler.level]
+            if not records:
+                continue
+            try:
+                handler.emit_batch(records)
+            except Exception:
+                handler.handleError(records[-1])
+
+
+_listener: Optional[BatchingQueueListener] = None
+
+
+def setup_logging(default_level=logging.INFO, log_dir: Optional[str] = None):
     """Set up logging configuration.
 
     Args:
         default_level: Default logging level (default: logging.INFO)
+        log_dir: Directory of the JSON log file (default: ``LOG_DIR``)
 
     Returns:
         Logger: Configured logger instance
     """
-    # Define the log directory and file
-    log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
-    log_file = os.path.join(log_dir, "duckdb_spawn.log")
+    global _listener
 
-    # Create logs directory if it doesn't exist
-    os.makedirs(log_dir, exist_ok=True)
+    # Define the log file; its directory is created on first write
+    log_file = os.path.join(log_dir or LOG_DIR, "duckdb_spawn.log")
 
     # Get the root logger
     logger = logging.getLogger("data_product")
@@ -46,26 +263,46 @@ def setup_logging(default_level=logging.INFO):
     # Remove existing handlers if any
     if logger.handlers:
         logger.handlers.clear()
+    shutdown_logging()
 
-    # Create file handler with JSON formatting
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setLevel(default_level)
+    # Create rotating file handler with JSON formatting; the file is opened
+    # on first write. Writer handlers do not filter: the logger level does.
+    file_handler = BatchRotatingFileHandler(
+        log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT
+    )
     json_formatter = CustomJsonFormatter("%(timestamp)s %(level)s %(name)s %(message)s")
     file_handler.setFormatter(json_formatter)
 
     # Create console handler with standard formatting
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(default_level)
+    console_handler = BatchStreamHandler(sys.stdout)
     standard_formatter = logging.Formatter(
         "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     )
     console_handler.setFormatter(standard_formatter)
 
-    # Add the handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Requests only enqueue; the listener thread formats and writes
+    log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+    queue_handler = ContextQueueHandler(log_queue)
+    sample_rates = parse_sample_rates(LOG_SAMPLE_RATES)
+    if sample_rates:
+        queue_handler.addFilter(LevelSamplingFilter(sample_rates))
+    _listener = BatchingQueueListener(log_queue, [file_handler, console_handler])
+    _listener.start()
+
+    logger.addHandler(queue_handler)
 
     # Set propagate to False to avoid duplicate logs
     logger.propagate = False
 
     return logger
+
+
+def shutdown_logging():
+    """Flush queued log records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
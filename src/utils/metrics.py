@@ -1,6 +1,6 @@
 """Prometheus metrics configuration."""
 
-from prometheus_client import Counter
+from prometheus_client import Counter, Gauge, Histogram
 
 # Counter for table creation operations
 table_creation_counter = Counter(
@@ -8,3 +8,158 @@ table_creation_counter = Counter(
     "Total number of DuckDB tables created",
     ["status"],  # 'success' or 'failed'
 )
+
+# DuckDB engine gauges, refreshed by src/database/engine_metrics.py
+duckdb_file_size_gauge = Gauge(
+    "duckdb_database_file_bytes", "Size of the DuckDB database file in bytes"
+)
+duckdb_wal_size_gauge = Gauge("duckdb_wal_bytes", "Size of the DuckDB WAL in bytes")
+duckdb_blocks_gauge = Gauge(
+    "duckdb_database_blocks", "DuckDB storage blocks by state", ["state"]
+)
+duckdb_memory_usage_gauge = Gauge(
+    "duckdb_memory_usage_bytes", "Memory held by the DuckDB buffer manager"
+)
+duckdb_memory_limit_gauge = Gauge(
+    "duckdb_memory_limit_bytes", "Configured DuckDB memory limit"
+)
+duckdb_temp_files_gauge = Gauge(
+    "duckdb_temp_files", "Temporary files DuckDB has spilled to disk"
+)
+duckdb_temp_bytes_gauge = Gauge(
+    "duckdb_temp_spill_bytes", "Bytes DuckDB has spilled to temporary files"
+)
+duckdb_table_rows_gauge = Gauge(
+    "duckdb_table_rows", "Estimated row count per table", ["table"]
+)
+duckdb_pool_connections_gauge = Gauge(
+    "duckdb_pool_connections", "Pooled DuckDB connections by state", ["state"]
+)
+duckdb_pool_waiters_gauge = Gauge(
+    "duckdb_pool_waiters", "Threads waiting to acquire a pooled connection"
+)
+
+# Gauge for cold-start cost, by startup phase
+startup_duration_gauge = Gauge(
+    "app_startup_seconds",
+    "Duration of application startup phases in seconds",
+    ["phase"],
+)
+
+# Request latency buckets, from sub-millisecond point lookups to slow scans
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Histogram for end-to-end response time, by route template
+request_latency_histogram = Histogram(
+    "http_response_time_seconds",
+    "HTTP response time in seconds",
+    ["method", "endpoint", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Histogram for time spent in each request phase (pool_wait, query, fetch, ...)
+request_phase_histogram = Histogram(
+    "http_request_phase_seconds",
+    "Time spent in each request phase in seconds",
+    ["endpoint", "phase"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Host gauges, updated by the background system metrics sampler
+CPU_USAGE = Gauge("system_cpu_usage", "Current CPU usage percentage")
+MEMORY_USAGE = Gauge("system_memory_usage", "Current memory usage percentage")
+DISK_USAGE = Gauge("system_disk_usage", "Current disk usage percentage")
+
+# Process gauges, updated by the background system metrics sampler
+process_rss_gauge = Gauge("app_process_rss_bytes", "Resident set size of the process")
+process_cpu_gauge = Gauge(
+    "app_process_cpu_seconds", "User and system CPU time consumed by the process"
+)
+process_fds_gauge = Gauge("app_process_open_fds", "Open file descriptors")
+process_threads_gauge = Gauge("app_process_threads", "Number of process threads")
+event_loop_lag_gauge = Gauge(
+    "app_event_loop_lag_seconds",
+    "Maximum event loop lag observed since the previous sample",
+)
+
+# Garbage collector statistics, by generation
+gc_pause_counter = Counter(
+    "app_gc_pause_seconds",
+    "Total time spent in garbage collection pauses",
+    ["generation"],
+)
+gc_collections_counter = Counter(
+    "app_gc_collections",
+    "Number of garbage collections",
+    ["generation"],
+)
+gc_pause_max_gauge = Gauge(
+    "app_gc_pause_max_seconds",
+    "Longest garbage collection pause since the previous sample",
+)
+
+# Cached readiness status, updated by the background health checker
+readiness_gauge = Gauge("app_ready", "Whether the service reports ready (1) or not (0)")
+
+# Requests rejected by the token-bucket rate limiter
+rate_limited_counter = Counter(
+    "http_rate_limited_total",
+    "Requests rejected with 429 by the rate limiter",
+    ["endpoint"],
+)
+
+# Response compression, by encoding
+compression_ratio_histogram = Histogram(
+    "http_response_compression_ratio",
+    "Uncompressed to compressed size ratio of compressed responses",
+    ["encoding"],
+    buckets=(1, 1.5, 2, 3, 4, 5, 7.5, 10, 15, 20, 50),
+)
+compression_bytes_counter = Counter(
+    "http_response_compression_bytes",
+    "Response bytes before (in) and after (out) compression",
+    ["encoding", "direction"],
+)
+compression_cpu_counter = Counter(
+    "http_response_compression_cpu_seconds",
+    "CPU time spent compressing responses",
+    ["encoding"],
+)
+
+# Verified JWT cache, see src/auth/jwt_handler.py
+jwt_cache_counter = Counter(
+    "auth_jwt_cache_total",
+    "Verified-token cache lookups and removals",
+    ["result"],  # 'hit', 'miss', 'expired' or 'evicted'
+)
+jwt_cache_size_gauge = Gauge("auth_jwt_cache_size", "Verified tokens currently cached")
+
+# Data quality, see src/database/quality.py
+quality_rows_counter = Counter(
+    "data_quality_rows_checked_total", "Rows checked by data-quality runs", ["table"]
+)
+quality_violations_counter = Counter(
+    "data_quality_violations_total",
+    "Rule violations found by data-quality runs",
+    ["table", "column", "rule"],
+)
+quality_score_gauge = Gauge(
+    "data_quality_score",
+    "Share of the rows checked by the last run that pass every rule",
+    ["table"],
+)
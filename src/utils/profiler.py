@@ -0,0 +1,211 @@
+"""Stack-sampling profiler.
+
+Samples the Python stacks of every thread with ``sys._current_frames()``.
+That includes request threads and the threadpool workers blocked in DuckDB
+calls; DuckDB's own native worker threads have no Python frames and show up
+only through the Python call that is waiting on them.
+
+Two modes are available:
+
+- ``profile(seconds)``: sample at a high rate for a bounded time. Only one
+  runs at a time.
+- ``ContinuousSampler``: sample at a low rate into a ring buffer, so the
+  recent past can be inspected after a CPU spike.
+
+Results are rendered as collapsed stacks (flamegraph.pl / speedscope input)
+or as speedscope JSON.
+"""
+
+import collections
+import os
+import sys
+import threading
+import time
+from typing import Any, Counter, Deque, Dict, List, Optional, Tuple
+
+# Configuration
+PROFILER_MAX_SECONDS = int(os.getenv("PROFILER_MAX_SECONDS", "60"))
+PROFILER_CONTINUOUS_INTERVAL = float(
+    os.getenv("PROFILER_CONTINUOUS_INTERVAL", "0")
+)  # seconds between samples, 0 disables
+PROFILER_RING_SIZE = int(os.getenv("PROFILER_RING_SIZE", "10000"))
+
+Frame = Tuple[str, str, int]  # function, file, first line
+Stack = Tuple[Frame, ...]  # root first
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_key(code) -> Frame:
+    return (code.co_name, code.co_filename, code.co_firstlineno)
+
+
+def sample_stacks(skip_ident: Optional[int] = None) -> List[Tuple[str, Stack]]:
+    """Capture the current stack of every thread except ``skip_ident``."""
+    names = {t.ident: t.name for t in threading.enumerate()}
+    samples = []
+    for ident, frame in sys._current_frames().items():
+        if ident == skip_ident:
+            continue
+        stack = []
+        while frame is not None:
+            stack.append(_frame_key(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        samples.append((names.get(ident, f"thread-{ident}"), tuple(stack)))
+    return samples
+
+
+class Profile:
+    """Aggregated samples: how often each (thread, stack) was seen."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.counts: Counter[Tuple[str, Stack]] = collections.Counter()
+        self.samples = 0
+        self.started_at = time.time()
+        self.duration = 0.0
+
+    def add(self, samples: List[Tuple[str, Stack]]):
+        self.counts.update(samples)
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        """Render as collapsed stacks: ``thread;root;...;leaf count`` per line."""
+        lines = []
+        for (thread, stack), count in self.counts.most_common():
+            frames = ";".join(
+                f"{name} ({os.path.basename(file)}:{line})"
+                for name, file, line in stack
+            )
+            lines.append(f"{thread};{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str = "duckdb-spawn-api") -> Dict[str, Any]:
+        """Render as a speedscope file with one sampled profile per thread."""
+        frame_index: Dict[Frame, int] = {}
+        frames: List[Dict[str, Any]] = []
+        per_thread: Dict[str, Dict[str, list]] = {}
+
+        for (thread, stack), count in self.counts.items():
+            indexes = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append(
+                        {"name": frame[0], "file": frame[1], "line": frame[2]}
+                    )
+                indexes.append(frame_index[frame])
+            thread_profile = per_thread.setdefault(
+                thread, {"samples": [], "weights": []}
+            )
+            thread_profile["samples"].append(indexes)
+            thread_profile["weights"].append(count * self.interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "duckdb-spawn-api",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(data["weights"]),
+                    "samples": data["samples"],
+                    "weights": data["weights"],
+                }
+                for thread, data in sorted(per_thread.items())
+            ],
+        }
+
+
+_profile_lock = threading.Lock()
+
+
+def profile(seconds: float, interval: float = 0.01) -> Profile:
+    """Sample all threads every ``interval`` seconds for ``seconds`` seconds.
+
+    Blocks the calling thread, so run it in a worker thread.
+
+    Raises:
+        ProfilerBusyError: If another profile is already running
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running")
+    try:
+        result = Profile(interval)
+        me = threading.get_ident()
+        started = time.perf_counter()
+        deadline = started + seconds
+        next_sample = started
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if now < next_sample:
+                time.sleep(next_sample - now)
+            result.add(sample_stacks(skip_ident=me))
+            # Skip missed ticks rather than sampling back to back
+            next_sample = max(next_sample + interval, time.perf_counter())
+        result.duration = time.perf_counter() - started
+        return result
+    finally:
+        _profile_lock.release()
+
+
+class ContinuousSampler:
+    """Low-rate background sampling into a fixed-size ring buffer."""
+
+    def __init__(
+        self,
+        interval: float = PROFILER_CONTINUOUS_INTERVAL,
+        ring_size: int = PROFILER_RING_SIZE,
+    ):
+        self.interval = interval
+        self.ring: Deque[Tuple[float, List[Tuple[str, Stack]]]] = collections.deque(
+            maxlen=ring_size
+        )
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="continuous-profiler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.ring.append((time.time(), sample_stacks(skip_ident=me)))
+
+    def recent(self, seconds: float) -> Profile:
+        """Aggregate the samples taken in the last ``seconds`` seconds."""
+        cutoff = time.time() - seconds
+        result = Profile(self.interval)
+        for taken_at, samples in list(self.ring):
+            if taken_at >= cutoff:
+                result.add(samples)
+        result.duration = result.samples * self.interval
+        return result
+
+
+# Shared continuous sampler, started from the application lifespan
+continuous_sampler = ContinuousSampler()
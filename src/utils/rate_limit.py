@@ -0,0 +1,278 @@
+"""Cost-aware token-bucket rate limiting shared across worker processes.
+
+Every client (by remote address) has a token bucket that refills at
+``RATE_LIMIT_RATE`` tokens per second up to ``RATE_LIMIT_BURST``. A request
+takes as many tokens as its route costs, so a full listing drains a bucket
+much faster than point lookups and heavy clients are throttled before they
+saturate DuckDB:
+
+- probes and metrics are free
+- point reads cost 1, writes 2
+- ``GET /ops/projects`` costs 1 plus one token per ``RATE_LIMIT_ROWS_PER_TOKEN``
+  estimated rows, using the row counts of the last engine metrics snapshot
+  and the selectivity of the ``status`` and ``year`` filters
+- admin operations (backups, tiering, synthetic data, profiles) and stress
+  tests cost 25
+
+Buckets live in a memory-mapped file (``/dev/shm`` when available) guarded
+by ``flock``, so all uvicorn workers on a host share one budget per client
+instead of each enforcing its own. The table is fixed-size open addressing;
+when a probe sequence is full the least recently used bucket is recycled.
+
+Responses carry ``RateLimit-Limit``, ``RateLimit-Remaining`` and
+``RateLimit-Reset``; throttled requests get a 429 with ``Retry-After``.
+"""
+
+import fcntl
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple, Union
+from urllib.parse import parse_qs
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+
+from ..database.engine_metrics import engine_metrics
+from .metrics import rate_limited_counter
+
+logger = logging.getLogger("data_product")
+
+# Configuration
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "100"))  # tokens per second
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "500"))  # bucket size
+RATE_LIMIT_ROWS_PER_TOKEN = int(os.getenv("RATE_LIMIT_ROWS_PER_TOKEN", "10000"))
+RATE_LIMIT_SLOTS = int(os.getenv("RATE_LIMIT_SLOTS", "65536"))
+RATE_LIMIT_STATE_FILE = os.getenv(
+    "RATE_LIMIT_STATE_FILE",
+    os.path.join(
+        "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+        "duckdb_spawn_rate_limit",
+    ),
+)
+
+_SLOT = struct.Struct("<Qdd")  # key hash, tokens, last update (epoch seconds)
+_PROBES = 8
+
+
+def _key_hash(key: str) -> int:
+    # Stable across processes, unlike hash(); 0 marks an empty slot
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class SharedTokenBuckets:
+    """Token buckets in a memory-mapped file shared by every process."""
+
+    def __init__(
+        self, path: Optional[str] = RATE_LIMIT_STATE_FILE, slots: int = RATE_LIMIT_SLOTS
+    ):
+        self.slots = slots
+        self.size = slots * _SLOT.size
+        self._lock = threading.Lock()  # flock does not exclude threads
+        self._fd: Optional[int] = None
+        if path is not None:
+            try:
+                self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+                if os.fstat(self._fd).st_size < self.size:
+                    os.ftruncate(self._fd, self.size)
+                self._map = mmap.mmap(self._fd, self.size)
+                return
+            except OSError as e:
+                logger.warning(
+                    "Rate limit state file unavailable, limiting per process: %s", e
+                )
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+        self._map = mmap.mmap(-1, self.size)
+
+    def acquire(
+        self, key: str, cost: float, rate: float, burst: float
+    ) -> Tuple[bool, float, float]:
+        """Take ``cost`` tokens from ``key``'s bucket if it has them.
+
+        Returns:
+            Tuple of (allowed, tokens remaining, seconds until ``cost`` tokens
+            are available again)
+        """
+        cost = min(cost, burst)
+        key_hash = _key_hash(key)
+        start = key_hash % self.slots
+        with self._lock:
+            if self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                now = time.time()
+                offset, tokens, updated = self._find(key_hash, start, now, burst)
+                tokens = min(burst, tokens + max(now - updated, 0.0) * rate)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                _SLOT.pack_into(self._map, offset, key_hash, tokens, now)
+            finally:
+                if self._fd is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+        wait = 0.0 if tokens >= cost else (cost - tokens) / rate
+        return allowed, tokens, wait
+
+    def _find(
+        self, key_hash: int, start: int, now: float, burst: float
+    ) -> Tuple[int, float, float]:
+        """Locate the key's slot, or claim an empty or least recently used one."""
+        victim, victim_updated = None, math.inf
+        for probe in range(_PROBES):
+            offset = ((start + probe) % self.slots) * _SLOT.size
+            slot_hash, tokens, updated = _SLOT.unpack_from(self._map, offset)
+            if slot_hash == key_hash:
+                return offset, tokens, updated
+            if slot_hash == 0:
+                return offset, burst, now
+            if updated < victim_updated:
+                victim, victim_updated = offset, updated
+        return victim, burst, now
+
+    def close(self):
+        self._map.close()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def _estimated_projects_cost(query: Dict[str, list]) -> float:
+    snapshot = engine_metrics.last_snapshot
+    if snapshot is None:
+        return 2.0
+    rows = snapshot["table_rows"].get("projects", 0)
+    if "status" in query:
+        rows /= 3
+    if "year" in query:
+        rows /= 25
+    return 1.0 + rows / RATE_LIMIT_ROWS_PER_TOKEN
+
+
+Cost = Union[float, Callable[[Dict[str, list]], float]]
+
+ROUTE_COSTS: Dict[Tuple[str, str], Cost] = {
+    ("GET", "/"): 20.0,
+    ("GET", "/health"): 0.0,
+    ("GET", "/health/live"): 0.0,
+    ("GET", "/health/ready"): 0.0,
+    ("GET", "/ops/projects"): _estimated_projects_cost,
+    ("GET", "/ops/changes/stream"): 5.0,
+    ("POST", "/ops/portfolios/{portfolio_id}/stress"): 25.0,
+}
+ADMIN_COST = 25.0
+WRITE_COST = 2.0
+READ_COST = 1.0
+
+
+def route_cost(method: str, template: Optional[str], query_string: bytes) -> float:
+    """Tokens a request to route ``template`` costs."""
+    cost = ROUTE_COSTS.get((method, template))
+    if cost is None:
+        if template is None:
+            cost = READ_COST
+        elif template.startswith("/monitoring"):
+            cost = 0.0
+        elif template.startswith("/admin"):
+            cost = ADMIN_COST
+        elif method in ("POST", "PUT", "PATCH", "DELETE"):
+            cost = WRITE_COST
+        else:
+            cost = READ_COST
+    if callable(cost):
+        cost = cost(parse_qs(query_string.decode("latin-1")))
+    return cost
+
+
+def client_key(scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware applying the shared, cost-weighted token buckets."""
+
+    def __init__(
+        self,
+        app,
+        router,
+        buckets: Optional[SharedTokenBuckets] = None,
+        rate: float = RATE_LIMIT_RATE,
+        burst: float = RATE_LIMIT_BURST,
+        key_func: Callable = client_key,
+        enabled: bool = RATE_LIMIT_ENABLED,
+    ):
+        self.app = app
+        self.router = router
+        self.rate = rate
+        self.burst = burst
+        self.key_func = key_func
+        self.enabled = enabled
+        self.buckets = buckets or (SharedTokenBuckets() if enabled else None)
+        self._templates: Dict[Tuple[str, str], Optional[str]] = {}
+
+    def _route_template(self, scope) -> Optional[str]:
+        cache_key = (scope["method"], scope["path"])
+        if cache_key not in self._templates:
+            if len(self._templates) >= 4096:
+                self._templates.clear()
+            template = None
+            for route in self.router.routes:
+                match, _ = route.matches(scope)
+                if match == Match.FULL:
+                    template = getattr(route, "path", None)
+                    break
+            self._templates[cache_key] = template
+        return self._templates[cache_key]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        template = self._route_template(scope)
+        cost = route_cost(scope["method"], template, scope.get("query_string", b""))
+        if cost <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        key = self.key_func(scope)
+        allowed, remaining, wait = self.buckets.acquire(
+            key, cost, self.rate, self.burst
+        )
+        limit_headers = {
+            "RateLimit-Limit": f"{self.burst:g}",
+            "RateLimit-Remaining": str(int(remaining)),
+            "RateLimit-Reset": str(math.ceil((self.burst - remaining) / self.rate)),
+        }
+
+        if not allowed:
+            logger.warning("Rate limit exceeded for %s on %s", key, template)
+            rate_limited_counter.labels(template or "unmatched").inc()
+            retry_after = max(math.ceil(wait), 1)
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded", "retry_after": retry_after},
+                status_code=429,
+                headers={**limit_headers, "Retry-After": str(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_limits(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in limit_headers.items():
+                    headers.append(name, value)
+            await send(message)
+
+        await self.app(scope, receive, send_with_limits)
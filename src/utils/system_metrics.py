@@ -0,0 +1,182 @@
+"""Background system and process metrics sampler.
+
+Host and process statistics are sampled on a fixed interval in a worker
+thread and published to Prometheus gauges; ``/monitoring/metrics/system``
+serves the last sample, so scrapes never pay for psutil calls.
+
+Besides host CPU, memory and disk usage, the sampler reports this process's
+RSS, CPU seconds, open file descriptors and thread count, the event-loop lag
+(how late a short periodic sleep wakes up) and garbage collector pauses.
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .metrics import (
+    CPU_USAGE,
+    DISK_USAGE,
+    MEMORY_USAGE,
+    event_loop_lag_gauge,
+    gc_collections_counter,
+    gc_pause_counter,
+    gc_pause_max_gauge,
+    process_cpu_gauge,
+    process_fds_gauge,
+    process_rss_gauge,
+    process_threads_gauge,
+)
+
+logger = logging.getLogger("data_product")
+
+# Configuration
+SYSTEM_METRICS_INTERVAL = float(os.getenv("SYSTEM_METRICS_INTERVAL", "15"))  # seconds
+LOOP_LAG_PROBE_INTERVAL = 0.5  # seconds
+
+
+class GCPauseTracker:
+    """Accumulate garbage collector pause times from ``gc.callbacks``.
+
+    The callback only does arithmetic on plain attributes: it can fire in any
+    thread, including one holding a metrics lock, so it must not touch
+    Prometheus objects itself.
+    """
+
+    def __init__(self):
+        self.pause_seconds = [0.0, 0.0, 0.0]
+        self.collections = [0, 0, 0]
+        self.max_pause = 0.0
+        self._started: Optional[float] = None
+
+    def install(self):
+        if self._callback not in gc.callbacks:
+            gc.callbacks.append(self._callback)
+
+    def uninstall(self):
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def _callback(self, phase: str, info: Dict[str, int]):
+        if phase == "start":
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            pause = time.perf_counter() - self._started
+            self._started = None
+            generation = info["generation"]
+            self.pause_seconds[generation] += pause
+            self.collections[generation] += 1
+            self.max_pause = max(self.max_pause, pause)
+
+
+class SystemMetricsSampler:
+    """Periodically sample host and process statistics."""
+
+    def __init__(self, interval: float = SYSTEM_METRICS_INTERVAL):
+        self.interval = interval
+        self.gc_tracker = GCPauseTracker()
+        self.last_sample: Optional[Dict[str, Any]] = None
+        self._process = None
+        self._max_loop_lag = 0.0
+        self._gc_published = ([0.0, 0.0, 0.0], [0, 0, 0])
+        self._lock = threading.Lock()
+
+    def sample(self) -> Dict[str, Any]:
+        """Take a sample, update the gauges and return it."""
+        import psutil  # deferred: keeps psutil out of the import-time path
+
+        with self._lock:
+            if self._process is None:
+                self._process = psutil.Process()
+            process = self._process
+
+            with process.oneshot():
+                cpu_times = process.cpu_times()
+                rss = process.memory_info().rss
+                threads = process.num_threads()
+                fds = process.num_fds() if hasattr(process, "num_fds") else None
+
+            loop_lag, self._max_loop_lag = self._max_loop_lag, 0.0
+            gc_max_pause, self.gc_tracker.max_pause = self.gc_tracker.max_pause, 0.0
+
+            sample = {
+                "cpu": psutil.cpu_percent(),
+                "memory": psutil.virtual_memory().percent,
+                "disk": psutil.disk_usage("/").percent,
+                "process": {
+                    "rss_bytes": rss,
+                    "cpu_seconds": cpu_times.user + cpu_times.system,
+                    "open_fds": fds,
+                    "threads": threads,
+                },
+                "event_loop_lag_seconds": loop_lag,
+                "gc": {
+                    "collections": list(self.gc_tracker.collections),
+                    "pause_seconds": list(self.gc_tracker.pause_seconds),
+                    "max_pause_seconds": gc_max_pause,
+                },
+                "sampled_at": time.time(),
+            }
+            self._publish(sample)
+            self.last_sample = sample
+            return sample
+
+    def _publish(self, sample: Dict[str, Any]):
+        CPU_USAGE.set(sample["cpu"])
+        MEMORY_USAGE.set(sample["memory"])
+        DISK_USAGE.set(sample["disk"])
+        process = sample["process"]
+        process_rss_gauge.set(process["rss_bytes"])
+        process_cpu_gauge.set(process["cpu_seconds"])
+        process_threads_gauge.set(process["threads"])
+        if process["open_fds"] is not None:
+            process_fds_gauge.set(process["open_fds"])
+        event_loop_lag_gauge.set(sample["event_loop_lag_seconds"])
+
+        gc_stats = sample["gc"]
+        published_pauses, published_counts = self._gc_published
+        for generation in range(3):
+            label = str(generation)
+            gc_pause_counter.labels(label).inc(
+                gc_stats["pause_seconds"][generation] - published_pauses[generation]
+            )
+            gc_collections_counter.labels(label).inc(
+                gc_stats["collections"][generation] - published_counts[generation]
+            )
+        gc_pause_max_gauge.set(gc_stats["max_pause_seconds"])
+        self._gc_published = (gc_stats["pause_seconds"], gc_stats["collections"])
+
+    async def get_sample(self) -> Dict[str, Any]:
+        """Return the last sample, taking one off the event loop if none exists."""
+        if self.last_sample is None:
+            await asyncio.to_thread(self.sample)
+        return self.last_sample
+
+    async def run(self, interval: Optional[float] = None):
+        """Probe event-loop lag and sample on a fixed interval until cancelled."""
+        interval = interval or self.interval
+        loop = asyncio.get_running_loop()
+        self.gc_tracker.install()
+        next_sample = loop.time() + interval
+        try:
+            while True:
+                expected = loop.time() + LOOP_LAG_PROBE_INTERVAL
+                await asyncio.sleep(LOOP_LAG_PROBE_INTERVAL)
+                lag = max(loop.time() - expected, 0.0)
+                self._max_loop_lag = max(self._max_loop_lag, lag)
+
+                if loop.time() >= next_sample:
+                    next_sample = max(next_sample + interval, loop.time())
+                    try:
+                        await asyncio.to_thread(self.sample)
+                    except Exception as e:
+                        logger.error("System metrics sampling failed: %s", e)
+        finally:
+            self.gc_tracker.uninstall()
+
+
+# Shared sampler
+system_sampler = SystemMetricsSampler()
@@ -0,0 +1,219 @@
+"""Request timing module.
+
+Every HTTP request gets a ``RequestTimings`` held in a context variable. Code
+on the request path records named phases into it:
+
+- ``pool_wait``: waiting for a pooled DuckDB connection
+- ``query``: executing SQL
+- ``fetch``: materializing result rows
+- ``endpoint``: the whole endpoint function, including the phases above
+- ``serialize``: time FastAPI spends outside the endpoint (request validation
+  and response encoding)
+
+- ``schema``: fetching the ontology schema
+
+``ServerTimingMiddleware`` reports the phases in a ``Server-Timing`` response
+header and observes them in Prometheus histograms, using the request ID as
+exemplar so a slow bucket can be traced back to a request. Each phase is also
+a span of the request trace when the request is sampled (see ``tracing.py``).
+"""
+
+import asyncio
+import functools
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+
+from .metrics import request_latency_histogram, request_phase_histogram
+from .tracing import tracer
+
+REQUEST_ID_HEADER = "x-request-id"
+
+
+class RequestTimings:
+    """Phase durations, in seconds, for one request."""
+
+    __slots__ = ("request_id", "phases")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        """Format the phases as a ``Server-Timing`` header value."""
+        entries = [f"{name};dur={dur * 1000:.3f}" for name, dur in self.phases.items()]
+        entries.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Return the timings of the request being handled, if any."""
+    return _current.get()
+
+
+def current_request_id() -> Optional[str]:
+    """Return the ID of the request being handled, if any."""
+    timings = _current.get()
+    return timings.request_id if timings is not None else None
+
+
+def record_phase(name: str, seconds: float):
+    """Add a duration to a phase of the current request; no-op outside requests."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+class phase:
+    """Time the enclosed block as a phase (and span) of the current request.
+
+    A plain class rather than ``@contextmanager``: it wraps every query, so it
+    avoids the generator overhead.
+    """
+
+    __slots__ = ("name", "started", "span")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.span = tracer.span(self.name)
+        self.span.__enter__()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record_phase(self.name, time.perf_counter() - self.started)
+        return self.span.__exit__(exc_type, exc, tb)
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    # include_router re-creates routes from the already wrapped endpoint
+    if getattr(endpoint, "_timed", False):
+        return endpoint
+
+    # functools.wraps keeps the signature FastAPI inspects for parameters
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            with phase("endpoint"):
+                return await endpoint(*args, **kwargs)
+
+    else:
+
+        @functools.wraps(endpoint)
+        def timed(*args, **kwargs):
+            with phase("endpoint"):
+                return endpoint(*args, **kwargs)
+
+    timed._timed = True
+    return timed
+
+
+class TimedRoute(APIRoute):
+    """Route class recording the ``endpoint`` and ``serialize`` phases."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            started = time.perf_counter()
+            with tracer.span("route") as route_span:
+                route_span.set_attribute("http.route", self.path)
+                response = await handler(request)
+            timings = _current.get()
+            if timings is not None:
+                elapsed = time.perf_counter() - started
+                timings.add(
+                    "serialize", max(elapsed - timings.phases.get("endpoint", 0.0), 0.0)
+                )
+            return response
+
+        return timed_handler
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware exposing request phase timings.
+
+    Adds ``Server-Timing`` and ``X-Request-ID`` headers to every HTTP response
+    and observes the total and per-phase latency histograms, labelled by route
+    template so that path parameters do not explode cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _request_id(scope)
+        timings = RequestTimings(request_id)
+        token = _current.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    timings.server_timing(time.perf_counter() - started),
+                )
+                headers.append("X-Request-ID", request_id)
+            await send(message)
+
+        root = tracer.start_trace(
+            "http.request", method=scope["method"], request_id=request_id
+        )
+        try:
+            with root:
+                await self.app(scope, receive, send_with_timing)
+                root.set_attribute("http.route", _route_path(scope))
+                root.set_attribute("http.status_code", status)
+        finally:
+            _current.reset(token)
+            _observe(scope, status, timings, time.perf_counter() - started)
+
+
+def _request_id(scope) -> str:
+    for name, value in scope["headers"]:
+        if name == REQUEST_ID_HEADER.encode():
+            # Exemplar label sets are capped at 128 characters
+            return value.decode("latin-1")[:64]
+    return uuid.uuid4().hex
+
+
+def _route_path(scope) -> str:
+    return getattr(scope.get("route"), "path", "unmatched")
+
+
+def _observe(scope, status: int, timings: RequestTimings, total: float):
+    endpoint = _route_path(scope)
+    exemplar = {"request_id": timings.request_id}
+    request_latency_histogram.labels(scope["method"], endpoint, str(status)).observe(
+        total, exemplar=exemplar
+    )
+    for name, seconds in timings.phases.items():
+        request_phase_histogram.labels(endpoint, name).observe(
+            seconds, exemplar=exemplar
+        )
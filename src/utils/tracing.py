@@ -0,0 +1,320 @@
+"""In-process request tracing.
+
+A lightweight span recorder: the timing middleware opens a root span per
+request and ``phase()`` (see ``timing.py``) opens a child span for each phase,
+so routing, schema fetch, pool acquire, DuckDB execute/fetch and
+serialization all show up in a trace without extra instrumentation.
+
+The sampling decision is taken once per request. Unsampled requests carry no
+span at all and ``span()`` returns a shared no-op, which keeps the cost at a
+0% sampling rate to a context variable lookup. Finished spans are queued and
+exported in batches by a background thread, either as JSON lines to a local
+file or as OTLP/HTTP JSON to a collector.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("data_product")
+
+# Configuration
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.0"))  # 0.0 - 1.0
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "file")  # file, otlp or none
+TRACE_FILE = os.getenv(
+    "TRACE_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs", "traces.jsonl"),
+)
+OTLP_ENDPOINT = os.getenv("OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+SERVICE_NAME = "duckdb-spawn-api"
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+        "_token",
+        "_tracer",
+    )
+
+    def __init__(self, tracer, name: str, trace_id: str, parent_id: Optional[str]):
+        self._tracer = tracer
+        self._token = None
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_ns = 0
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self._tracer.processor.on_end(self)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Returned for unsampled requests; every operation is free."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class FileSpanExporter:
+    """Append spans as JSON lines to a local file."""
+
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+
+    def export(self, spans: List[Span]):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a") as f:
+            for s in spans:
+                f.write(json.dumps(s.to_dict(), default=str) + "\n")
+
+    def shutdown(self):
+        pass
+
+
+class OTLPSpanExporter:
+    """Post spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str = OTLP_ENDPOINT, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self._client = None
+
+    def export(self, spans: List[Span]):
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.Client(timeout=self.timeout)
+        response = self._client.post(self.endpoint, json=self.encode(spans))
+        response.raise_for_status()
+
+    @staticmethod
+    def encode(spans: List[Span]) -> Dict[str, Any]:
+        def attribute(key, value):
+            if isinstance(value, bool):
+                encoded = {"boolValue": value}
+            elif isinstance(value, int):
+                encoded = {"intValue": str(value)}
+            elif isinstance(value, float):
+                encoded = {"doubleValue": value}
+            else:
+                encoded = {"stringValue": str(value)}
+            return {"key": key, "value": encoded}
+
+        otlp_spans = []
+        for s in spans:
+            otlp_span = {
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                "name": s.name,
+                "kind": 1 if s.parent_id else 2,  # INTERNAL / SERVER
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": [attribute(k, v) for k, v in s.attributes.items()],
+                "status": {"code": 2, "message": s.error} if s.error else {},
+            }
+            if s.parent_id:
+                otlp_span["parentSpanId"] = s.parent_id
+            otlp_spans.append(otlp_span)
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [attribute("service.name", SERVICE_NAME)]
+                    },
+                    "scopeSpans": [
+                        {"scope": {"name": "data_product"}, "spans": otlp_spans}
+                    ],
+                }
+            ]
+        }
+
+    def shutdown(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+class BatchSpanProcessor:
+    """Queue finished spans and export them in batches from a daemon thread.
+
+    The queue is bounded; when the exporter cannot keep up, spans are dropped
+    rather than blocking requests.
+    """
+
+    def __init__(
+        self,
+        exporter,
+        max_queue_size: int = 2048,
+        max_batch_size: int = 256,
+        flush_interval: float = 1.0,
+    ):
+        self.exporter = exporter
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def on_end(self, span: Span):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="span-exporter", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch: List[Span] = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= self.max_batch_size:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                item = True
+            self._export(batch)
+            if item is None:
+                return
+
+    def _export(self, batch: List[Span]):
+        if not batch:
+            return
+        try:
+            self.exporter.export(batch)
+        except Exception as e:
+            logger.warning("Failed to export %s spans: %s", len(batch), e)
+
+    def shutdown(self, timeout: float = 5.0):
+        """Flush queued spans and stop the export thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+        self.exporter.shutdown()
+
+
+class NoopSpanProcessor:
+    def on_end(self, span: Span):
+        pass
+
+    def shutdown(self, timeout: float = 5.0):
+        pass
+
+
+class Tracer:
+    """Creates spans and takes the per-request sampling decision."""
+
+    def __init__(self, sample_rate: float = TRACE_SAMPLE_RATE, processor=None):
+        self.sample_rate = sample_rate
+        self.processor = processor or NoopSpanProcessor()
+
+    def start_trace(self, name: str, **attributes):
+        """Open a root span, or return the no-op span if not sampled."""
+        if self.sample_rate <= 0.0 or random.random() >= self.sample_rate:
+            return NOOP_SPAN
+        root = Span(self, name, f"{random.getrandbits(128):032x}", None)
+        root.attributes.update(attributes)
+        return root
+
+    def span(self, name: str):
+        """Open a child of the current span; a no-op outside sampled traces."""
+        parent = _current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id)
+
+    def shutdown(self):
+        self.processor.shutdown()
+
+
+def current_span() -> Optional[Span]:
+    """Return the active span of a sampled trace, if any."""
+    return _current_span.get()
+
+
+def _build_processor(exporter_name: str):
+    if exporter_name == "file":
+        return BatchSpanProcessor(FileSpanExporter())
+    if exporter_name == "otlp":
+        return BatchSpanProcessor(OTLPSpanExporter())
+    return NoopSpanProcessor()
+
+
+# Shared tracer
+tracer = Tracer(TRACE_SAMPLE_RATE, _build_processor(TRACE_EXPORTER))
+
+
+def span(name: str):
+    """Open a child span of the current trace on the shared tracer."""
+    return tracer.span(name)
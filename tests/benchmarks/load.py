@@ -0,0 +1,358 @@
+"""End-to-end load and latency benchmark harness.
+
+Drives the API with a mixed read/write workload, either in-process through
+the ASGI app (``--transport asgi``) or over a real socket against a uvicorn
+server (``--transport uvicorn``), and reports throughput and p50/p95/p99
+latency per operation.
+
+The ``projects`` table is bulk-seeded with the synthetic data generator
+(``src.database.synthetic``) before the run, so dataset sizes from 10k to
+10M rows are practical; a seeded ``--workdir`` is reused by later runs.
+Results can be saved as a JSON baseline and later runs compared against it:
+a throughput drop or p95/p99 increase beyond ``--threshold`` (a fraction)
+is a regression and makes the run exit with status 1.
+
+Example::
+
+    python -m tests.benchmarks.load --transport uvicorn --rows 1000000 \\
+        --concurrency 32 --requests 20000 --mix get=70,list=5,create=15,health=10 \\
+        --workdir /tmp/bench --baseline tests/benchmarks/baselines/uvicorn-1m.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_MIX = "get=60,list=5,create=20,health=15"
+SAMPLE_IDS = 1000
+STATUSES = ("PROPOSED", "ACTIVE", "COMPLETED")
+LAST_YEAR = datetime.now().year
+FIRST_YEAR = LAST_YEAR - 24  # synthetic projects span 25 years
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse ``op=weight`` pairs, e.g. ``get=60,create=20``."""
+    mix = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        op, _, weight = item.partition("=")
+        if op not in OPERATIONS:
+            raise ValueError(
+                f"Unknown operation {op!r}; expected one of {list(OPERATIONS)}"
+            )
+        mix[op] = float(weight)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError(f"Empty workload mix: {spec!r}")
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def seed_projects(rows: int) -> List[str]:
+    """Bring the ``projects`` table up to ``rows`` rows; return sample IDs.
+
+    Runs in the working directory the API uses, and closes its connections
+    afterwards so a server process can open the database file.
+    """
+    from src.database.connection_manager import DuckDBConnectionManager
+    from src.database.duckdb_manager import DuckDBManager
+    from src.database.synthetic import generate
+
+    conn_manager = DuckDBConnectionManager()
+    DuckDBManager(conn_manager=conn_manager)
+    try:
+        with conn_manager.get_connection() as conn:
+            existing = conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+            if rows > existing:
+                generate(conn, rows - existing, start=existing)
+            ids = conn.execute(
+                f"SELECT project_id::VARCHAR FROM projects USING SAMPLE {SAMPLE_IDS}"
+            ).fetchall()
+    finally:
+        conn_manager.close_all()
+    return [row[0] for row in ids]
+
+
+async def _get(client: httpx.AsyncClient, rng: random.Random, ids: List[str]):
+    return await client.get(f"/ops/projects/{rng.choice(ids)}")
+
+
+async def _list(client: httpx.AsyncClient, rng: random.Random, ids: List[str]):
+    params = {
+        "status": rng.choice(STATUSES),
+        "year": rng.randint(FIRST_YEAR, LAST_YEAR),
+    }
+    return await client.get("/ops/projects", params=params)
+
+
+async def _create(client: httpx.AsyncClient, rng: random.Random, ids: List[str]):
+    payload = {
+        "project_name": f"Bench {rng.getrandbits(32):08x}",
+        "total_amount": rng.randint(1_000_000, 100_000_000),
+        "maturity_years": rng.randint(5, 30),
+        "expected_tri": round(rng.uniform(4, 16), 2),
+        "dscr": round(rng.uniform(1, 2.5), 2),
+    }
+    return await client.post("/ops/projects", json=payload)
+
+
+async def _health(client: httpx.AsyncClient, rng: random.Random, ids: List[str]):
+    return await client.get("/health/ready")
+
+
+OPERATIONS = {"get": _get, "list": _list, "create": _create, "health": _health}
+
+
+async def run_workload(
+    client: httpx.AsyncClient,
+    mix: Dict[str, float],
+    concurrency: int,
+    total_requests: int,
+    ids: List[str],
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Issue ``total_requests`` requests from ``concurrency`` workers."""
+    rng = random.Random(seed)
+    ops, weights = list(mix), list(mix.values())
+    schedule = rng.choices(ops, weights, k=total_requests)
+    latencies: Dict[str, List[float]] = {op: [] for op in ops}
+    errors: Dict[str, int] = {op: 0 for op in ops}
+    next_index = 0
+
+    async def worker(worker_id: int):
+        nonlocal next_index
+        worker_rng = random.Random(seed * 1000 + worker_id)
+        while next_index < total_requests:
+            op = schedule[next_index]
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await OPERATIONS[op](client, worker_rng, ids)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies[op].append(time.perf_counter() - started)
+            errors[op] += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, errors, elapsed)
+
+
+def summarize(
+    latencies: Dict[str, List[float]], errors: Dict[str, int], elapsed: float
+) -> Dict[str, Any]:
+    """Throughput and latency percentiles (milliseconds), overall and per op."""
+
+    def stats(values: List[float], error_count: int) -> Dict[str, float]:
+        ordered = sorted(values)
+        return {
+            "requests": len(ordered),
+            "errors": error_count,
+            "throughput_rps": len(ordered) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(ordered, 50) * 1000,
+            "p95_ms": percentile(ordered, 95) * 1000,
+            "p99_ms": percentile(ordered, 99) * 1000,
+        }
+
+    every = [value for values in latencies.values() for value in values]
+    return {
+        "elapsed_seconds": elapsed,
+        "overall": stats(every, sum(errors.values())),
+        "operations": {op: stats(latencies[op], errors[op]) for op in latencies},
+    }
+
+
+def compare(
+    result: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """List regressions of ``result`` against ``baseline`` beyond ``threshold``."""
+    regressions = []
+    sections = {"overall": (result["overall"], baseline["overall"])}
+    for op, current in result["operations"].items():
+        if op in baseline.get("operations", {}):
+            sections[op] = (current, baseline["operations"][op])
+
+    for name, (current, previous) in sections.items():
+        if previous["throughput_rps"] and current["throughput_rps"] < previous[
+            "throughput_rps"
+        ] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {current['throughput_rps']:.1f} rps < "
+                f"baseline {previous['throughput_rps']:.1f} rps"
+            )
+        for key in ("p95_ms", "p99_ms"):
+            if previous[key] and current[key] > previous[key] * (1 + threshold):
+                regressions.append(
+                    f"{name}: {key} {current[key]:.2f} > baseline {previous[key]:.2f}"
+                )
+    return regressions
+
+
+async def _run_asgi(args, mix, ids) -> Dict[str, Any]:
+    from src.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            await _wait_until_ready(client)
+            await run_workload(client, mix, args.concurrency, args.warmup, ids, seed=1)
+            return await run_workload(client, mix, args.concurrency, args.requests, ids)
+
+
+async def _wait_until_ready(
+    client: httpx.AsyncClient, server: Optional[subprocess.Popen] = None
+):
+    """Poll the readiness probe until the first background check has passed."""
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            if (await client.get("/health/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        exited = server is not None and server.poll() is not None
+        if exited or time.monotonic() > deadline:
+            raise RuntimeError("API did not become ready")
+        await asyncio.sleep(0.1)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _run_uvicorn(args, mix, ids) -> Dict[str, Any]:
+    port = _free_port()
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT}
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(args.workers),
+            "--no-access-log",
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://localhost:{port}", limits=limits, timeout=60
+        ) as client:
+            await _wait_until_ready(client, server)
+            await run_workload(client, mix, args.concurrency, args.warmup, ids, seed=1)
+            return await run_workload(client, mix, args.concurrency, args.requests, ids)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+TRANSPORTS = {"asgi": _run_asgi, "uvicorn": _run_uvicorn}
+
+
+def run(args) -> Dict[str, Any]:
+    """Seed the dataset in the working directory and run the workload."""
+    mix = parse_mix(args.mix)
+    # One client drives all the load: keep the limiter's cost but never throttle
+    os.environ.setdefault("RATE_LIMIT_RATE", "1e9")
+    os.makedirs(args.workdir, exist_ok=True)
+    os.chdir(args.workdir)  # the API keeps its database under ./data
+
+    seed_started = time.perf_counter()
+    ids = seed_projects(args.rows)
+    seed_seconds = time.perf_counter() - seed_started
+
+    result = asyncio.run(TRANSPORTS[args.transport](args, mix, ids))
+    result.update(
+        {
+            "transport": args.transport,
+            "rows": args.rows,
+            "concurrency": args.concurrency,
+            "mix": mix,
+            "seed_seconds": seed_seconds,
+            "recorded_at": datetime.now().isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+            },
+        }
+    )
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS), default="asgi")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--workdir", default=os.path.join(os.getcwd(), "bench"))
+    parser.add_argument("--output", help="Write the result JSON to this file")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Save the result as baseline"
+    )
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    for name in ("output", "baseline"):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+
+    result = run(args)
+    report = json.dumps(result, indent=2)
+    sys.stdout.write("LOAD_RESULT " + json.dumps(result) + "\n")  # one write
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+
+    regressions = []
+    if args.baseline and args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            f.write(report)
+    elif args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.threshold)
+    for regression in regressions:
+        sys.stderr.write(f"REGRESSION {regression}\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
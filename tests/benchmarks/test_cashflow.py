@@ -0,0 +1,46 @@
+"""Portfolio cash-flow projection benchmark.
+
+Projects an annual annuity schedule for a portfolio holding
+``CASHFLOW_PROJECTS`` synthetic projects (default 50,000) and fails when the
+best of three runs exceeds ``CASHFLOW_BUDGET`` seconds.
+"""
+
+import os
+import time
+from datetime import date
+
+import pytest
+
+from src.database.cashflow import project_portfolio
+from src.database.synthetic import generate
+
+PROJECTS = int(os.getenv("CASHFLOW_PROJECTS", "50000"))
+BUDGET = float(os.getenv("CASHFLOW_BUDGET", "1.0"))
+PORTFOLIO = "00000000-0000-0000-0000-000000000001"
+
+
+@pytest.mark.benchmark
+def test_large_portfolio_projection_within_budget(schema_conn, record_property):
+    conn = schema_conn
+    generate(conn, PROJECTS, seed=7, as_of=date(2024, 1, 1))
+    conn.execute(
+        "INSERT INTO portfolios VALUES (?, 'All', NULL, 'BALANCED', 1, ?, ?)",
+        (PORTFOLIO, date(2024, 1, 1), date(2024, 1, 1)),
+    )
+    conn.execute(
+        "INSERT INTO portfolio_projects "
+        "SELECT ?, project_id, 0.01, DATE '2024-01-01' FROM projects",
+        (PORTFOLIO,),
+    )
+
+    best, rows = float("inf"), None
+    for _ in range(3):
+        started = time.perf_counter()
+        rows = project_portfolio(conn, PORTFOLIO).fetchall()
+        best = min(best, time.perf_counter() - started)
+    record_property("projects", PROJECTS)
+    record_property("periods", len(rows))
+    record_property("best_seconds", round(best, 4))
+
+    assert rows
+    assert best < BUDGET
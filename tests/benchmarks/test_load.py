@@ -0,0 +1,79 @@
+"""End-to-end load benchmark with an optional regression baseline.
+
+Runs the ``load`` harness in a fresh interpreter and working directory, once
+in-process over ASGI and once against a uvicorn server. The dataset and
+workload size come from ``LOAD_ROWS``, ``LOAD_REQUESTS`` and
+``LOAD_CONCURRENCY``. When ``LOAD_BASELINE_DIR`` is set, results are compared
+with ``<transport>-<rows>.json`` in that directory (saved there on first run)
+and a regression beyond ``LOAD_REGRESSION_THRESHOLD`` fails the test.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tests.benchmarks.load import compare, percentile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+ROWS = int(os.getenv("LOAD_ROWS", "10000"))
+REQUESTS = int(os.getenv("LOAD_REQUESTS", "300"))
+CONCURRENCY = int(os.getenv("LOAD_CONCURRENCY", "8"))
+BASELINE_DIR = os.getenv("LOAD_BASELINE_DIR")
+THRESHOLD = float(os.getenv("LOAD_REGRESSION_THRESHOLD", "0.2"))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("transport", ["asgi", "uvicorn"])
+def test_load_without_errors_or_regressions(tmp_path, transport, record_property):
+    command = [
+        sys.executable,
+        "-m",
+        "tests.benchmarks.load",
+        f"--transport={transport}",
+        f"--rows={ROWS}",
+        f"--requests={REQUESTS}",
+        f"--concurrency={CONCURRENCY}",
+        f"--workdir={tmp_path}",
+        f"--threshold={THRESHOLD}",
+    ]
+    if BASELINE_DIR:
+        baseline = os.path.join(BASELINE_DIR, f"{transport}-{ROWS}.json")
+        command.append(f"--baseline={baseline}")
+        if not os.path.exists(baseline):
+            command.append("--update-baseline")
+
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT, "USE_MOCK_ONTO_SERVER": "true"}
+    completed = subprocess.run(
+        command, cwd=REPO_ROOT, env=env, capture_output=True, text=True
+    )
+    line = next(
+        (x for x in completed.stdout.splitlines() if x.startswith("LOAD_RESULT ")),
+        None,
+    )
+    assert line is not None, completed.stderr[-2000:]
+    result = json.loads(line.split(" ", 1)[1])
+    record_property("overall", json.dumps(result["overall"]))
+    record_property("operations", json.dumps(result["operations"]))
+
+    assert result["overall"]["requests"] == REQUESTS
+    assert result["overall"]["errors"] == 0
+    assert completed.returncode == 0, completed.stderr[-2000:]
+
+
+def test_compare_flags_throughput_and_tail_latency_regressions():
+    def stats(rps, p95, p99):
+        return {"throughput_rps": rps, "p95_ms": p95, "p99_ms": p99}
+
+    baseline = {"overall": stats(100, 10, 20), "operations": {"get": stats(80, 5, 8)}}
+    result = {"overall": stats(95, 11, 30), "operations": {"get": stats(50, 5, 8)}}
+
+    regressions = compare(result, baseline, threshold=0.2)
+
+    assert regressions == [
+        "overall: p99_ms 30.00 > baseline 20.00",
+        "get: throughput 50.0 rps < baseline 80.0 rps",
+    ]
+    assert percentile([1, 2, 3, 4], 50) == 2
@@ -0,0 +1,64 @@
+"""Request-path logging cost benchmark.
+
+Compares the time a ``logger.info`` call takes on the caller's thread with
+the queued pipeline against a synchronous ``FileHandler``. The queued call
+must stay under ``LOG_CALL_BUDGET_US`` (microseconds); the writer thread
+still shares the GIL, so the comparison is reported rather than asserted.
+"""
+
+import logging
+import os
+import queue
+import time
+
+import pytest
+
+from src.utils.logging_config import (
+    BatchingQueueListener,
+    BatchRotatingFileHandler,
+    ContextQueueHandler,
+    CustomJsonFormatter,
+)
+
+CALL_BUDGET_US = float(os.getenv("LOG_CALL_BUDGET_US", "25.0"))
+MESSAGES = 5_000
+
+
+def _per_call_us(logger) -> float:
+    started = time.perf_counter()
+    for i in range(MESSAGES):
+        logger.info("Retrieved project: %s", i)
+    return (time.perf_counter() - started) / MESSAGES * 1e6
+
+
+def _logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+@pytest.mark.benchmark
+def test_queued_logging_cost_within_budget(tmp_path, record_property):
+    formatter = CustomJsonFormatter("%(timestamp)s %(level)s %(name)s %(message)s")
+
+    sync_handler = logging.FileHandler(tmp_path / "sync.log")
+    sync_handler.setFormatter(formatter)
+    sync_us = _per_call_us(_logger("bench_logging.sync", sync_handler))
+    sync_handler.close()
+
+    file_handler = BatchRotatingFileHandler(str(tmp_path / "queued.log"))
+    file_handler.setFormatter(formatter)
+    log_queue = queue.Queue()
+    listener = BatchingQueueListener(log_queue, [file_handler])
+    listener.start()
+    queued_us = _per_call_us(
+        _logger("bench_logging.queued", ContextQueueHandler(log_queue))
+    )
+    listener.stop()
+    record_property("sync_us_per_call", round(sync_us, 2))
+    record_property("queued_us_per_call", round(queued_us, 2))
+
+    assert (tmp_path / "queued.log").read_text().count("\n") == MESSAGES
+    assert queued_us < CALL_BUDGET_US
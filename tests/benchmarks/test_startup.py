@@ -0,0 +1,74 @@
+"""Cold-start benchmark with a regression budget.
+
+Each run starts a fresh interpreter, as a scale-to-zero instance would, and
+measures importing ``src.main`` and running the application lifespan against
+an empty and then an already-initialized database. The import budget is about
+1.5 times the measured import time, so a regression shows up long before it
+doubles; budgets can be tightened or relaxed per environment with
+``STARTUP_IMPORT_BUDGET`` and ``STARTUP_LIFESPAN_BUDGET`` (seconds).
+
+Heavy optional dependencies are loaded on first use only; the run fails if
+starting the app pulls any of ``DEFERRED_MODULES`` in.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+IMPORT_BUDGET = float(os.getenv("STARTUP_IMPORT_BUDGET", "0.8"))
+LIFESPAN_BUDGET = float(os.getenv("STARTUP_LIFESPAN_BUDGET", "0.5"))
+# Loaded on first use: ontology fetch, metrics request, stress job, Arrow output
+DEFERRED_MODULES = ("httpx", "psutil", "numpy", "pyarrow")
+
+STARTUP_SCRIPT = f"""
+import asyncio, json, sys, time
+
+started = time.perf_counter()
+from src.main import app
+imported = time.perf_counter()
+
+async def run_lifespan():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(run_lifespan())
+result = {{
+    "import_seconds": imported - started,
+    "lifespan_seconds": ready - imported,
+    "loaded": [m for m in {DEFERRED_MODULES!r} if m in sys.modules],
+}}
+sys.stdout.write("STARTUP_RESULT " + json.dumps(result) + "\\n")  # one write
+"""
+
+
+def _measure_startup(cwd) -> dict:
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT, "USE_MOCK_ONTO_SERVER": "true"}
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    # Log lines are written to stdout by a background thread, in any order
+    line = next(x for x in output.splitlines() if x.startswith("STARTUP_RESULT "))
+    return json.loads(line.split(" ", 1)[1])
+
+
+@pytest.mark.benchmark
+def test_startup_within_budget(tmp_path, record_property):
+    """Cold and warm starts stay within the startup budget."""
+    cold = _measure_startup(tmp_path)
+    warm = _measure_startup(tmp_path)
+    record_property("cold_start", json.dumps(cold))
+    record_property("warm_start", json.dumps(warm))
+
+    assert cold["loaded"] == [], "deferred modules loaded at startup"
+    assert warm["import_seconds"] < IMPORT_BUDGET
+    assert cold["lifespan_seconds"] < LIFESPAN_BUDGET
+    assert warm["lifespan_seconds"] < LIFESPAN_BUDGET
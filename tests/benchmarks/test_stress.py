@@ -0,0 +1,70 @@
+"""Monte Carlo stress throughput benchmark.
+
+Runs ``STRESS_BENCH_SCENARIOS`` scenarios over ``STRESS_BENCH_PROJECTS``
+random projects on one worker and on every core, and checks that the pool
+reaches ``STRESS_SCALING_EFFICIENCY`` of linear speed-up. Single-core hosts
+only report throughput.
+"""
+
+import asyncio
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.database import monte_carlo
+from src.database.stress import StressEngine
+
+PROJECTS = int(os.getenv("STRESS_BENCH_PROJECTS", "50000"))
+SCENARIOS = int(os.getenv("STRESS_BENCH_SCENARIOS", "4000"))
+EFFICIENCY = float(os.getenv("STRESS_SCALING_EFFICIENCY", "0.6"))
+
+
+def _portfolio():
+    rng = np.random.default_rng(0)
+    currencies = np.array(["USD", "EUR", "GBP", "JPY", "CAD", "AUD"])
+    rows = zip(
+        rng.uniform(1e6, 1e8, PROJECTS),
+        rng.uniform(0.02, 0.25, PROJECTS),
+        rng.integers(5, 36, PROJECTS).astype(float),
+        rng.uniform(0.8, 3.0, PROJECTS),
+        currencies[rng.integers(0, 6, PROJECTS)],
+    )
+    block, codes = monte_carlo.to_block(list(rows))
+    return {"block": block, "currencies": codes}
+
+
+def _throughput(workers: int, portfolio) -> float:
+    async def run():
+        engine = StressEngine(workers=workers, batch_scenarios=250)
+        # Warm the pool so process start-up is not measured
+        warmup = engine.submit(portfolio, "bench", workers * 250, seed=0)
+        while warmup.finished is None:
+            await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        job = engine.submit(portfolio, "bench", SCENARIOS, seed=1)
+        while job.finished is None:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - started
+        engine.shutdown()
+        assert job.status == "completed", job.error
+        return SCENARIOS / elapsed
+
+    return asyncio.run(run())
+
+
+@pytest.mark.benchmark
+def test_stress_throughput_scales_with_cores(record_property):
+    portfolio = _portfolio()
+    # Cores this process may run on, unlike os.cpu_count()
+    cores = len(os.sched_getaffinity(0))
+    single = _throughput(1, portfolio)
+    record_property("projects", PROJECTS)
+    record_property("single_worker_scenarios_per_second", round(single))
+    if cores < 2:
+        return
+    pooled = _throughput(cores, portfolio)
+    record_property("workers", cores)
+    record_property("pooled_scenarios_per_second", round(pooled))
+    assert pooled >= EFFICIENCY * cores * single
@@ -0,0 +1,58 @@
+"""Tracing overhead benchmark at a 0% sampling rate.
+
+Every request path phase opens a span, so the unsampled path must stay close
+to free. The budgets for one unsampled span and one request phase (span plus timing)
+can be adjusted with ``TRACE_SPAN_BUDGET_US`` and ``TRACE_PHASE_BUDGET_US``
+(microseconds).
+"""
+
+import os
+import time
+
+import pytest
+
+from src.utils.timing import phase
+from src.utils.tracing import Tracer
+
+SPAN_BUDGET_US = float(os.getenv("TRACE_SPAN_BUDGET_US", "1.0"))
+PHASE_BUDGET_US = float(os.getenv("TRACE_PHASE_BUDGET_US", "3.0"))
+ITERATIONS = 200_000
+
+
+def _per_iteration_us(body) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        body()
+        best = min(best, time.perf_counter() - started)
+    return best / ITERATIONS * 1e6
+
+
+@pytest.mark.benchmark
+def test_unsampled_span_overhead_within_budget(monkeypatch, record_property):
+    """Unsampled spans add well under a microsecond each."""
+    tracer = Tracer(sample_rate=0.0)
+    monkeypatch.setattr("src.utils.timing.tracer", tracer)
+
+    def baseline():
+        for _ in range(ITERATIONS):
+            pass
+
+    def spans():
+        for _ in range(ITERATIONS):
+            with tracer.span("query"):
+                pass
+
+    def phases():
+        for _ in range(ITERATIONS):
+            with phase("query"):
+                pass
+
+    base = _per_iteration_us(baseline)
+    span_cost = _per_iteration_us(spans) - base
+    phase_cost = _per_iteration_us(phases) - base
+    record_property("span_us", round(span_cost, 3))
+    record_property("phase_us", round(phase_cost, 3))
+
+    assert span_cost < SPAN_BUDGET_US
+    assert phase_cost < PHASE_BUDGET_US
@@ -0,0 +1,115 @@
+from datetime import date
+from itertools import count
+
+import duckdb
+import pytest
+
+from src.database.connection_manager import DuckDBConnectionPool
+from src.database.schema import SCHEMA_DEFINITIONS
+from src.routes import portfolios
+from src.utils import tracing
+from src.utils.logging_config import setup_logging
+
+# Column values of projects added by ``add_portfolio``, unless overridden
+PROJECT = {
+    "total_amount": 1000.0,
+    "maturity_years": 10,
+    "expected_tri": 5.0,
+    "dscr": 1.5,
+    "currency_code": "USD",
+    "allocation_percentage": 100.0,
+}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def runtime_logs(tmp_path_factory):
+    """Write the JSON log and trace spans of the session under tmp_path.
+
+    ``LOG_DIR`` and ``TRACE_FILE`` are also exported for the servers the
+    benchmarks spawn, so nothing is written into src/logs.
+    """
+    logs = tmp_path_factory.mktemp("logs")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("LOG_DIR", str(logs))
+        mp.setenv("TRACE_FILE", str(logs / "traces.jsonl"))
+        exporter = getattr(tracing.tracer.processor, "exporter", None)
+        if isinstance(exporter, tracing.FileSpanExporter):
+            mp.setattr(exporter, "path", str(logs / "traces.jsonl"))
+        setup_logging(log_dir=str(logs))
+        yield logs
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """Connection pool over a temporary database file with every table."""
+    pool = DuckDBConnectionPool(db_path=str(tmp_path / "test.db"))
+    with pool.get_connection() as conn:
+        for schema_sql in SCHEMA_DEFINITIONS.values():
+            conn.execute(schema_sql)
+    return pool
+
+
+@pytest.fixture
+def schema_conn():
+    """In-memory DuckDB connection with every table."""
+    conn = duckdb.connect()
+    for schema_sql in SCHEMA_DEFINITIONS.values():
+        conn.execute(schema_sql)
+    return conn
+
+
+@pytest.fixture
+def add_portfolio(schema_conn):
+    """Insert a portfolio allocating to one new project per dict of overrides.
+
+    Projects are numbered across calls, so every portfolio of a test gets
+    its own: project ``n`` has the ID ``00000000-0000-0000-0000-<n:012d>``.
+    Columns not overridden take their value from ``PROJECT``.
+    """
+    numbers = count()
+
+    def add(portfolio_id, projects, created=date(2020, 6, 15)):
+        schema_conn.execute(
+            "INSERT INTO portfolios VALUES (?, 'Core', NULL, 'MODERATE', 1, ?, ?)",
+            (portfolio_id, date(2020, 1, 1), date(2020, 1, 1)),
+        )
+        for overrides in projects:
+            i = next(numbers)
+            project = {**PROJECT, **overrides}
+            project_id = f"00000000-0000-0000-0000-{i:012d}"
+            schema_conn.execute(
+                "INSERT INTO projects VALUES "
+                "(?, ?, NULL, ?, ?, ?, ?, 'ACTIVE', ?, ?, ?)",
+                (
+                    project_id,
+                    f"P{i}",
+                    project["total_amount"],
+                    project["maturity_years"],
+                    project["expected_tri"],
+                    project["dscr"],
+                    created,
+                    created,
+                    project["currency_code"],
+                ),
+            )
+            schema_conn.execute(
+                "INSERT INTO portfolio_projects VALUES (?, ?, ?, ?)",
+                (portfolio_id, project_id, project["allocation_percentage"], created),
+            )
+        return schema_conn
+
+    return add
+
+
+@pytest.fixture
+def portfolio_routes(schema_conn, monkeypatch):
+    """Serve the portfolio routes from ``schema_conn``."""
+
+    class Manager:
+        class conn_manager:
+            @staticmethod
+            def get_connection():
+                return schema_conn.cursor()
+
+    monkeypatch.setattr(portfolios, "get_db_manager", lambda: Manager)
+    monkeypatch.setattr(portfolios.project_tiering, "read_source", lambda: "projects")
@@ -0,0 +1,78 @@
+import shutil
+
+import duckdb
+
+from src.database.backup import SnapshotManager
+from src.database.tiering import ProjectTiering
+
+
+def test_incremental_snapshot_and_restore(pool, tmp_path):
+    """Unchanged tables are reused and a restore reproduces every table."""
+    with pool.get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO projects
+            SELECT uuid(), 'Project ' || i, NULL, 1000, 10, 7.5, 1.3, 'ACTIVE',
+                   current_date, now()::TIMESTAMP, 'USD'
+            FROM range(1000) t(i)
+            """
+        )
+        conn.execute(
+            """
+            INSERT INTO change_log (table_name, operation, entity_id, changed_at)
+            SELECT 'projects', 'INSERT', project_id::VARCHAR, now()::TIMESTAMP
+            FROM projects
+            """
+        )
+    manager = SnapshotManager(conn_manager=pool, backup_path=str(tmp_path / "backups"))
+
+    first = manager.create_snapshot()
+    with pool.get_connection() as conn:
+        conn.execute("DELETE FROM projects WHERE project_name = 'Project 1'")
+    second = manager.create_snapshot()
+
+    assert first["parent_id"] is None
+    assert second["parent_id"] == first["snapshot_id"]
+    assert second["tables"]["change_log"]["reused"] is True
+    assert second["tables"]["projects"]["reused"] is False
+    assert second["written_bytes"] < first["written_bytes"]
+
+    result = manager.restore_snapshot(second["snapshot_id"])
+    restored = duckdb.connect(result["target_path"])
+    assert restored.execute("SELECT COUNT(*) FROM projects").fetchone()[0] == 999
+    assert restored.execute("SELECT COUNT(*) FROM change_log").fetchone()[0] == 1000
+    assert restored.execute("SELECT nextval('change_log_seq')").fetchone()[0] == 1001
+    assert result["mb_per_second"] >= 0
+
+
+def test_snapshot_includes_cold_tier(pool, tmp_path):
+    """Cold projects are in the snapshot and the restored view reads them."""
+    with pool.get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO projects
+            SELECT uuid(), 'Project ' || i, NULL, 1000, 10, 7.5, 1.3, 'COMPLETED',
+                   DATE '2010-01-01' + INTERVAL (i * 20) DAY, now()::TIMESTAMP, 'USD'
+            FROM range(200) t(i)
+            """
+        )
+    cold = tmp_path / "cold"
+    tiering = ProjectTiering(conn_manager=pool, cold_path=str(cold))
+    moved = tiering.age_out(min_age_years=3)["moved_rows"]
+    assert moved > 0
+    manager = SnapshotManager(
+        conn_manager=pool, backup_path=str(tmp_path / "backups"), cold_path=str(cold)
+    )
+
+    first = manager.create_snapshot()
+    second = manager.create_snapshot()
+    assert len(first["cold_files"]) == len(tiering.cold_files())
+    assert all(f["reused"] for f in second["cold_files"].values())
+
+    shutil.rmtree(cold)
+    result = manager.restore_snapshot(second["snapshot_id"])
+    restored = duckdb.connect(result["target_path"])
+    assert restored.execute("SELECT COUNT(*) FROM projects_all").fetchone()[0] == 200
+    assert (
+        restored.execute("SELECT COUNT(*) FROM projects").fetchone()[0] == 200 - moved
+    )
@@ -0,0 +1,82 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.database.cashflow import PERIOD_COLUMNS, project_portfolio
+from src.main import app
+
+PORTFOLIO = "00000000-0000-0000-0000-0000000000aa"
+
+
+@pytest.fixture
+def conn(add_portfolio):
+    return add_portfolio(
+        PORTFOLIO,
+        [
+            {
+                "total_amount": 2000.0,
+                "maturity_years": 2,
+                "expected_tri": 10.0,
+                "allocation_percentage": 50.0,
+            },
+            {"maturity_years": 3, "expected_tri": 0.0},
+        ],
+    )
+
+
+def test_annuity_and_linear_schedules_aggregate_per_period(conn):
+    rows = project_portfolio(conn, PORTFOLIO).fetchall()
+    periods = [dict(zip(PERIOD_COLUMNS, row)) for row in rows]
+
+    # 1000 at 10% over 2 years pays 576.19 a year; 1000 at 0% over 3 years 333.33
+    assert [p["period"] for p in periods] == [
+        date(2021, 1, 1),
+        date(2022, 1, 1),
+        date(2023, 1, 1),
+    ]
+    assert periods[0]["interest"] == 100.0
+    assert periods[0]["debt_service"] == pytest.approx(576.19 + 333.33, abs=0.01)
+    assert periods[0]["cfads"] == pytest.approx(1.5 * (576.19 + 333.33), abs=0.02)
+    assert periods[0]["outstanding"] == pytest.approx(523.81 + 666.67, abs=0.01)
+    assert periods[2]["projects"] == 1
+    assert periods[2]["outstanding"] == 0
+    assert sum(p["principal"] for p in periods) == pytest.approx(2000, abs=0.02)
+
+    linear = project_portfolio(conn, PORTFOLIO, amortization="linear").fetchall()
+    assert linear[0][PERIOD_COLUMNS.index("principal")] == pytest.approx(
+        833.33, abs=0.01
+    )
+
+    quarterly = project_portfolio(
+        conn, PORTFOLIO, frequency="quarterly", start=date(2021, 1, 1)
+    ).fetchall()
+    assert quarterly[0][0] == date(2021, 1, 1)
+    assert len(quarterly) == 10  # the 3-year loan runs through Q2 2023
+
+
+def test_cashflow_endpoint(conn, portfolio_routes):
+    client = TestClient(app, base_url="http://test")
+
+    body = client.get(f"/ops/portfolios/{PORTFOLIO}/cashflows").json()
+    assert body["totals"]["principal"] == pytest.approx(2000, abs=0.02)
+    assert len(body["periods"]) == 3
+
+    missing = client.get(
+        "/ops/portfolios/00000000-0000-0000-0000-000000000000/cashflows"
+    )
+    assert missing.status_code == 404
+    assert (
+        client.get(
+            f"/ops/portfolios/{PORTFOLIO}/cashflows?frequency=weekly"
+        ).status_code
+        == 422
+    )
+
+
+def test_portfolios_get_their_own_projects(conn, add_portfolio):
+    other = "00000000-0000-0000-0000-0000000000bb"
+    add_portfolio(other, [{"maturity_years": 1}] * 12)
+
+    assert project_portfolio(conn, other).fetchall()[0][1] == 12
+    assert project_portfolio(conn, PORTFOLIO).fetchall()[0][1] == 2
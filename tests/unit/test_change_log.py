@@ -0,0 +1,66 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from src.database.change_log import ChangeLog, ChangeLogTruncatedError
+
+
+@pytest.fixture
+def change_log(pool):
+    """Change log backed by a temporary database."""
+    return ChangeLog(conn_manager=pool)
+
+
+def _append(change_log, entity_id):
+    with change_log.conn_manager.get_connection() as conn:
+        seq = change_log.append(conn, "projects", "INSERT", entity_id, {"id": 1})
+    change_log.publish(seq)
+    return seq
+
+
+def test_read_since_returns_changes_in_order(change_log):
+    """Changes after the cursor are returned in sequence order."""
+    first = _append(change_log, "a")
+    second = _append(change_log, "b")
+
+    changes = change_log.read_since(0)
+    assert [c["seq"] for c in changes] == [first, second]
+    assert change_log.read_since(first)[0]["entity_id"] == "b"
+    assert change_log.latest_seq() == second
+
+
+def test_truncated_cursor_raises(change_log):
+    """Consumers behind the retention window are told to resync."""
+    _append(change_log, "a")
+    _append(change_log, "b")
+    assert change_log.truncate(timedelta(seconds=-1)) == 2
+    last = _append(change_log, "c")
+
+    with pytest.raises(ChangeLogTruncatedError):
+        change_log.read_since(0)
+    assert change_log.read_since(last - 1)[0]["seq"] == last
+
+
+def test_rolled_back_append_is_not_truncation(change_log):
+    """A gap left by a rolled-back write does not look like truncation."""
+    with change_log.conn_manager.get_connection() as conn:
+        conn.begin()
+        change_log.append(conn, "projects", "INSERT", "a", {"id": 1})
+        conn.rollback()
+    seq = _append(change_log, "b")
+
+    assert [c["seq"] for c in change_log.read_since(0)] == [seq]
+
+
+def test_long_poll_wakes_on_publish(change_log):
+    """A waiting consumer is released as soon as a change is published."""
+
+    async def scenario():
+        waiter = asyncio.create_task(change_log.wait_for_changes(0, timeout=5))
+        await asyncio.sleep(0)
+        _append(change_log, "a")
+        return await asyncio.wait_for(waiter, 1)
+
+    assert asyncio.run(scenario()) is True
+    assert asyncio.run(change_log.wait_for_changes(10, timeout=0.01)) is False
@@ -0,0 +1,70 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from config.mock_onto_responses import get_mock_response
+from config.onto_server import ProjectSchema
+from src.database.compiled_schema import CompiledSchema, compile_schema
+
+
+@pytest.fixture
+def schema():
+    return ProjectSchema(**get_mock_response("project_schema"))
+
+
+def _row(**overrides):
+    values = {
+        "project_id": "6f1c2a1e-2f55-4d6b-9a44-0e1f2a3b4c5d",
+        "project_name": "Solar Farm",
+        "description": None,
+        "total_amount": 1500000.456,
+        "maturity_years": 15,
+        "expected_tri": "8.5",
+        "dscr": 1.3,
+        "status": "ACTIVE",
+        "creation_date": "2024-01-02",
+        "last_updated": datetime(2024, 1, 2, 12, 0),
+        "currency_code": "EUR",
+    }
+    values.update(overrides)
+    return values
+
+
+def test_encode_row_coerces_in_column_order(schema):
+    compiled = CompiledSchema.compile(schema)
+    row = compiled.encode_row(_row())
+
+    assert len(row) == len(compiled.columns)
+    encoded = dict(zip(compiled.columns, row))
+    assert encoded["total_amount"] == Decimal("1500000.46")
+    assert encoded["expected_tri"] == Decimal("8.50")
+    assert encoded["creation_date"] == date(2024, 1, 2)
+    assert encoded["description"] is None
+
+
+@pytest.mark.parametrize(
+    "overrides, message",
+    [
+        ({"project_name": None}, "Missing required field: project_name"),
+        ({"currency_code": "EURO"}, "Invalid value for currency_code"),
+        ({"maturity_years": 1.5}, "Invalid value for maturity_years"),
+        ({"dscr": 1000}, "Invalid value for dscr"),
+    ],
+)
+def test_encode_row_rejects_invalid_values(schema, overrides, message):
+    compiled = CompiledSchema.compile(schema)
+    with pytest.raises(ValueError, match=message):
+        compiled.encode_row(_row(**overrides))
+
+
+def test_compile_schema_reuses_artifact_per_version(schema):
+    compiled = compile_schema(schema)
+
+    assert compile_schema(schema) is compiled
+    # An equal schema from a fresh fetch maps to the same version
+    assert compile_schema(schema.model_copy(deep=True)) is compiled
+
+    changed = schema.model_copy(deep=True)
+    changed.columns[1].type = "VARCHAR(200)"
+    assert compile_schema(changed) is not compiled
@@ -0,0 +1,66 @@
+import gzip
+import zlib
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.utils.compression import (
+    BrotliEncoder,
+    CompressionMiddleware,
+    GzipEncoder,
+    ZstdEncoder,
+    negotiate,
+)
+
+
+def test_negotiation_honours_q_values_and_server_preference():
+    encoders = [ZstdEncoder, BrotliEncoder, GzipEncoder]
+
+    assert negotiate("gzip, deflate, br, zstd", encoders) is ZstdEncoder
+    assert negotiate("gzip;q=1.0, br;q=0.8", encoders) is GzipEncoder
+    assert negotiate("zstd;q=0, *", encoders) is BrotliEncoder
+    assert negotiate("identity", encoders) is None
+    assert negotiate("br, zstd", [GzipEncoder]) is None
+
+
+def test_large_and_streamed_responses_are_gzipped_small_ones_are_not():
+    app = FastAPI()
+    chunks = [b'{"row": %d, "status": "ACTIVE"}\n' % i * 50 for i in range(5)]
+
+    @app.get("/large")
+    async def large():
+        return PlainTextResponse("project finance " * 500)
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/text-stream")
+    async def text_stream():
+        async def rows():
+            for chunk in chunks:
+                yield chunk
+
+        return StreamingResponse(rows(), media_type="text/csv")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=500, enabled=True)
+    client = TestClient(app, headers={"Accept-Encoding": "gzip"})
+
+    response = client.get("/large")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) < 500
+    assert response.text == "project finance " * 500
+
+    assert "Content-Encoding" not in client.get("/small").headers
+
+    # Every streamed chunk is flushed, so a prefix decodes without the rest
+    with client.stream("GET", "/text-stream") as response:
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw) == b"".join(chunks)
+    decoder = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    first = GzipEncoder().compress(chunks[0])
+    assert decoder.decompress(raw[: len(first)]) == chunks[0]
@@ -0,0 +1,36 @@
+from prometheus_client import REGISTRY
+
+from src.database.connection_manager import DuckDBConnectionPool
+from src.database.engine_metrics import DuckDBEngineMetrics, parse_size
+
+
+def test_parse_size_handles_duckdb_units():
+    assert parse_size("0 bytes") == 0
+    assert parse_size("801KB") == 801_000
+    assert parse_size("5.0GB") == 5_000_000_000
+    assert parse_size("1GiB") == 2**30
+    assert parse_size("n/a") is None
+
+
+def test_refresh_publishes_engine_and_pool_gauges(tmp_path):
+    pool = DuckDBConnectionPool(db_path=str(tmp_path / "engine.db"))
+    with pool.get_connection() as conn:
+        conn.execute("CREATE TABLE readings AS SELECT range AS i FROM range(5000)")
+        conn.execute("CHECKPOINT")
+
+    metrics = DuckDBEngineMetrics(conn_manager=pool, ttl=60)
+    with pool.get_connection():
+        snapshot = metrics.refresh()
+
+    assert snapshot["table_rows"] == {"readings": 5000}
+    assert snapshot["file_bytes"] > 0
+    assert snapshot["blocks"]["used"] > 0
+    assert snapshot["memory_limit_bytes"] > 0
+    assert snapshot["pool"]["in_use"] == 1
+    assert REGISTRY.get_sample_value("duckdb_table_rows", {"table": "readings"}) == 5000
+    assert (
+        REGISTRY.get_sample_value("duckdb_pool_connections", {"state": "in_use"}) == 1
+    )
+
+    # Within the TTL the cached snapshot is served
+    assert metrics.refresh() is snapshot
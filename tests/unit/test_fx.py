@@ -0,0 +1,100 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.database import fx
+from src.database.stress import load_portfolio
+from src.main import app
+
+PORTFOLIO = "00000000-0000-0000-0000-0000000000cc"
+RATES = b"""currency_code,rate_date,usd_rate
+EUR,2024-01-01,1.10
+EUR,2024-02-01,1.20
+GBP,2024-01-01,1.25
+"""
+
+
+@pytest.fixture
+def conn(add_portfolio):
+    conn = add_portfolio(
+        PORTFOLIO, [{"currency_code": c} for c in ("USD", "EUR", "GBP", "JPY")]
+    )
+    fx.load_rates(conn, RATES)
+    return conn
+
+
+def _amounts(conn, currency, as_of):
+    rows = conn.execute(
+        "SELECT original_currency, total_amount::DOUBLE, currency_code "
+        f"FROM {fx.normalized_source('projects', currency, as_of)}"
+    ).fetchall()
+    return {original: (amount, code) for original, amount, code in rows}
+
+
+def test_amounts_convert_at_the_latest_rate_on_or_before_the_date(conn):
+    assert _amounts(conn, "EUR", date(2024, 1, 15)) == {
+        "USD": (909.09, "EUR"),
+        "EUR": (1000.0, "EUR"),
+        "GBP": (1136.36, "EUR"),
+        "JPY": (None, "EUR"),  # no JPY rate loaded
+    }
+    assert _amounts(conn, "USD", date(2024, 3, 1))["EUR"] == (1200.0, "USD")
+    # Before the first rate only same-currency and USD amounts convert
+    assert _amounts(conn, "USD", date(2023, 12, 31))["EUR"] == (None, "USD")
+
+    with pytest.raises(ValueError):
+        fx.reporting_source(conn, "projects", "GBP", date(2023, 12, 31))
+    with pytest.raises(ValueError):
+        fx.normalized_source("projects", "eur'; DROP TABLE projects; --")
+
+
+def test_loading_upserts_and_rejects_invalid_rates(conn):
+    result = fx.load_rates(
+        conn, b"currency_code,rate_date,usd_rate\nEUR,2024-02-01,1.3\n"
+    )
+    assert result == {"loaded": 1, "currencies": 1}
+    summary = {row["currency_code"]: row for row in fx.rates_summary(conn)}
+    assert summary["EUR"]["rates"] == 2
+    assert summary["EUR"]["latest_usd_rate"] == 1.3
+
+    with pytest.raises(ValueError):
+        fx.load_rates(conn, b"currency_code,rate_date,usd_rate\neur,2024-02-01,0\n")
+    assert fx.rates_summary(conn) == list(summary.values())
+
+
+def test_stress_inputs_use_the_reporting_currency(conn):
+    # No exposure is left out: a currency without a rate is an error
+    with pytest.raises(ValueError, match="No FX rate for JPY"):
+        load_portfolio(
+            conn, PORTFOLIO, reporting_currency="EUR", fx_date=date(2024, 1, 15)
+        )
+
+    fx.load_rates(conn, b"currency_code,rate_date,usd_rate\nJPY,2024-01-01,0.007\n")
+    portfolio = load_portfolio(
+        conn, PORTFOLIO, reporting_currency="EUR", fx_date=date(2024, 1, 15)
+    )
+    assert portfolio["currencies"] == ["EUR", "GBP", "JPY", "USD"]
+    assert sorted(portfolio["block"][0].round(2)) == [6.36, 909.09, 1000.0, 1136.36]
+
+
+def test_cashflow_endpoint_reports_in_a_currency(conn, portfolio_routes):
+    client = TestClient(app, base_url="http://test")
+    url = f"/ops/portfolios/{PORTFOLIO}/cashflows"
+
+    params = {"reporting_currency": "EUR", "fx_date": "2024-01-15"}
+
+    mixed = client.get(url)
+    assert mixed.status_code == 400
+    assert "reporting_currency" in mixed.json()["detail"]
+    unconvertible = client.get(url, params=params)
+    assert unconvertible.status_code == 400
+    assert "JPY" in unconvertible.json()["detail"]
+
+    fx.load_rates(conn, b"currency_code,rate_date,usd_rate\nJPY,2024-01-01,0.007\n")
+    body = client.get(url, params=params).json()
+    assert body["reporting_currency"] == "EUR"
+    assert body["totals"]["principal"] == pytest.approx(3051.81, abs=0.05)
+
+    assert client.get(url, params={"reporting_currency": "CHF"}).status_code == 400
+    assert client.get(url, params={"reporting_currency": "eur"}).status_code == 422
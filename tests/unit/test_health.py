@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.database.connection_manager import DuckDBConnectionPool
+from src.main import app
+from src.utils.health import HealthChecker
+
+
+def test_readiness_reflects_pool_saturation_and_staleness(tmp_path):
+    pool = DuckDBConnectionPool(
+        db_path=str(tmp_path / "health.db"), capacity=2, timeout=1
+    )
+    checker = HealthChecker(conn_manager=pool, interval=1, timeout=0.5)
+    assert checker.readiness()["status"] == "starting"
+
+    status = asyncio.run(checker.check())
+    assert status["status"] == "ready"
+    assert status["checks"]["database"]["ok"]
+
+    # Two requests hold every connection: the probe queues and times out
+    with pool.get_connection(), pool.get_connection():
+        status = asyncio.run(checker.check())
+    assert status["status"] == "not_ready"
+    assert not status["checks"]["database"]["ok"]
+    assert status["checks"]["pool"]["saturation"] >= 1.0
+    with pytest.raises(TimeoutError):
+        with pool.get_connection(), pool.get_connection(), pool.get_connection():
+            pass
+
+    asyncio.run(checker.check())
+    checker._checked_at = time.monotonic() - 10
+    assert checker.readiness()["status"] == "stale"
+    assert not checker.ready
+
+
+def test_liveness_and_cached_readiness_endpoints():
+    with TestClient(app, base_url="http://test") as client:
+        assert client.get("/health/live").json() == {"status": "alive"}
+
+        deadline = time.monotonic() + 5
+        while (response := client.get("/health/ready")).status_code != 200:
+            assert time.monotonic() < deadline, response.json()
+            time.sleep(0.05)
+
+        checked_at = response.json()["checked_at"]
+        assert client.get("/health").json()["checked_at"] == checked_at
@@ -0,0 +1,94 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from config.mock_onto_responses import get_mock_response
+from config.onto_server import ProjectSchema
+from src.database.compiled_schema import compile_schema
+from src.database.history import ProjectHistory, as_of_source
+from src.database.tiering import ProjectTiering
+from src.main import app
+from src.routes import operations
+
+PROJECT = "00000000-0000-0000-0000-000000000001"
+CREATED = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def pool(pool):
+    with pool.get_connection() as conn:
+        conn.execute(
+            "INSERT INTO projects VALUES "
+            "(?, 'Solar', NULL, 1000, 10, 7.5, 1.3, 'PROPOSED', ?, ?, 'USD')",
+            (PROJECT, CREATED.date(), CREATED),
+        )
+    return pool
+
+
+@pytest.fixture
+def client(pool, tmp_path, monkeypatch):
+    schema = compile_schema(ProjectSchema(**get_mock_response("project_schema")))
+
+    async def project_schema():
+        return schema
+
+    monkeypatch.setattr(operations, "_project_schema", project_schema)
+    monkeypatch.setattr(operations, "conn_manager", pool)
+    monkeypatch.setattr(
+        operations,
+        "project_tiering",
+        ProjectTiering(conn_manager=pool, cold_path=str(tmp_path / "cold")),
+    )
+    return TestClient(app, base_url="http://test")
+
+
+def test_updates_keep_versions_readable_as_of_a_time(client):
+    url = f"/ops/projects/{PROJECT}"
+    first = client.patch(url, json={"status": "ACTIVE", "dscr": 1.5})
+    assert first.status_code == 200
+    between = datetime.now()
+    assert client.patch(url, json={"dscr": 1.1}).status_code == 200
+
+    assert client.get(url).json()["dscr"] == 1.1
+    assert client.get(url, params={"as_of": between.isoformat()}).json()["dscr"] == 1.5
+    original = client.get(url, params={"as_of": "2024-06-01T00:00:00"}).json()
+    assert (original["status"], original["dscr"]) == ("PROPOSED", 1.3)
+    assert client.get(url, params={"as_of": "2023-06-01T00:00:00"}).status_code == 404
+
+    listed = client.get(
+        "/ops/projects", params={"as_of": between.isoformat(), "status": "ACTIVE"}
+    ).json()
+    assert [p["dscr"] for p in listed] == [1.5]
+
+    assert client.patch(url, json={"project_name": None}).status_code == 400
+    missing = f"/ops/projects/{PROJECT[:-1]}9"
+    assert client.patch(missing, json={"dscr": 2}).status_code == 404
+
+
+def test_compaction_merges_unchanged_adjacent_versions(pool, client):
+    url = f"/ops/projects/{PROJECT}"
+    for body in ({"dscr": 1.4}, {"dscr": 1.4}, {"dscr": 1.4}, {"dscr": 1.6}):
+        client.patch(url, json=body)
+
+    history = ProjectHistory(conn_manager=pool)
+    assert history.status()["versions"] == 4
+    # The original 1.3 version, then three 1.4 versions that differ only in time
+    result = history.compact()
+    assert result == {
+        "versions_before": 4,
+        "versions_after": 2,
+        "merged": 2,
+        "expired": 0,
+    }
+    assert history.compact()["versions_after"] == 2
+
+    with pool.get_connection() as conn:
+        columns = ("project_id", "dscr", "last_updated")
+        as_of = datetime.now()
+        rows = conn.execute(
+            f"SELECT dscr::DOUBLE FROM {as_of_source('projects', columns, as_of)}"
+        ).fetchall()
+    assert rows == [(1.6,)]
+
+    assert history.compact(retention_days=1, now=datetime(2999, 1, 1))["expired"] == 2
@@ -0,0 +1,73 @@
+import time
+from datetime import timedelta
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.auth import jwt_handler
+from src.auth.jwt_handler import (
+    AuthMiddleware,
+    VerifiedTokenCache,
+    create_access_token,
+    verify_token,
+)
+
+
+def test_cache_skips_verification_and_honours_exp(monkeypatch):
+    cache = VerifiedTokenCache(maxsize=2)
+    token = create_access_token({"sub": "analyst"})
+    decodes = []
+    decode = jwt_handler.jwt.decode
+    monkeypatch.setattr(
+        jwt_handler.jwt, "decode", lambda *a, **k: decodes.append(1) or decode(*a, **k)
+    )
+
+    assert verify_token(token, cache)["sub"] == "analyst"
+    assert verify_token(token, cache)["sub"] == "analyst"
+    assert len(decodes) == 1
+    assert cache.stats()["hits"] == 1
+
+    # An entry is dropped once its exp has passed, even if recently used
+    cache.put("short-lived", {"sub": "x", "exp": time.time() + 0.05})
+    time.sleep(0.1)
+    assert cache.get("short-lived") is None
+    assert cache.stats()["expirations"] == 1
+
+    for sub in ("a", "b", "c"):
+        verify_token(create_access_token({"sub": sub}), cache)
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["evictions"] == 2
+
+
+def test_middleware_rejects_missing_and_invalid_tokens():
+    app = FastAPI()
+
+    @app.get("/ops/projects")
+    async def projects(request: Request):
+        return {"user": request.state.user["sub"]}
+
+    @app.get("/health/live")
+    async def live():
+        return {"status": "alive"}
+
+    @app.get("/healthz-admin")
+    async def lookalike():
+        return {"status": "secret"}
+
+    app.add_middleware(AuthMiddleware, cache=VerifiedTokenCache(), enabled=True)
+    client = TestClient(app)
+    token = create_access_token({"sub": "analyst"})
+    expired = create_access_token({"sub": "analyst"}, timedelta(minutes=-1))
+
+    assert client.get("/health/live").status_code == 200
+    assert client.get("/healthz-admin").status_code == 401
+    missing = client.get("/ops/projects")
+    assert missing.status_code == 401
+    assert missing.headers["WWW-Authenticate"] == "Bearer"
+    for bad in (expired, token + "x"):
+        response = client.get(
+            "/ops/projects", headers={"Authorization": f"Bearer {bad}"}
+        )
+        assert response.status_code == 401
+    response = client.get("/ops/projects", headers={"Authorization": f"Bearer {token}"})
+    assert response.json() == {"user": "analyst"}
@@ -0,0 +1,79 @@
+import gzip
+import logging
+import queue
+
+from src.utils.logging_config import (
+    BatchingQueueListener,
+    BatchRotatingFileHandler,
+    ContextQueueHandler,
+    CustomJsonFormatter,
+    LevelSamplingFilter,
+    parse_sample_rates,
+)
+from src.utils.timing import RequestTimings, _current
+
+
+def _logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger
+
+
+def test_queued_records_keep_request_context_and_rotate_compressed(tmp_path):
+    log_file = tmp_path / "app.log"
+    file_handler = BatchRotatingFileHandler(str(log_file), maxBytes=2000, backupCount=2)
+    file_handler.setFormatter(CustomJsonFormatter("%(message)s"))
+    log_queue = queue.Queue()
+    listener = BatchingQueueListener(log_queue, [file_handler], batch_size=8)
+    listener.start()
+    logger = _logger("test_logging.pipeline", ContextQueueHandler(log_queue))
+
+    token = _current.set(RequestTimings("req-789"))
+    try:
+        for i in range(50):
+            logger.info("message %d", i)
+    finally:
+        _current.reset(token)
+    listener.stop()
+
+    rotated = tmp_path / "app.log.1.gz"
+    assert rotated.exists()
+    with gzip.open(rotated, "rt") as f:
+        assert '"request_id": "req-789"' in f.read()
+    assert '"message": "message 49"' in log_file.read_text()
+    assert not (tmp_path / "app.log.3.gz").exists()
+
+
+def test_level_sampling_keeps_unsampled_levels():
+    rates = parse_sample_rates("debug=0, INFO=0.5")
+    assert rates == {logging.DEBUG: 0.0, logging.INFO: 0.5}
+
+    log_queue = queue.Queue()
+    handler = ContextQueueHandler(log_queue)
+    handler.addFilter(LevelSamplingFilter(rates))
+    logger = _logger("test_logging.sampling", handler)
+
+    for _ in range(200):
+        logger.debug("dropped")
+        logger.warning("kept")
+        logger.info("sampled")
+
+    levels = [log_queue.get_nowait().levelno for _ in range(log_queue.qsize())]
+    assert logging.DEBUG not in levels
+    assert levels.count(logging.WARNING) == 200
+    assert 50 < levels.count(logging.INFO) < 150
+
+
+def test_full_queue_never_blocks_on_warnings():
+    log_queue = queue.Queue(1)
+    handler = ContextQueueHandler(log_queue, timeout=0.01)
+    logger = _logger("test_logging.full", handler)
+
+    logger.info("queued")
+    logger.info("dropped")
+    logger.error("dropped after the timeout")
+
+    assert handler.dropped == 2
+    assert log_queue.get_nowait().getMessage() == "queued"
@@ -0,0 +1,61 @@
+import asyncio
+
+import httpx
+
+from config.mock_onto_responses import MOCK_PROJECT_SCHEMA
+from config.onto_server import CircuitBreaker, SchemaRegistryClient
+
+
+def _registry(handler, **kwargs):
+    registry = SchemaRegistryClient(base_url="http://onto", use_mock=False, **kwargs)
+    registry._client = httpx.AsyncClient(
+        base_url="http://onto", transport=httpx.MockTransport(handler)
+    )
+    return registry
+
+
+def test_conditional_refresh_and_stale_while_revalidate():
+    """Expired entries are served stale while an If-None-Match fetch runs."""
+    requests = []
+
+    def handler(request):
+        requests.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json=MOCK_PROJECT_SCHEMA, headers={"ETag": '"v1"'})
+
+    async def scenario():
+        registry = _registry(handler, ttl=0, stale_ttl=60)
+        first = await registry.get_schema("project_schema")
+        stale = await registry.get_schema("project_schema")
+        await asyncio.sleep(0.01)  # let the background revalidation finish
+        return first, stale
+
+    first, stale = asyncio.run(scenario())
+    assert stale is first
+    assert requests == [None, '"v1"']
+
+
+def test_circuit_breaker_opens_and_probes():
+    """Failures open the circuit; after the timeout a single probe is allowed."""
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(503)
+
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+        registry = _registry(handler, ttl=0, stale_ttl=0, breaker=breaker)
+        for _ in range(5):
+            schema = await registry.get_schema("project_schema")
+        assert breaker.state == CircuitBreaker.OPEN
+        await asyncio.sleep(0.06)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        await registry.get_schema("project_schema")
+        return schema, breaker
+
+    schema, breaker = asyncio.run(scenario())
+    assert schema.name == "projects"  # mock fallback while the server is down
+    assert len(calls) == 3
+    assert breaker.state == CircuitBreaker.OPEN
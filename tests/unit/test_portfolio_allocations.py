@@ -0,0 +1,88 @@
+import pytest
+
+from src.database import duckdb_manager
+from src.database.change_log import ChangeLog
+from src.database.connection_manager import DuckDBConnectionPool
+from src.database.duckdb_manager import DuckDBManager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """Database manager backed by a temporary database."""
+    pool = DuckDBConnectionPool(db_path=str(tmp_path / "portfolios.db"))
+    monkeypatch.setattr(duckdb_manager, "change_log", ChangeLog(conn_manager=pool))
+    return DuckDBManager(conn_manager=pool)
+
+
+def _projects(manager, count):
+    return [
+        manager.create_project(
+            {
+                "project_name": f"Project {i}",
+                "total_amount": 1000.0,
+                "maturity_years": 10,
+                "expected_tri": 7.5,
+                "dscr": 1.3,
+                "status": "ACTIVE",
+            }
+        )
+        for i in range(count)
+    ]
+
+
+def _portfolio():
+    return {
+        "portfolio_name": "Core",
+        "risk_profile": "MODERATE",
+        "total_committed_amount": 1000.0,
+    }
+
+
+def test_bulk_allocation_and_rebalance(manager):
+    """Allocations are created, merged and replaced as whole sets."""
+    ids = _projects(manager, 200)
+    portfolio_id = manager.create_portfolio(
+        _portfolio(), [(pid, 0.25) for pid in ids[:100]]
+    )
+
+    summary = manager.allocate_projects(
+        portfolio_id, [(pid, 0.5) for pid in ids[50:150]], replace=True
+    )
+    assert summary == {
+        "inserted": 50,
+        "updated": 50,
+        "removed": 50,
+        "total_allocation": 50.0,
+    }
+
+    summary = manager.allocate_projects(portfolio_id, [(ids[199], 10.0)])
+    assert summary["inserted"] == 1
+    assert summary["total_allocation"] == 60.0
+
+
+def test_invalid_allocations_roll_back(manager):
+    """A failing validation leaves the portfolio untouched."""
+    ids = _projects(manager, 2)
+    portfolio_id = manager.create_portfolio(_portfolio(), [(ids[0], 60.0)])
+
+    with pytest.raises(ValueError, match="exceeds 100%"):
+        manager.allocate_projects(portfolio_id, [(ids[1], 50.0)])
+    with pytest.raises(ValueError, match="unknown project"):
+        manager.allocate_projects(
+            portfolio_id, [("00000000-0000-0000-0000-000000000000", 1.0)]
+        )
+    with pytest.raises(LookupError):
+        manager.allocate_projects("00000000-0000-0000-0000-000000000000", [])
+
+    rows = manager.execute_query("SELECT * FROM portfolio_projects")
+    assert len(rows) == 1
+
+
+def test_schema_is_reapplied_when_a_table_is_missing(manager):
+    with manager.conn_manager.get_connection() as conn:
+        conn.execute("DROP TABLE portfolio_projects")
+    DuckDBManager(conn_manager=manager.conn_manager)
+    with manager.conn_manager.get_connection() as conn:
+        assert conn.execute("SELECT count(*) FROM portfolio_projects").fetchone() == (
+            0,
+        )
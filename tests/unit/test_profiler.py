@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from src.utils.profiler import (
+    ContinuousSampler,
+    ProfilerBusyError,
+    profile,
+)
+
+
+def _busy_worker(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=_busy_worker, args=(stop,), name="busy")
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+def test_profile_captures_other_threads(busy_thread):
+    result = profile(0.2, interval=0.005)
+
+    assert result.samples > 10
+    collapsed = result.collapsed()
+    assert any(
+        line.startswith("busy;") and "_busy_worker" in line
+        for line in collapsed.splitlines()
+    )
+
+    speedscope = result.speedscope()
+    frames = speedscope["shared"]["frames"]
+    busy = next(p for p in speedscope["profiles"] if p["name"] == "busy")
+    assert len(busy["samples"]) == len(busy["weights"])
+    assert all(0 <= i < len(frames) for stack in busy["samples"] for i in stack)
+
+
+def test_only_one_profile_runs_at_a_time():
+    errors = []
+    first = threading.Thread(target=profile, args=(0.3,))
+    first.start()
+    time.sleep(0.05)
+    try:
+        profile(0.1)
+    except ProfilerBusyError as e:
+        errors.append(e)
+    first.join()
+
+    assert errors
+
+
+def test_continuous_sampler_keeps_recent_samples(busy_thread):
+    sampler = ContinuousSampler(interval=0.01, ring_size=5)
+    sampler.start()
+    time.sleep(0.2)
+    sampler.stop()
+
+    assert len(sampler.ring) == 5
+    recent = sampler.recent(60)
+    assert recent.samples == 5
+    assert "busy;" in recent.collapsed()
@@ -0,0 +1,88 @@
+from datetime import date, datetime
+
+import pytest
+
+from config.mock_onto_responses import get_mock_response
+from config.onto_server import ColumnChecks, ProjectSchema
+from src.database.quality import QualityMonitor, check_sql, column_rules
+
+SCHEMA = ProjectSchema(**get_mock_response("project_schema"))
+PORTFOLIO = "00000000-0000-0000-0000-0000000000dd"
+
+
+def _insert(conn, i, dscr=1.4, status="ACTIVE", currency="USD", day=10):
+    conn.execute(
+        "INSERT INTO projects VALUES (?, ?, NULL, 1000, 10, 8.0, ?, ?, ?, ?, ?)",
+        (
+            f"00000000-0000-0000-0000-{i:012d}",
+            f"P{i}",
+            dscr,
+            status,
+            date(2024, 1, day),
+            datetime(2024, 1, day),
+            currency,
+        ),
+    )
+
+
+@pytest.fixture
+def monitor(pool):
+    with pool.get_connection() as conn:
+        _insert(conn, 1)
+        _insert(conn, 2, dscr=-0.5, currency="us$")
+        _insert(conn, 3, status="CANCELLED")
+        conn.execute(
+            "INSERT INTO portfolios VALUES (?, 'Core', NULL, 'MODERATE', 1, ?, ?)",
+            (PORTFOLIO, date(2024, 1, 1), date(2024, 1, 1)),
+        )
+        conn.execute(
+            "INSERT INTO portfolio_projects VALUES (?, ?, 50, ?)",
+            (PORTFOLIO, "00000000-0000-0000-0000-000000000001", date(2024, 1, 1)),
+        )
+    return QualityMonitor(conn_manager=pool)
+
+
+def test_rules_compile_into_one_aggregate_per_table():
+    rules = column_rules("currency_code", True, ColumnChecks(pattern="[A-Z]{3}"), 0)
+    assert [r.rule for r in rules] == ["required", "pattern"]
+    assert check_sql("projects", rules, incremental=False).count("SELECT") == 1
+
+    with pytest.raises(ValueError):
+        column_rules("project_id", True, ColumnChecks(references="projects"), 0)
+
+
+def test_full_then_incremental_runs(monitor):
+    results = monitor.run(SCHEMA)
+    projects = results["projects"]
+    assert projects["mode"] == "full"
+    assert projects["rows_checked"] == 3
+    assert projects["failing_rows"] == 2
+    assert projects["score"] == pytest.approx(1 / 3, abs=1e-6)
+    assert {(v["column"], v["rule"]) for v in projects["violations"]} == {
+        ("dscr", "min"),
+        ("currency_code", "pattern"),
+        ("status", "allowed"),
+    }
+    assert results["portfolio_projects"]["failing_rows"] == 0
+
+    with monitor.conn_manager.get_connection() as conn:
+        # Backfilled with an older business date than every checked row
+        _insert(conn, 4, dscr=250, day=2)
+        _insert(conn, 5, day=11)
+    incremental = monitor.run(SCHEMA)["projects"]
+    assert incremental["mode"] == "incremental"
+    assert incremental["since"] == {"rowid": 2, "updated_at": datetime(2024, 1, 10)}
+    assert incremental["rows_checked"] == 2
+    assert incremental["violations"] == [{"column": "dscr", "rule": "max", "rows": 1}]
+    assert monitor.run(SCHEMA)["projects"]["rows_checked"] == 0
+
+    with monitor.conn_manager.get_connection() as conn:
+        conn.execute(
+            "UPDATE projects SET dscr = 300, last_updated = ? "
+            "WHERE project_name = 'P1'",
+            (datetime(2024, 1, 12),),
+        )
+    updated = monitor.run(SCHEMA)["projects"]
+    assert updated["rows_checked"] == 1
+    assert updated["watermark"] == {"rowid": 4, "updated_at": datetime(2024, 1, 12)}
+    assert monitor.run(SCHEMA, incremental=False)["projects"]["rows_checked"] == 5
@@ -0,0 +1,59 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.database.engine_metrics import engine_metrics
+from src.utils.rate_limit import RateLimitMiddleware, SharedTokenBuckets, route_cost
+
+
+def test_buckets_are_shared_between_processes_through_the_state_file(tmp_path):
+    path = str(tmp_path / "buckets")
+    worker_a = SharedTokenBuckets(path, slots=64)
+    worker_b = SharedTokenBuckets(path, slots=64)
+
+    assert worker_a.acquire("10.0.0.1", 4, rate=1, burst=10)[0]
+    assert worker_b.acquire("10.0.0.1", 4, rate=1, burst=10)[0]
+    allowed, remaining, wait = worker_a.acquire("10.0.0.1", 4, rate=1, burst=10)
+
+    assert not allowed
+    assert 1.9 < remaining < 2.1
+    assert 1.9 < wait < 2.1
+    assert worker_b.acquire("10.0.0.2", 4, rate=1, burst=10)[0]
+
+
+def test_listing_cost_scales_with_estimated_rows(monkeypatch):
+    monkeypatch.setattr(
+        engine_metrics, "last_snapshot", {"table_rows": {"projects": 3_000_000}}
+    )
+
+    assert route_cost("GET", "/ops/projects/{project_id}", b"") == 1
+    assert route_cost("GET", "/ops/projects", b"") == 301
+    assert route_cost("GET", "/ops/projects", b"status=ACTIVE") == 101
+    assert route_cost("GET", "/health/ready", b"") == 0
+    assert route_cost("POST", "/admin/backups", b"") == 25
+
+
+def test_throttled_requests_get_429_with_retry_after(tmp_path):
+    app = FastAPI()
+
+    @app.post("/ops/projects")
+    async def create():
+        return {"ok": True}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        router=app.router,
+        buckets=SharedTokenBuckets(str(tmp_path / "buckets"), slots=64),
+        rate=0.5,
+        burst=4,
+        enabled=True,
+    )
+    client = TestClient(app)
+
+    first, second, third = (client.post("/ops/projects") for _ in range(3))
+
+    assert first.status_code == 200
+    assert first.headers["RateLimit-Remaining"] == "2"
+    assert second.status_code == 200
+    assert third.status_code == 429
+    assert third.headers["Retry-After"] == "4"
+    assert third.json()["detail"] == "Rate limit exceeded"
@@ -0,0 +1,133 @@
+import time
+from datetime import date
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.database import monte_carlo
+from src.database.stress import DEFAULT_PARAMETERS, StressEngine
+from src.main import app
+from src.routes import portfolios
+
+PORTFOLIO = "00000000-0000-0000-0000-0000000000bb"
+CALM = {
+    **DEFAULT_PARAMETERS,
+    "rate_volatility": 0.0,
+    "revenue_volatility": 0.0,
+    "fx_volatility": 0.0,
+}
+
+
+def _block():
+    return monte_carlo.to_block(
+        [
+            (600.0, 0.08, 10.0, 1.5, "USD"),
+            (300.0, 0.06, 20.0, 1.1, "EUR"),
+            (100.0, 0.10, 5.0, 1.3, "GBP"),
+        ]
+    )
+
+
+def test_simulation_is_seeded_and_reacts_to_shocks():
+    block, currencies = _block()
+    seed = np.random.SeedSequence(42)
+
+    first = monte_carlo.simulate(block, len(currencies), DEFAULT_PARAMETERS, seed, 500)
+    again = monte_carlo.simulate(
+        block, len(currencies), DEFAULT_PARAMETERS, seed, 500, chunk_cells=7
+    )
+    assert np.allclose(first, again)
+
+    # Without volatility every scenario reproduces the base case
+    calm = monte_carlo.simulate(block, len(currencies), CALM, seed, 10)
+    base = monte_carlo._annuity(*block[:3])
+    assert np.allclose(calm[0], (base * block[3]).sum() / base.sum(), rtol=1e-5)
+    assert np.allclose(calm[1], 0.3)  # only the 1.1 DSCR project breaches 1.2
+
+    shocked = monte_carlo.simulate(
+        block, len(currencies), {**CALM, "rate_shock": 5.0}, seed, 10
+    )
+    assert (shocked[0] < calm[0]).all()
+    assert (shocked[1] > calm[1]).all()
+
+    # FX moves a project's CFADS and debt service together
+    fx = monte_carlo.simulate(
+        block, len(currencies), {**CALM, "fx_shock": -0.5}, seed, 10
+    )
+    assert (fx[0] > calm[0]).all()  # less weight on the weaker foreign projects
+    assert np.allclose(fx[1], calm[1])
+
+
+@pytest.fixture
+def conn(add_portfolio):
+    conn = add_portfolio(
+        PORTFOLIO,
+        [
+            {"total_amount": 600.0, "expected_tri": 8.0},
+            {
+                "total_amount": 300.0,
+                "maturity_years": 20,
+                "expected_tri": 6.0,
+                "dscr": 1.1,
+                "currency_code": "EUR",
+            },
+        ],
+        created=date(2020, 1, 1),
+    )
+    conn.execute("INSERT INTO fx_rates VALUES ('EUR', ?, 1.1)", (date(2020, 1, 1),))
+    return conn
+
+
+def test_stress_job_runs_on_the_process_pool(conn, portfolio_routes, monkeypatch):
+    engine = StressEngine(workers=2, batch_scenarios=250)
+    monkeypatch.setattr(portfolios, "stress_engine", engine)
+
+    with TestClient(app, base_url="http://test") as client:
+        url = f"/ops/portfolios/{PORTFOLIO}/stress"
+        mixed = client.post(url, json={"scenarios": 1000})
+        assert mixed.status_code == 400
+        assert "reporting_currency" in mixed.json()["detail"]
+
+        started = client.post(
+            url,
+            json={
+                "scenarios": 1000,
+                "seed": 7,
+                "rate_shock": 1.0,
+                "reporting_currency": "USD",
+            },
+        )
+        assert started.status_code == 202
+        deadline = time.monotonic() + 60
+        while (status := client.get(started.json()["status_url"]).json())["status"] in (
+            "queued",
+            "running",
+        ):
+            assert time.monotonic() < deadline
+            time.sleep(0.1)
+        assert client.get("/ops/stress/unknown").status_code == 404
+    engine.shutdown()
+
+    assert status["status"] == "completed", status
+    assert status["scenarios_done"] == 1000
+
+    # Same seed in-process gives the same percentiles as the worker pool
+    block, currencies = monte_carlo.to_block(
+        [(600.0, 0.08, 10.0, 1.5, "USD"), (330.0, 0.06, 20.0, 1.1, "EUR")]
+    )
+    seeds = monte_carlo.batch_seeds(7, 4)
+    parameters = {**DEFAULT_PARAMETERS, "rate_shock": 1.0}
+    expected = monte_carlo.summarize(
+        {
+            i: monte_carlo.simulate(block, len(currencies), parameters, s, 250)
+            for i, s in enumerate(seeds)
+        },
+        parameters["covenant"],
+    )
+    results = status["results"]
+    assert results["portfolio_dscr"] == pytest.approx(expected["portfolio_dscr"])
+    assert results["breach_probability"] == expected["breach_probability"]
+    assert results["expected_breach_share"] == pytest.approx(
+        expected["expected_breach_share"]
+    )
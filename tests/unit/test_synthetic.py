@@ -0,0 +1,69 @@
+from datetime import date
+
+import duckdb
+from fastapi.testclient import TestClient
+
+from src.database.schema import SCHEMA_DEFINITIONS
+from src.database.synthetic import generate
+from src.main import app
+from src.routes import admin
+
+AS_OF = date(2024, 6, 30)
+CHECKSUM_SQL = """
+    SELECT
+        (SELECT bit_xor(hash(p)) FROM projects p),
+        (SELECT bit_xor(hash(pp)) FROM portfolio_projects pp)
+"""
+
+
+def _generated(seed, **kwargs):
+    conn = duckdb.connect()
+    for table in ("projects", "portfolios", "portfolio_projects"):
+        conn.execute(SCHEMA_DEFINITIONS[table])
+    generate(conn, seed=seed, chunk_rows=700, as_of=AS_OF, **kwargs)
+    return conn
+
+
+def test_generation_is_reproducible_and_referentially_valid():
+    conn = _generated(7, projects=2000, portfolios=50)
+    same = _generated(7, projects=1000)
+    generate(same, projects=1000, portfolios=50, seed=7, start=1000, as_of=AS_OF)
+    other = _generated(8, projects=2000, portfolios=50)
+
+    assert (
+        conn.execute(CHECKSUM_SQL).fetchone() == same.execute(CHECKSUM_SQL).fetchone()
+    )
+    assert (
+        conn.execute(CHECKSUM_SQL).fetchone() != other.execute(CHECKSUM_SQL).fetchone()
+    )
+
+    orphans, over_allocated, portfolios = conn.execute(
+        """
+        SELECT
+            COUNT(*) FILTER (WHERE p.project_id IS NULL),
+            (SELECT COUNT(*) FROM (
+                SELECT portfolio_id FROM portfolio_projects
+                GROUP BY 1 HAVING SUM(allocation_percentage) > 100
+            )),
+            COUNT(DISTINCT pp.portfolio_id)
+        FROM portfolio_projects pp
+        LEFT JOIN projects p USING (project_id)
+        """
+    ).fetchone()
+    assert (orphans, over_allocated, portfolios) == (0, 0, 50)
+
+
+def test_admin_endpoint_rejects_regenerating_a_seed(pool, monkeypatch):
+    monkeypatch.setattr(admin, "conn_manager", pool)
+    client = TestClient(app, base_url="http://test")
+
+    created = client.post("/admin/synthetic?projects=20&portfolios=2&seed=3")
+    repeated = client.post("/admin/synthetic?projects=20&seed=3")
+    skipped = client.post("/admin/synthetic?projects=20&portfolios=2&seed=4&start=5")
+    too_many = client.post("/admin/synthetic?projects=1&portfolios=100000000")
+
+    assert created.status_code == 200
+    assert created.json()["projects"]["rows"] == 20
+    assert repeated.status_code == 409
+    assert skipped.status_code == 400
+    assert too_many.status_code == 422
@@ -0,0 +1,42 @@
+import asyncio
+import gc
+import time
+
+from prometheus_client import REGISTRY
+
+from src.utils.system_metrics import SystemMetricsSampler
+
+
+def test_sample_reports_process_and_gc_statistics():
+    sampler = SystemMetricsSampler(interval=60)
+    sampler.gc_tracker.install()
+    try:
+        gc.collect()
+        sample = sampler.sample()
+    finally:
+        sampler.gc_tracker.uninstall()
+
+    process = sample["process"]
+    assert process["rss_bytes"] > 0
+    assert process["threads"] >= 1
+    assert process["cpu_seconds"] > 0
+    assert sample["gc"]["collections"][2] >= 1
+    assert REGISTRY.get_sample_value("app_process_rss_bytes") == process["rss_bytes"]
+    assert (
+        REGISTRY.get_sample_value("app_gc_collections_total", {"generation": "2"}) >= 1
+    )
+
+
+def test_run_measures_event_loop_lag_and_serves_last_sample():
+    sampler = SystemMetricsSampler()
+
+    async def scenario():
+        task = asyncio.create_task(sampler.run(interval=0.5))
+        await asyncio.sleep(0.1)
+        time.sleep(0.8)  # block the loop across a lag probe wakeup
+        await asyncio.sleep(0.2)
+        task.cancel()
+        return await sampler.get_sample()
+
+    sample = asyncio.run(scenario())
+    assert sample["event_loop_lag_seconds"] >= 0.2
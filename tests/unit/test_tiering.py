@@ -0,0 +1,53 @@
+import pytest
+
+from src.database.tiering import ProjectTiering
+
+
+@pytest.fixture
+def tiering(pool, tmp_path):
+    """Tiered storage over a temporary database with old and recent projects."""
+    with pool.get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO projects
+            SELECT
+                uuid(), 'Project ' || i, NULL, 1000, 10, 7.5, 1.3,
+                CASE WHEN i % 2 = 0 THEN 'COMPLETED' ELSE 'ACTIVE' END,
+                DATE '2010-01-01' + INTERVAL (i * 20) DAY,
+                now()::TIMESTAMP, 'USD'
+            FROM range(400) t(i)
+            """
+        )
+    return ProjectTiering(conn_manager=pool, cold_path=str(tmp_path / "cold"))
+
+
+def test_age_out_keeps_full_results(tiering):
+    """Cold rows move to Parquet while the unified view still returns them."""
+    with tiering.conn_manager.get_connection() as conn:
+        before = conn.execute(
+            "SELECT status, COUNT(*) FROM projects GROUP BY ALL ORDER BY ALL"
+        ).fetchall()
+
+    result = tiering.age_out(min_age_years=3, statuses=["COMPLETED"])
+    assert result["moved_rows"] > 0
+
+    status = tiering.status()
+    assert status["cold_rows"] == result["moved_rows"]
+    assert all(p.endswith("status=COMPLETED") for p in status["partitions"])
+
+    with tiering.conn_manager.get_connection() as conn:
+        view = tiering.read_source()
+        after = conn.execute(
+            f"SELECT status, COUNT(*) FROM {view} GROUP BY ALL ORDER BY ALL"
+        ).fetchall()
+        hot_completed = conn.execute(
+            "SELECT COUNT(*) FROM projects WHERE status = 'COMPLETED'"
+        ).fetchone()[0]
+        plan = conn.execute(
+            f"EXPLAIN SELECT * FROM {view} WHERE creation_year = 2011"
+        ).fetchall()[0][1]
+
+    assert after == before
+    assert hot_completed < dict(before)["COMPLETED"]
+    assert "File Filters" in plan
+    assert tiering.age_out(min_age_years=3)["moved_rows"] == 0
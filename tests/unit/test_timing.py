@@ -0,0 +1,38 @@
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from src.main import app
+
+client = TestClient(app, base_url="http://test")
+
+
+def _phase_count(endpoint, phase):
+    return REGISTRY.get_sample_value(
+        "http_request_phase_seconds_count", {"endpoint": endpoint, "phase": phase}
+    )
+
+
+def test_server_timing_header_and_phase_histograms():
+    before = _phase_count("/monitoring/health", "endpoint") or 0
+
+    response = client.get("/monitoring/health", headers={"X-Request-ID": "req-123"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "req-123"
+    phases = dict(
+        entry.split(";dur=") for entry in response.headers["Server-Timing"].split(", ")
+    )
+    assert {"endpoint", "serialize", "total"} <= phases.keys()
+    assert float(phases["total"]) >= float(phases["endpoint"])
+    assert _phase_count("/monitoring/health", "endpoint") == before + 1
+
+
+def test_openmetrics_exposes_request_id_exemplars():
+    client.get("/monitoring/health", headers={"X-Request-ID": "req-456"})
+
+    response = client.get(
+        "/monitoring/metrics", headers={"Accept": "application/openmetrics-text"}
+    )
+
+    assert response.headers["content-type"].startswith("application/openmetrics-text")
+    assert 'request_id="req-456"' in response.text
@@ -0,0 +1,48 @@
+from src.utils.timing import phase
+from src.utils.tracing import NOOP_SPAN, OTLPSpanExporter, Tracer
+
+
+class ListProcessor:
+    def __init__(self):
+        self.spans = []
+
+    def on_end(self, span):
+        self.spans.append(span)
+
+    def shutdown(self, timeout=5.0):
+        pass
+
+
+def test_sampled_trace_records_nested_spans(monkeypatch):
+    processor = ListProcessor()
+    tracer = Tracer(sample_rate=1.0, processor=processor)
+    monkeypatch.setattr("src.utils.timing.tracer", tracer)
+
+    with tracer.start_trace("http.request", method="GET") as root:
+        with phase("query"):
+            with tracer.span("inner"):
+                pass
+
+    inner, query, request = processor.spans
+    assert [s.name for s in processor.spans] == ["inner", "query", "http.request"]
+    assert request is root and request.parent_id is None
+    assert query.parent_id == request.span_id
+    assert inner.parent_id == query.span_id
+    assert {s.trace_id for s in processor.spans} == {request.trace_id}
+
+    payload = OTLPSpanExporter.encode(processor.spans)
+    otlp_spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert otlp_spans[2]["kind"] == 2 and "parentSpanId" not in otlp_spans[2]
+    assert otlp_spans[1]["parentSpanId"] == request.span_id
+
+
+def test_unsampled_trace_records_nothing():
+    processor = ListProcessor()
+    tracer = Tracer(sample_rate=0.0, processor=processor)
+
+    with tracer.start_trace("http.request") as root:
+        assert root is NOOP_SPAN
+        with tracer.span("query") as child:
+            assert child is NOOP_SPAN
+
+    assert processor.spans == []
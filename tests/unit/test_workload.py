@@ -0,0 +1,115 @@
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.database import advisor as advisor_module
+from src.database.advisor import RecommendationError, WorkloadAdvisor
+from src.database.backup import SnapshotManager
+from src.database.workload import (
+    WorkloadRecorder,
+    decode_params,
+    encode_params,
+    normalize,
+    predicates,
+)
+from src.main import app
+from src.routes import admin
+
+
+@pytest.fixture
+def pool(pool):
+    with pool.get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO projects
+            SELECT uuid(), 'P' || i, NULL, 1000, 10, 8.0, 1.2,
+                   CASE i % 3 WHEN 0 THEN 'PROPOSED' WHEN 1 THEN 'ACTIVE'
+                        ELSE 'COMPLETED' END,
+                   DATE '2024-01-01', TIMESTAMP '2024-01-01', 'USD'
+            FROM range(3000) t(i)
+            """
+        )
+        conn.execute(
+            """
+            INSERT INTO fx_rates
+            SELECT 'EUR', DATE '2020-01-01' + (999 - i)::INTEGER, 1.1
+            FROM range(1000) t(i)
+            """
+        )
+    return pool
+
+
+def test_statements_normalize_into_fingerprints():
+    statement = normalize(
+        "SELECT * FROM projects_all p\n WHERE p.status IN ('A', 'B') AND dscr > 1.5"
+    )
+    assert (
+        statement == "SELECT * FROM projects_all p WHERE p.status IN (?) AND dscr > ?"
+    )
+    assert predicates(statement) == ["projects_all.status IN", "projects_all.dscr >"]
+    assert predicates("SELECT * FROM a JOIN b ON a.id = b.id WHERE x = ?") == [".x ="]
+
+    params = (date(2024, 1, 2), "ACTIVE", 3)
+    assert decode_params(encode_params(params)) == list(params)
+
+
+def test_analyze_then_apply_recommendations(pool, tmp_path, monkeypatch):
+    monkeypatch.setattr(advisor_module, "WORKLOAD_MIN_CALLS", 5)
+    monkeypatch.setattr(advisor_module, "WORKLOAD_MIN_BENEFIT_MS", float("-inf"))
+    recorder = WorkloadRecorder()
+    recorder.enabled = True
+    with pool.get_connection() as conn:
+        recorded = recorder.wrap(conn)
+        for i in range(10):
+            recorded.execute(
+                "SELECT count(*) FROM projects WHERE status = ?",
+                ("ACTIVE" if i % 2 else "COMPLETED",),
+            ).fetchone()
+            day = date(2022, 1, 1) + timedelta(days=i)
+            recorded.execute(
+                f"SELECT avg(usd_rate) FROM fx_rates WHERE rate_date >= '{day}'"
+            ).fetchone()
+    assert recorder.pending() == 2
+
+    advisor = WorkloadAdvisor(
+        conn_manager=pool,
+        recorder=recorder,
+        snapshots=SnapshotManager(
+            conn_manager=pool, backup_path=str(tmp_path / "backups")
+        ),
+    )
+    result = advisor.analyze()
+    assert result["fingerprints"] == 2
+    assert result["snapshot_id"] is not None
+    by_id = {r["recommendation_id"]: r for r in result["recommendations"]}
+    assert by_id["index-projects-status"]["calls"] == 10
+    assert by_id["cluster-fx_rates-rate_date"]["baseline_ms"] > 0
+    assert sum(r["kind"] == "cache" for r in by_id.values()) == 2
+    assert {r["status"] for r in by_id.values()} == {"proposed"}
+
+    assert advisor.apply("index-projects-status")["status"] == "applied"
+    assert advisor.apply("cluster-fx_rates-rate_date")["status"] == "applied"
+    with pool.get_connection() as conn:
+        assert conn.execute(
+            "SELECT count(*) FROM duckdb_indexes() WHERE index_name = ?",
+            ("projects_status_idx",),
+        ).fetchone() == (1,)
+        first = conn.execute("SELECT rate_date FROM fx_rates LIMIT 1").fetchone()
+        assert first == (date(2020, 1, 1),)
+    with pytest.raises(RecommendationError):
+        advisor.apply("index-projects-status")
+    cache_id = next(i for i, r in by_id.items() if r["kind"] == "cache")
+    with pytest.raises(RecommendationError):
+        advisor.apply(cache_id)
+
+    # Applied recommendations stay, and are not proposed again
+    again = {r["recommendation_id"] for r in advisor.analyze()["recommendations"]}
+    assert {"index-projects-status", "cluster-fx_rates-rate_date"} <= again
+    assert len(advisor.recommendations("applied")) == 2
+
+    monkeypatch.setattr(admin, "workload_advisor", advisor)
+    client = TestClient(app, base_url="http://test")
+    assert client.post("/admin/workload/recommendations/nope/apply").status_code == 404
+    url = f"/admin/workload/recommendations/{cache_id}/apply"
+    assert client.post(url).status_code == 409